@@ -46,6 +46,37 @@ preload_app = True
 worker_tmp_dir = "/dev/shm"
 
 
+# ── Warm shared state in the master before fork ────────────────────────
+# Many modules import the ORM and memory queue lazily inside functions, so
+# without this each worker would build the SQLAlchemy mappers itself after
+# fork. Importing them here (and configuring the mappers) puts that state
+# in the master so workers share it copy-on-write. This opens no database
+# connections: the engine is still created lazily on first use, and the
+# memory queue singleton is not instantiated.
+def on_starting(server):  # noqa: ARG001
+    from sqlalchemy.orm import configure_mappers
+
+    import src.agents.memory.queue  # noqa: F401
+    import src.db.engine  # noqa: F401
+    import src.db.models  # noqa: F401
+
+    configure_mappers()
+
+
+# ── Flush debounced memory updates on graceful shutdown ───────────────
+# The in-process memory queue only processes conversations when its
+# debounce deadline passes; without this, contexts still waiting when a
+# worker stops would be dropped. The Redis queue promotes its scheduled
+# jobs so workers pick them up immediately.
+def worker_exit(server, worker):  # noqa: ARG001
+    try:
+        from src.agents.memory.queue import flush_memory_queue
+
+        flush_memory_queue()
+    except Exception:
+        pass
+
+
 # ── Prometheus multiprocess cleanup ────────────────────────────────────
 # When PROMETHEUS_MULTIPROC_DIR is set, each worker writes to its own
 # metrics DB file. This hook removes the file when a worker exits so
@@ -13,16 +13,33 @@ Prerequisites:
     - PostgreSQL database must be running and migrations applied:
         alembic upgrade head
     - DATABASE_URL environment variable must be set
+    - Optional: install ``ijson`` to stream large users.json /
+      thread-ownership.json / api-keys.json files instead of loading them
+      whole
 """
 
 from __future__ import annotations
 
+import csv
+import io
 import json
 import logging
+import mmap
 import os
 import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import UTC, datetime
+from itertools import batched
 from pathlib import Path
+from typing import Any
+
+import orjson
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +53,138 @@ sys.path.insert(0, str(backend_dir))
 os.chdir(backend_dir)
 
 
+# Rows per multi-row INSERT. Keeps statements well under PostgreSQL's
+# parameter limit while still amortizing round-trips.
+BATCH_SIZE = 1000
+
+# Each migrate_* function runs in one session/transaction; on very large
+# inputs it commits every COMMIT_EVERY rows to bound WAL and lock growth.
+COMMIT_EVERY = 10_000
+
+
+def _iter_json_object(path: Path, *keys: str) -> Iterator[tuple[str, Any]]:
+    """Yield the ``(key, value)`` pairs of a top-level object in a JSON file.
+
+    The first of ``keys`` that holds a non-empty object is used. When ijson
+    is installed the file is streamed, so peak memory stays at one record
+    instead of the whole decoded document; otherwise it is parsed at once.
+    """
+    if ijson is None:
+        data = orjson.loads(path.read_bytes())
+        for key in keys:
+            if data.get(key):
+                yield from data[key].items()
+                return
+        return
+
+    for key in keys:
+        with open(path, "rb") as f:
+            found = False
+            for item in ijson.kvitems(f, key, use_float=True):
+                found = True
+                yield item
+        if found:
+            return
+
+
+def _insert_missing(session, model, rows: Iterable[dict], index_elements: list[str]) -> tuple[int, int]:
+    """Insert ``rows`` with ``ON CONFLICT DO NOTHING`` in ``BATCH_SIZE`` chunks.
+
+    PostgreSQL skips rows whose key already exists, so no existence check
+    is needed before inserting. One statement is built up front and run
+    executemany-style per batch, so SQLAlchemy compiles it once and
+    reuses it from its statement cache. ``rows`` may be a lazy iterator;
+    only one batch is materialized at a time. The session is committed
+    every ``COMMIT_EVERY`` rows; the caller's session commits the remainder.
+
+    Returns:
+        ``(inserted, total)`` row counts.
+    """
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    # RETURNING the key of each inserted row gives an exact count across
+    # executemany batches, where cursor.rowcount is not reliable.
+    stmt = pg_insert(model).on_conflict_do_nothing(index_elements=index_elements).returning(*model.__table__.primary_key.columns)
+
+    inserted = 0
+    total = 0
+    for batch in batched(rows, BATCH_SIZE):
+        inserted += len(session.execute(stmt, list(batch)).all())
+        total += len(batch)
+        if total % COMMIT_EVERY == 0:
+            session.commit()
+    return inserted, total
+
+
+def _copy_memory_rows(session, rows: list[tuple[str, dict]]) -> int:
+    """Stream ``(user_id, memory_json)`` rows into user_memory via COPY.
+
+    COPY skips per-statement parsing and planning, which matters for the
+    large JSONB payloads stored per user. COPY cannot skip conflicts, so
+    rows are copied into a temporary staging table and moved across with
+    ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``. Rows are encoded as
+    CSV so the ``csv`` module handles quoting of the embedded JSON.
+
+    The COPY API differs per driver: psycopg2 has ``copy_expert`` and
+    psycopg 3 has ``cursor.copy``. Any other driver falls back to the
+    batched ``INSERT ... ON CONFLICT DO NOTHING`` of ``_insert_missing``.
+
+    Returns:
+        Number of rows actually inserted.
+    """
+    now = datetime.now(UTC).isoformat()
+    connection = session.connection()
+    driver = connection.dialect.driver
+    if driver not in ("psycopg2", "psycopg"):
+        from src.db.models import UserMemoryModel
+
+        inserted, _ = _insert_missing(
+            session,
+            UserMemoryModel,
+            ({"user_id": user_id, "memory_json": memory_data, "updated_at": now} for user_id, memory_data in rows),
+            index_elements=["user_id"],
+        )
+        return inserted
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for user_id, memory_data in rows:
+        writer.writerow((user_id, json.dumps(memory_data), now))
+    buffer.seek(0)
+
+    copy_sql = "COPY user_memory_import (user_id, memory_json, updated_at) FROM STDIN WITH (FORMAT csv)"
+    # Raw DBAPI connection shares the session's transaction.
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute("CREATE TEMP TABLE user_memory_import (LIKE user_memory) ON COMMIT DROP")
+        if driver == "psycopg2":
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        cursor.execute("INSERT INTO user_memory (user_id, memory_json, updated_at) SELECT user_id, memory_json, updated_at FROM user_memory_import ON CONFLICT (user_id) DO NOTHING")
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _load_memory_file(memory_file: Path) -> tuple[str, dict | None, str | None]:
+    """Read and parse one memory file (runs in a worker process).
+
+    Returns:
+        ``(user_id, memory_data, error)`` where exactly one of
+        ``memory_data`` / ``error`` is set.
+    """
+    user_id = memory_file.stem  # filename without extension is user_id
+    try:
+        # Parse straight from the page cache instead of copying into a buffer.
+        # mmap rejects empty files with ValueError, which is reported like bad JSON.
+        with open(memory_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return user_id, orjson.loads(view), None
+    except (ValueError, OSError) as e:
+        return user_id, None, str(e)
+
+
 def migrate_users(store_dir: Path) -> dict[str, str]:
     """Migrate users from users.json to the users table.
 
@@ -50,30 +199,24 @@ def migrate_users(store_dir: Path) -> dict[str, str]:
         logger.info("No users.json found, skipping user migration")
         return {}
 
-    data = json.loads(users_file.read_text(encoding="utf-8"))
-    users = data.get("users", {})
-    migrated = 0
-    skipped = 0
+    user_ids: list[str] = []
 
-    for user_id, record in users.items():
-        with get_db_session() as session:
-            existing = session.query(UserModel).filter(UserModel.id == user_id).first()
-            if existing:
-                skipped += 1
-                continue
+    def rows() -> Iterator[dict]:
+        for user_id, record in _iter_json_object(users_file, "users"):
+            user_ids.append(user_id)
+            yield {
+                "id": record["id"],
+                "email": record["email"],
+                "password_hash": record["password_hash"],
+                "display_name": record.get("display_name"),
+                "created_at": datetime.fromisoformat(record["created_at"]) if record.get("created_at") else datetime.now(UTC),
+            }
 
-            user = UserModel(
-                id=record["id"],
-                email=record["email"],
-                password_hash=record["password_hash"],
-                display_name=record.get("display_name"),
-                created_at=datetime.fromisoformat(record["created_at"]) if record.get("created_at") else datetime.now(UTC),
-            )
-            session.add(user)
-            migrated += 1
+    with get_db_session() as session:
+        migrated, total = _insert_missing(session, UserModel, rows(), index_elements=["id"])
 
-    logger.info(f"Users: migrated {migrated}, skipped {skipped} (already exist)")
-    return {uid: uid for uid in users}
+    logger.info(f"Users: migrated {migrated}, skipped {total - migrated} (already exist)")
+    return {uid: uid for uid in user_ids}
 
 
 def migrate_threads(store_dir: Path) -> None:
@@ -86,65 +229,44 @@ def migrate_threads(store_dir: Path) -> None:
         logger.info("No thread-ownership.json found, skipping thread migration")
         return
 
-    data = json.loads(threads_file.read_text(encoding="utf-8"))
-    threads = data.get("threads", {})
-    migrated = 0
-    skipped = 0
+    rows = (
+        {
+            "thread_id": thread_id,
+            "user_id": entry["user_id"],
+            "created_at": datetime.fromisoformat(entry["created_at"]) if entry.get("created_at") else datetime.now(UTC),
+        }
+        for thread_id, entry in _iter_json_object(threads_file, "threads")
+    )
 
-    for thread_id, entry in threads.items():
-        with get_db_session() as session:
-            existing = session.query(ThreadModel).filter(ThreadModel.thread_id == thread_id).first()
-            if existing:
-                skipped += 1
-                continue
+    with get_db_session() as session:
+        migrated, total = _insert_missing(session, ThreadModel, rows, index_elements=["thread_id"])
 
-            thread = ThreadModel(
-                thread_id=thread_id,
-                user_id=entry["user_id"],
-                created_at=datetime.fromisoformat(entry["created_at"]) if entry.get("created_at") else datetime.now(UTC),
-            )
-            session.add(thread)
-            migrated += 1
-
-    logger.info(f"Threads: migrated {migrated}, skipped {skipped} (already exist)")
+    logger.info(f"Threads: migrated {migrated}, skipped {total - migrated} (already exist)")
 
 
 def migrate_memory(store_dir: Path) -> None:
     """Migrate per-user memory files from memory/ to the user_memory table."""
     from src.db.engine import get_db_session
-    from src.db.models import UserMemoryModel
 
     memory_dir = store_dir / "memory"
     if not memory_dir.exists():
         logger.info("No memory/ directory found, skipping memory migration")
         return
 
-    migrated = 0
-    skipped = 0
-
-    for memory_file in memory_dir.glob("*.json"):
-        user_id = memory_file.stem  # filename without extension is user_id
-
-        try:
-            memory_data = json.loads(memory_file.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError) as e:
-            logger.warning(f"Failed to read memory file {memory_file}: {e}")
-            continue
-
-        with get_db_session() as session:
-            existing = session.query(UserMemoryModel).filter(UserMemoryModel.user_id == user_id).first()
-            if existing:
-                skipped += 1
+    # JSON parsing dominates ingest time, so spread it across cores.
+    memory_files = list(memory_dir.glob("*.json"))
+    memories: dict[str, dict] = {}
+    with ProcessPoolExecutor() as executor:
+        for memory_file, (user_id, memory_data, error) in zip(memory_files, executor.map(_load_memory_file, memory_files, chunksize=16)):
+            if error is not None:
+                logger.warning(f"Failed to read memory file {memory_file}: {error}")
                 continue
+            memories[user_id] = memory_data
 
-            record = UserMemoryModel(
-                user_id=user_id,
-                memory_json=memory_data,
-            )
-            session.add(record)
-            migrated += 1
+    with get_db_session() as session:
+        migrated = _copy_memory_rows(session, list(memories.items()))
 
-    logger.info(f"Memory: migrated {migrated}, skipped {skipped} (already exist)")
+    logger.info(f"Memory: migrated {migrated}, skipped {len(memories) - migrated} (already exist)")
 
 
 def migrate_api_keys(store_dir: Path) -> None:
@@ -159,42 +281,24 @@ def migrate_api_keys(store_dir: Path) -> None:
         logger.info("No api-keys.json found, skipping API key migration")
         return
 
-    data = json.loads(keys_file.read_text(encoding="utf-8"))
-    users = data.get("users", data.get("devices", {}))
-    migrated = 0
-    skipped = 0
+    def rows() -> Iterator[dict]:
+        for user_id, providers in _iter_json_object(keys_file, "users", "devices"):
+            if not isinstance(providers, dict):
+                continue
 
-    for user_id, providers in users.items():
-        if not isinstance(providers, dict):
-            continue
+            for provider, encrypted_key in providers.items():
+                if isinstance(encrypted_key, str):
+                    yield {
+                        "id": uuid.uuid4().hex,
+                        "user_id": user_id,
+                        "provider": provider,
+                        "encrypted_key": encrypted_key,
+                    }
 
-        for provider, encrypted_key in providers.items():
-            if not isinstance(encrypted_key, str):
-                continue
+    with get_db_session() as session:
+        migrated, total = _insert_missing(session, UserApiKeyModel, rows(), index_elements=["user_id", "provider"])
 
-            with get_db_session() as session:
-                existing = (
-                    session.query(UserApiKeyModel)
-                    .filter(
-                        UserApiKeyModel.user_id == user_id,
-                        UserApiKeyModel.provider == provider,
-                    )
-                    .first()
-                )
-                if existing:
-                    skipped += 1
-                    continue
-
-                record = UserApiKeyModel(
-                    id=uuid.uuid4().hex,
-                    user_id=user_id,
-                    provider=provider,
-                    encrypted_key=encrypted_key,
-                )
-                session.add(record)
-                migrated += 1
-
-    logger.info(f"API Keys: migrated {migrated}, skipped {skipped} (already exist)")
+    logger.info(f"API Keys: migrated {migrated}, skipped {total - migrated} (already exist)")
 
 
 def main() -> None:
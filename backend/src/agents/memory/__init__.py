@@ -11,10 +11,12 @@ from src.agents.memory.prompt import (
     MEMORY_UPDATE_PROMPT,
     format_conversation_for_update,
     format_memory_for_injection,
+    format_memory_update_prompt,
 )
 from src.agents.memory.queue import (
     ConversationContext,
     MemoryUpdateQueue,
+    flush_memory_queue,
     get_memory_queue,
     reset_memory_queue,
 )
@@ -31,9 +33,11 @@ __all__ = [
     "FACT_EXTRACTION_PROMPT",
     "format_memory_for_injection",
     "format_conversation_for_update",
+    "format_memory_update_prompt",
     # Queue
     "ConversationContext",
     "MemoryUpdateQueue",
+    "flush_memory_queue",
     "get_memory_queue",
     "reset_memory_queue",
     # Updater
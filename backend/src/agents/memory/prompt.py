@@ -1,6 +1,7 @@
 """Prompt templates for memory update and injection."""
 
 import re
+from string import Formatter
 from typing import Any
 
 try:
@@ -116,6 +117,31 @@ Important Rules:
 Return ONLY valid JSON, no explanation or markdown."""
 
 
+# MEMORY_UPDATE_PROMPT split once into literal text (braces already unescaped)
+# and field names, so each update joins strings instead of re-parsing the
+# multi-KB template with str.format.
+_MEMORY_UPDATE_PROMPT_PARTS: tuple[tuple[str, str | None], ...] = tuple((literal, field) for literal, field, _, _ in Formatter().parse(MEMORY_UPDATE_PROMPT))
+
+
+def format_memory_update_prompt(current_memory: str, conversation: str) -> str:
+    """Fill MEMORY_UPDATE_PROMPT; equivalent to ``MEMORY_UPDATE_PROMPT.format(...)``.
+
+    Args:
+        current_memory: The current memory serialized as JSON.
+        conversation: The formatted conversation text.
+
+    Returns:
+        The complete memory update prompt.
+    """
+    values = {"current_memory": current_memory, "conversation": conversation}
+    parts: list[str] = []
+    for literal, field in _MEMORY_UPDATE_PROMPT_PARTS:
+        parts.append(literal)
+        if field is not None:
+            parts.append(values[field])
+    return "".join(parts)
+
+
 # Prompt template for extracting facts from a single message
 FACT_EXTRACTION_PROMPT = """Extract factual information about the user from this message.
 
@@ -1,7 +1,8 @@
 """Memory update queue with debounce mechanism.
 
 Supports dual-mode operation:
-- In-process queue (default): Uses threading.Timer for debounce within a single process.
+- In-process queue (default): Uses a single worker thread waiting on a monotonic
+  deadline for debounce within a single process.
 - Redis-backed queue: Uses RQ with delayed jobs for distributed processing across instances.
 
 The mode is selected automatically based on whether REDIS_URL is configured.
@@ -10,10 +11,15 @@ The mode is selected automatically based on whether REDIS_URL is configured.
 import logging
 import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
 
+import orjson
+from rq.job import Job, JobStatus
+
 from src.config.memory_config import get_memory_config
 
 logger = logging.getLogger(__name__)
@@ -22,14 +28,15 @@ logger = logging.getLogger(__name__)
 DEFAULT_USER_ID = "local"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationContext:
     """Context for a conversation to be processed for memory update."""
 
     user_id: str = DEFAULT_USER_ID
     thread_id: str = ""
     messages: list[Any] = field(default_factory=list)
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    # Not read by the queue; left unset so enqueueing does not hit the clock.
+    timestamp: datetime | None = None
 
 
 class MemoryUpdateQueue:
@@ -42,10 +49,17 @@ class MemoryUpdateQueue:
 
     def __init__(self):
         """Initialize the memory update queue."""
-        self._queue: list[ConversationContext] = []
+        # Keyed by (user_id, thread_id) so re-queuing a thread replaces its
+        # pending context in O(1) (moving it to the back, as before).
+        self._queue: dict[tuple[str, str], ConversationContext] = {}
         self._lock = threading.Lock()
-        self._timer: threading.Timer | None = None
+        self._cond = threading.Condition(self._lock)
+        # Monotonic time at which the queue should be processed; None when idle.
+        self._deadline: float | None = None
+        self._worker: threading.Thread | None = None
         self._processing = False
+        # Created on first flush and reused for the lifetime of the queue
+        self._updater: Any = None
 
     def add(
         self,
@@ -72,31 +86,50 @@ class MemoryUpdateQueue:
 
         with self._lock:
             # Deduplicate by (user_id, thread_id): replace existing entry
-            self._queue = [c for c in self._queue if not (c.user_id == user_id and c.thread_id == thread_id)]
-            self._queue.append(context)
+            self._queue.pop((user_id, thread_id), None)
+            self._queue[(user_id, thread_id)] = context
 
-            # Reset or start the debounce timer
-            self._reset_timer()
+            # Push out the debounce deadline
+            self._reset_deadline()
 
         logger.info(f"Memory update queued for user {user_id}, thread {thread_id}, queue size: {len(self._queue)}")
 
-    def _reset_timer(self) -> None:
-        """Reset the debounce timer."""
+    def _reset_deadline(self) -> None:
+        """Push the debounce deadline out and wake the worker.
+
+        Must be called with ``self._lock`` held. The worker thread is only
+        started when none is running, so a burst of adds moves a single
+        deadline instead of spawning a timer thread per add.
+        """
         config = get_memory_config()
 
-        # Cancel existing timer if any
-        if self._timer is not None:
-            self._timer.cancel()
+        self._deadline = time.monotonic() + config.debounce_seconds
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="memory-update-debounce", daemon=True)
+            self._worker.start()
+        else:
+            self._cond.notify()
 
-        # Start new timer
-        self._timer = threading.Timer(
-            config.debounce_seconds,
-            self._process_queue,
-        )
-        self._timer.daemon = True
-        self._timer.start()
+        logger.debug(f"Memory update deadline set for {config.debounce_seconds}s")
 
-        logger.debug(f"Memory update timer set for {config.debounce_seconds}s")
+    def _run(self) -> None:
+        """Worker loop: wait for the debounce deadline, then process the queue.
+
+        Exits once no deadline is pending; the next add starts a new worker.
+        """
+        while True:
+            with self._cond:
+                while self._deadline is not None and (remaining := self._deadline - time.monotonic()) > 0:
+                    self._cond.wait(timeout=remaining)
+                if self._deadline is None:
+                    self._worker = None
+                    return
+                self._deadline = None
+
+            try:
+                self._process_queue()
+            except Exception as e:
+                logger.error(f"Memory update queue processing failed: {e}")
 
     def _process_queue(self) -> None:
         """Process all queued conversation contexts."""
@@ -106,54 +139,64 @@ class MemoryUpdateQueue:
         with self._lock:
             if self._processing:
                 # Already processing, reschedule
-                self._reset_timer()
+                self._reset_deadline()
                 return
 
             if not self._queue:
                 return
 
             self._processing = True
-            contexts_to_process = self._queue.copy()
+            contexts_to_process = list(self._queue.values())
             self._queue.clear()
-            self._timer = None
 
         logger.info(f"Processing {len(contexts_to_process)} queued memory updates")
 
+        # Updates for one user rewrite the same memory document, so they run
+        # sequentially; different users are updated in parallel.
+        contexts_by_user: dict[str, list[ConversationContext]] = {}
+        for context in contexts_to_process:
+            contexts_by_user.setdefault(context.user_id, []).append(context)
+
         try:
-            updater = MemoryUpdater()
-
-            for context in contexts_to_process:
-                try:
-                    logger.info(f"Updating memory for user {context.user_id}, thread {context.thread_id}")
-                    success = updater.update_memory(
-                        messages=context.messages,
-                        thread_id=context.thread_id,
-                        user_id=context.user_id,
-                    )
-                    if success:
-                        logger.info(f"Memory updated successfully for user {context.user_id}, thread {context.thread_id}")
-                    else:
-                        logger.info(f"Memory update skipped/failed for user {context.user_id}, thread {context.thread_id}")
-                except Exception as e:
-                    logger.error(f"Error updating memory for user {context.user_id}, thread {context.thread_id}: {e}")
-
-                # Small delay between updates to avoid rate limiting
-                if len(contexts_to_process) > 1:
-                    time.sleep(0.5)
+            if self._updater is None:
+                self._updater = MemoryUpdater()
+            updater = self._updater
+            max_workers = min(get_memory_config().max_concurrent_updates, len(contexts_by_user))
+
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-update") as executor:
+                for user_contexts in contexts_by_user.values():
+                    executor.submit(self._update_user_contexts, updater, user_contexts)
 
         finally:
             with self._lock:
                 self._processing = False
 
+    @staticmethod
+    def _update_user_contexts(updater: Any, contexts: list[ConversationContext]) -> None:
+        """Apply one user's queued conversation contexts in order."""
+        for context in contexts:
+            try:
+                logger.info(f"Updating memory for user {context.user_id}, thread {context.thread_id}")
+                success = updater.update_memory(
+                    messages=context.messages,
+                    thread_id=context.thread_id,
+                    user_id=context.user_id,
+                )
+                if success:
+                    logger.info(f"Memory updated successfully for user {context.user_id}, thread {context.thread_id}")
+                else:
+                    logger.info(f"Memory update skipped/failed for user {context.user_id}, thread {context.thread_id}")
+            except Exception as e:
+                logger.error(f"Error updating memory for user {context.user_id}, thread {context.thread_id}: {e}")
+
     def flush(self) -> None:
         """Force immediate processing of the queue.
 
         This is useful for testing or graceful shutdown.
         """
-        with self._lock:
-            if self._timer is not None:
-                self._timer.cancel()
-                self._timer = None
+        with self._cond:
+            self._deadline = None
+            self._cond.notify()
 
         self._process_queue()
 
@@ -162,10 +205,9 @@ class MemoryUpdateQueue:
 
         This is useful for testing.
         """
-        with self._lock:
-            if self._timer is not None:
-                self._timer.cancel()
-                self._timer = None
+        with self._cond:
+            self._deadline = None
+            self._cond.notify()
             self._queue.clear()
             self._processing = False
 
@@ -190,6 +232,8 @@ class RedisMemoryUpdateQueue:
     behavior of the in-process queue while working across multiple instances.
     """
 
+    MAX_TRACKED_JOBS = 100_000
+
     def __init__(self):
         """Initialize the Redis-backed memory update queue."""
         from rq import Queue as RQQueue
@@ -198,8 +242,11 @@ class RedisMemoryUpdateQueue:
 
         self._redis = get_redis_client()
         self._rq_queue = RQQueue("memory_updates", connection=self._redis)
-        # Track pending jobs for debounce cancellation: (user_id, thread_id) -> job_id
-        self._pending_jobs: dict[tuple[str, str], str] = {}
+        # Track pending jobs for debounce cancellation: (user_id, thread_id) -> job_id.
+        # Entries are never confirmed complete (jobs finish in worker processes),
+        # so this is an LRU capped at MAX_TRACKED_JOBS; evicting an old entry only
+        # means its job, if still pending, is not cancelled by a later add.
+        self._pending_jobs: OrderedDict[tuple[str, str], str] = OrderedDict()
         self._lock = threading.Lock()
 
     def add(
@@ -230,15 +277,8 @@ class RedisMemoryUpdateQueue:
             # Cancel existing pending job for this (user_id, thread_id)
             existing_job_id = self._pending_jobs.get(key)
             if existing_job_id:
-                try:
-                    from rq.job import Job
-
-                    job = Job.fetch(existing_job_id, connection=self._redis)
-                    if job.get_status() in ("queued", "deferred", "scheduled"):
-                        job.cancel()
-                        logger.debug(f"Cancelled pending memory update job {existing_job_id} for user {user_id}, thread {thread_id}")
-                except Exception:
-                    pass  # Job already processed or expired
+                self._cancel_jobs([existing_job_id])
+                logger.debug(f"Cancelled pending memory update job {existing_job_id} for user {user_id}, thread {thread_id}")
 
             # Enqueue new job with debounce delay
             job = self._rq_queue.enqueue_in(
@@ -250,28 +290,35 @@ class RedisMemoryUpdateQueue:
                 job_timeout=120,
             )
             self._pending_jobs[key] = job.id
+            self._pending_jobs.move_to_end(key)
+            if len(self._pending_jobs) > self.MAX_TRACKED_JOBS:
+                self._pending_jobs.popitem(last=False)
 
         logger.info(f"Memory update queued (Redis) for user {user_id}, thread {thread_id}")
 
     @staticmethod
-    def _serialize_messages(messages: list[Any]) -> list[dict[str, Any]]:
-        """Serialize LangChain message objects to JSON-safe dicts.
+    def _serialize_messages(messages: list[Any]) -> bytes:
+        """Serialize LangChain message objects to a JSON array payload.
+
+        Pydantic messages are dumped straight to JSON with ``model_dump_json``
+        instead of building intermediate dicts, and the job carries the
+        resulting bytes rather than a nested list for RQ to pickle.
 
         Args:
             messages: List of messages (LangChain objects or plain dicts).
 
         Returns:
-            List of JSON-serializable dictionaries.
+            UTF-8 encoded JSON array of message objects.
         """
-        result = []
+        parts = []
         for msg in messages:
-            if hasattr(msg, "model_dump"):
-                result.append(msg.model_dump())
+            if hasattr(msg, "model_dump_json"):
+                parts.append(msg.model_dump_json().encode())
             elif isinstance(msg, dict):
-                result.append(msg)
+                parts.append(orjson.dumps(msg, default=str))
             else:
-                result.append({"type": type(msg).__name__, "content": str(msg)})
-        return result
+                parts.append(orjson.dumps({"type": type(msg).__name__, "content": str(msg)}))
+        return b"[" + b",".join(parts) + b"]"
 
     @property
     def pending_count(self) -> int:
@@ -285,20 +332,56 @@ class RedisMemoryUpdateQueue:
         return False
 
     def flush(self) -> None:
-        """Not applicable for Redis queue -- jobs are processed by workers."""
-        pass
+        """Promote this instance's still-scheduled jobs to the ready queue.
+
+        Jobs are still processed by workers; this only skips the remaining
+        debounce delay, e.g. on graceful shutdown. Promoted jobs are no
+        longer tracked, so a later add does not cancel them.
+        """
+        with self._lock:
+            job_ids = list(self._pending_jobs.values())
+            self._pending_jobs.clear()
+
+        if not job_ids:
+            return
+
+        try:
+            registry = self._rq_queue.scheduled_job_registry
+            with self._redis.pipeline() as pipe:
+                for job in Job.fetch_many(job_ids, connection=self._redis):
+                    if job is not None and job.get_status(refresh=False) == JobStatus.SCHEDULED:
+                        self._rq_queue.enqueue_job(job, pipeline=pipe)
+                        registry.remove(job, pipeline=pipe)
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to promote scheduled memory update jobs: {e}")
+
+    def _cancel_jobs(self, job_ids: list[str]) -> None:
+        """Drop pending jobs in at most two round-trips.
+
+        Removes each id from the scheduled registry and the ready queue,
+        without fetching the job first, then deletes the hashes of only those
+        jobs one of the removals found. A job a worker has already dequeued is
+        in neither, so its hash is left alone while it runs.
+        """
+        try:
+            registry_key = self._rq_queue.scheduled_job_registry.key
+            pipe = self._redis.pipeline()
+            for job_id in job_ids:
+                pipe.zrem(registry_key, job_id)
+                pipe.lrem(self._rq_queue.key, 0, job_id)
+            results = pipe.execute()
+            removed = [Job.key_for(job_id) for job_id, zremoved, lremoved in zip(job_ids, results[0::2], results[1::2]) if zremoved or lremoved]
+            if removed:
+                self._redis.delete(*removed)
+        except Exception as e:
+            logger.warning(f"Failed to cancel pending memory update jobs: {e}")
 
     def clear(self) -> None:
         """Cancel all pending jobs."""
         with self._lock:
-            for job_id in self._pending_jobs.values():
-                try:
-                    from rq.job import Job
-
-                    job = Job.fetch(job_id, connection=self._redis)
-                    job.cancel()
-                except Exception:
-                    pass
+            if self._pending_jobs:
+                self._cancel_jobs(list(self._pending_jobs.values()))
             self._pending_jobs.clear()
 
 
@@ -330,6 +413,19 @@ def get_memory_queue() -> MemoryUpdateQueue | RedisMemoryUpdateQueue:
         return _memory_queue
 
 
+def flush_memory_queue() -> None:
+    """Flush the global memory queue if one has been created.
+
+    Intended for process shutdown: it never creates a queue (or a Redis
+    connection) just to flush it.
+    """
+    with _queue_lock:
+        queue = _memory_queue
+
+    if queue is not None:
+        queue.flush()
+
+
 def reset_memory_queue() -> None:
     """Reset the global memory queue.
 
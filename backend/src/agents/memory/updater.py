@@ -4,22 +4,34 @@ Supports dual-mode storage: PostgreSQL (when DATABASE_URL is set)
 or file-based (local / Electron dev).
 """
 
+import heapq
 import json
 import logging
+import os
 import re
+import sys
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from src.agents.memory.prompt import (
-    MEMORY_UPDATE_PROMPT,
     format_conversation_for_update,
+    format_memory_update_prompt,
 )
+from src.config.app_config import get_app_config
 from src.config.memory_config import get_memory_config
 from src.config.paths import get_paths
 from src.models import create_chat_model
 
+if sys.platform == "darwin":
+    import fcntl
+
 logger = logging.getLogger(__name__)
 
 # Default user ID for backward compatibility (Electron single-user mode)
@@ -29,18 +41,29 @@ DEFAULT_USER_ID = "local"
 # ---------------------------------------------------------------------------
 # File-based memory storage
 # ---------------------------------------------------------------------------
+# Resolved memory file path per user: { user_id: path }. Evicted together with
+# the user's cached memory.
+_memory_file_path_cache: dict[str, Path] = {}
+# Directories already created by _save_memory_to_file in this process
+_ensured_dirs: set[Path] = set()
+
+
 def _get_memory_file_path(user_id: str = DEFAULT_USER_ID) -> Path:
     """Get the path to the user-specific memory file.
 
     Args:
         user_id: The user identifier. Defaults to "local" for backward compat.
 
+    The directory is not created here; ``_save_memory_to_file`` creates it on
+    first write so that reads never touch the filesystem beyond a ``stat()``.
+
     Returns:
         Path to the user's memory JSON file.
     """
-    base_dir = get_paths().base_dir / "memory"
-    base_dir.mkdir(parents=True, exist_ok=True)
-    return base_dir / f"{user_id}.json"
+    path = _memory_file_path_cache.get(user_id)
+    if path is None:
+        path = _memory_file_path_cache[user_id] = get_paths().base_dir / "memory" / f"{user_id}.json"
+    return path
 
 
 def _create_empty_memory() -> dict[str, Any]:
@@ -62,10 +85,56 @@ def _create_empty_memory() -> dict[str, Any]:
     }
 
 
-# Per-user memory data cache: { user_id: memory_dict }
-_memory_data: dict[str, dict[str, Any]] = {}
+# Per-user memory data cache: { user_id: memory_dict }. An LRU capped at
+# memory.cache_max_users; evicting a user drops all of its per-user entries.
+_memory_data: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_memory_cache_lock = threading.Lock()
 # Per-user file modification time tracking: { user_id: mtime }
 _memory_file_mtime: dict[str, float | None] = {}
+# Per-user monotonic time of the last mtime check: { user_id: timestamp }
+_memory_cache_check_ts: dict[str, float] = {}
+# Per-user indented JSON of the cached memory dict, reused when building the
+# update prompt: { user_id: (memory_dict, json_text) }. Entries are tied to the
+# dict's identity and dropped whenever that user's memory is saved.
+_memory_json_cache: dict[str, tuple[dict[str, Any], str]] = {}
+
+
+def _get_cached_memory(user_id: str) -> dict[str, Any] | None:
+    """Return the cached memory for a user, marking it most recently used."""
+    with _memory_cache_lock:
+        memory = _memory_data.get(user_id)
+        if memory is not None:
+            _memory_data.move_to_end(user_id)
+        return memory
+
+
+def _set_cached_memory(user_id: str, memory_data: dict[str, Any]) -> None:
+    """Cache memory for a user, evicting the least recently used users over the cap."""
+    with _memory_cache_lock:
+        _memory_data[user_id] = memory_data
+        _memory_data.move_to_end(user_id)
+        limit = get_memory_config().cache_max_users
+        while len(_memory_data) > limit:
+            evicted, _ = _memory_data.popitem(last=False)
+            _memory_file_mtime.pop(evicted, None)
+            _memory_cache_check_ts.pop(evicted, None)
+            _memory_json_cache.pop(evicted, None)
+            _memory_file_path_cache.pop(evicted, None)
+
+
+def _cache_is_fresh(user_id: str, now: float) -> bool:
+    """Whether the cached copy was checked against storage within cache_check_seconds."""
+    return now - _memory_cache_check_ts.get(user_id, float("-inf")) < get_memory_config().cache_check_seconds
+
+
+def _memory_json_for_prompt(user_id: str, memory_data: dict[str, Any]) -> str:
+    """Return memory_data as indented JSON, reusing the cached text if current."""
+    cached = _memory_json_cache.get(user_id)
+    if cached is not None and cached[0] is memory_data:
+        return cached[1]
+    text = orjson.dumps(memory_data, option=orjson.OPT_INDENT_2).decode()
+    _memory_json_cache[user_id] = (memory_data, text)
+    return text
 
 
 def _load_memory_from_file(user_id: str = DEFAULT_USER_ID) -> dict[str, Any]:
@@ -79,14 +148,11 @@ def _load_memory_from_file(user_id: str = DEFAULT_USER_ID) -> dict[str, Any]:
     """
     file_path = _get_memory_file_path(user_id)
 
-    if not file_path.exists():
-        return _create_empty_memory()
-
     try:
-        with open(file_path, encoding="utf-8") as f:
-            data = json.load(f)
-        return data
-    except (json.JSONDecodeError, OSError) as e:
+        return orjson.loads(file_path.read_bytes())
+    except FileNotFoundError:
+        return _create_empty_memory()
+    except (orjson.JSONDecodeError, OSError) as e:
         logger.warning(f"Failed to load memory file for user {user_id}: {e}")
         return _create_empty_memory()
 
@@ -110,15 +176,19 @@ def _strip_upload_mentions_from_memory(memory_data: dict[str, Any]) -> dict[str,
 
     Uploaded files are session-scoped; persisting upload events in long-term
     memory causes the agent to search for non-existent files in future sessions.
+
+    Section and entry dicts are replaced rather than edited, so nested dicts
+    shared with the cached memory are never modified.
     """
     # Scrub summaries in user/history sections
     for section in ("user", "history"):
-        section_data = memory_data.get(section, {})
-        for _key, val in section_data.items():
+        section_data = dict(memory_data.get(section, {}))
+        for key, val in section_data.items():
             if isinstance(val, dict) and "summary" in val:
                 cleaned = _UPLOAD_SENTENCE_RE.sub("", val["summary"]).strip()
                 cleaned = re.sub(r"  +", " ", cleaned)
-                val["summary"] = cleaned
+                section_data[key] = {**val, "summary": cleaned}
+        memory_data[section] = section_data
 
     # Also remove any facts that describe upload events
     facts = memory_data.get("facts", [])
@@ -132,140 +202,236 @@ def _strip_upload_mentions_from_memory(memory_data: dict[str, Any]) -> dict[str,
     return memory_data
 
 
-def _save_memory_to_file(user_id: str, memory_data: dict[str, Any]) -> bool:
+def _fsync(fd: int) -> None:
+    """Flush a file descriptor to stable storage.
+
+    On macOS ``fsync()`` only reaches the drive cache, so ``F_FULLFSYNC`` is
+    used when available.
+    """
+    if sys.platform == "darwin":
+        try:
+            fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+            return
+        except OSError:
+            pass
+    os.fsync(fd)
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist a rename by syncing the containing directory (no-op where unsupported)."""
+    try:
+        dir_fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        _fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def _write_memory_file(file_path: Path, payload: bytes) -> None:
+    """Write a serialized memory file, atomically unless the storage already is."""
+    if get_memory_config().storage_is_atomic:
+        # The storage backend already publishes whole writes atomically
+        with open(file_path, "wb") as f:
+            f.write(payload)
+        return
+
+    # Write atomically using temp file, syncing the data before the rename so
+    # a crash can never leave a renamed but empty file behind
+    temp_path = file_path.with_suffix(".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        _fsync(f.fileno())
+
+    # Rename temp file to actual file (atomic on most systems), then sync the
+    # directory so the rename itself survives a crash
+    temp_path.replace(file_path)
+    _fsync_dir(file_path.parent)
+
+
+def _save_memory_to_file(user_id: str, memory_data: dict[str, Any], timestamp: str | None = None) -> bool:
     """Save memory data to file and update cache.
 
+    By default the data is written to a temp file that is fsynced and then
+    renamed over the target, so readers never observe a partial file. When
+    ``memory.storage_is_atomic`` is set (object-store or other mounts whose
+    writes already replace the whole object atomically) the temp file and
+    rename are skipped and the target is written directly.
+
     Args:
         user_id: The user identifier.
         memory_data: The memory data to save.
+        timestamp: ISO-8601 time to record as lastUpdated. Defaults to now.
 
     Returns:
         True if successful, False otherwise.
     """
     file_path = _get_memory_file_path(user_id)
+    _memory_json_cache.pop(user_id, None)
 
     try:
-        # Ensure directory exists
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Ensure directory exists (once per process)
+        memory_dir = file_path.parent
+        if memory_dir not in _ensured_dirs:
+            memory_dir.mkdir(parents=True, exist_ok=True)
+            _ensured_dirs.add(memory_dir)
 
         # Update lastUpdated timestamp
-        memory_data["lastUpdated"] = datetime.now(UTC).isoformat()
+        memory_data["lastUpdated"] = timestamp or datetime.now(UTC).isoformat()
 
-        # Write atomically using temp file
-        temp_path = file_path.with_suffix(".tmp")
-        with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(memory_data, f, indent=2, ensure_ascii=False)
+        payload = orjson.dumps(memory_data, option=orjson.OPT_INDENT_2)
 
-        # Rename temp file to actual file (atomic on most systems)
-        temp_path.replace(file_path)
+        try:
+            _write_memory_file(file_path, payload)
+        except FileNotFoundError:
+            # The directory was removed after it was created; recreate it and
+            # retry once so this update is not lost
+            memory_dir.mkdir(parents=True, exist_ok=True)
+            _write_memory_file(file_path, payload)
 
         # Update cache and file modification time
-        _memory_data[user_id] = memory_data
+        _set_cached_memory(user_id, memory_data)
         try:
             _memory_file_mtime[user_id] = file_path.stat().st_mtime
         except OSError:
             _memory_file_mtime[user_id] = None
+        _memory_cache_check_ts[user_id] = time.monotonic()
+        # The file holds exactly what the next update prompt needs
+        _memory_json_cache[user_id] = (memory_data, payload.decode())
 
         logger.info(f"Memory saved for user {user_id} to {file_path}")
         return True
     except OSError as e:
+        # Make the next save check the directory again
+        _ensured_dirs.discard(file_path.parent)
         logger.error(f"Failed to save memory file for user {user_id}: {e}")
         return False
 
 
 def _file_get_memory_data(user_id: str) -> dict[str, Any]:
-    """Get memory data from file with caching."""
+    """Get memory data from file with caching.
+
+    The file's mtime is re-checked at most once every
+    ``cache_check_seconds``; within that window the cached copy is returned
+    without any filesystem access.
+    """
+    cached = _get_cached_memory(user_id)
+    now = time.monotonic()
+    if cached is not None and _cache_is_fresh(user_id, now):
+        return cached
+
     file_path = _get_memory_file_path(user_id)
 
     # Get current file modification time
     try:
-        current_mtime = file_path.stat().st_mtime if file_path.exists() else None
+        current_mtime = file_path.stat().st_mtime
     except OSError:
         current_mtime = None
 
     # Invalidate cache if file has been modified or doesn't exist
-    cached = _memory_data.get(user_id)
     cached_mtime = _memory_file_mtime.get(user_id)
     if cached is None or cached_mtime != current_mtime:
-        _memory_data[user_id] = _load_memory_from_file(user_id)
+        cached = _load_memory_from_file(user_id)
+        _set_cached_memory(user_id, cached)
         _memory_file_mtime[user_id] = current_mtime
+    _memory_cache_check_ts[user_id] = now
 
-    return _memory_data[user_id]
+    return cached
 
 
 def _file_reload_memory_data(user_id: str) -> dict[str, Any]:
     """Reload memory data from file, forcing cache invalidation."""
     file_path = _get_memory_file_path(user_id)
-    _memory_data[user_id] = _load_memory_from_file(user_id)
+    memory = _load_memory_from_file(user_id)
+    _set_cached_memory(user_id, memory)
 
     try:
-        _memory_file_mtime[user_id] = file_path.stat().st_mtime if file_path.exists() else None
+        _memory_file_mtime[user_id] = file_path.stat().st_mtime
     except OSError:
         _memory_file_mtime[user_id] = None
+    _memory_cache_check_ts[user_id] = time.monotonic()
 
-    return _memory_data[user_id]
+    return memory
 
 
 # ---------------------------------------------------------------------------
 # Database-backed memory storage
 # ---------------------------------------------------------------------------
 def _db_get_memory_data(user_id: str) -> dict[str, Any]:
-    """Get memory data from database with in-memory caching."""
+    """Get memory data from database with in-memory caching.
+
+    The cached copy is re-read after ``cache_check_seconds`` so writes made by
+    other processes (gunicorn workers, RQ workers) are picked up.
+    """
     # Check in-memory cache first
-    cached = _memory_data.get(user_id)
-    if cached is not None:
+    cached = _get_cached_memory(user_id)
+    now = time.monotonic()
+    if cached is not None and _cache_is_fresh(user_id, now):
         return cached
 
     from src.db.engine import get_db_session
     from src.db.models import UserMemoryModel
 
     with get_db_session() as session:
-        record = session.query(UserMemoryModel).filter(UserMemoryModel.user_id == user_id).first()
+        record = session.get(UserMemoryModel, user_id)
         if record and record.memory_json:
             memory = record.memory_json
         else:
             memory = _create_empty_memory()
 
-    _memory_data[user_id] = memory
+    _set_cached_memory(user_id, memory)
+    _memory_cache_check_ts[user_id] = now
     return memory
 
 
 def _db_reload_memory_data(user_id: str) -> dict[str, Any]:
     """Reload memory data from database, forcing cache invalidation."""
     # Clear cache to force re-read
-    _memory_data.pop(user_id, None)
+    with _memory_cache_lock:
+        _memory_data.pop(user_id, None)
     return _db_get_memory_data(user_id)
 
 
-def _db_save_memory(user_id: str, memory_data: dict[str, Any]) -> bool:
+def _db_save_memory(user_id: str, memory_data: dict[str, Any], timestamp: str | None = None) -> bool:
     """Save memory data to database.
 
     Args:
         user_id: The user identifier.
         memory_data: The memory data to save.
+        timestamp: ISO-8601 time to record as lastUpdated. Defaults to now.
 
     Returns:
         True if successful, False otherwise.
     """
+    from sqlalchemy.dialects import postgresql, sqlite
+
     from src.db.engine import get_db_session
     from src.db.models import UserMemoryModel
 
+    _memory_json_cache.pop(user_id, None)
+
     try:
-        memory_data["lastUpdated"] = datetime.now(UTC).isoformat()
+        now = datetime.fromisoformat(timestamp) if timestamp else datetime.now(UTC)
+        memory_data["lastUpdated"] = timestamp or now.isoformat()
 
         with get_db_session() as session:
-            record = session.query(UserMemoryModel).filter(UserMemoryModel.user_id == user_id).first()
-            if record:
-                record.memory_json = memory_data
-            else:
-                record = UserMemoryModel(
-                    user_id=user_id,
-                    memory_json=memory_data,
-                )
-                session.add(record)
+            # Single-round-trip upsert instead of SELECT-then-INSERT/UPDATE.
+            # SQLite (used by the test suite) shares the ON CONFLICT syntax.
+            insert = sqlite.insert if session.get_bind().dialect.name == "sqlite" else postgresql.insert
+            stmt = insert(UserMemoryModel).values(user_id=user_id, memory_json=memory_data, updated_at=now)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserMemoryModel.user_id],
+                set_={"memory_json": stmt.excluded.memory_json, "updated_at": stmt.excluded.updated_at},
+            )
+            session.execute(stmt)
 
         # Update cache
-        _memory_data[user_id] = memory_data
+        _set_cached_memory(user_id, memory_data)
+        _memory_cache_check_ts[user_id] = time.monotonic()
         logger.info(f"Memory saved for user {user_id} to database")
         return True
     except Exception as e:
@@ -308,12 +474,13 @@ def reload_memory_data(user_id: str = DEFAULT_USER_ID) -> dict[str, Any]:
     return _file_reload_memory_data(user_id)
 
 
-def _save_memory(user_id: str, memory_data: dict[str, Any]) -> bool:
+def _save_memory(user_id: str, memory_data: dict[str, Any], timestamp: str | None = None) -> bool:
     """Save memory data to the appropriate backend.
 
     Args:
         user_id: The user identifier.
         memory_data: The memory data to save.
+        timestamp: ISO-8601 time to record as lastUpdated. Defaults to now.
 
     Returns:
         True if successful, False otherwise.
@@ -321,8 +488,77 @@ def _save_memory(user_id: str, memory_data: dict[str, Any]) -> bool:
     from src.db.engine import is_db_enabled
 
     if is_db_enabled():
-        return _db_save_memory(user_id, memory_data)
-    return _save_memory_to_file(user_id, memory_data)
+        return _db_save_memory(user_id, memory_data, timestamp)
+    return _save_memory_to_file(user_id, memory_data, timestamp)
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a surrounding markdown code fence (```json ... ```) if present."""
+    if not text.startswith("```"):
+        return text
+    # Drop the opening fence line and, if present, the closing fence line
+    _, _, body = text.partition("\n")
+    return body.removesuffix("\n```")
+
+
+# Chat models for memory updates, keyed by (model_name, thinking_enabled) and
+# tied to the AppConfig they were built from. reload_app_config() installs a new
+# AppConfig, so the next lookup drops every client built from the old one.
+_chat_models: dict[tuple[str | None, bool], Any] = {}
+_chat_models_config: Any = None
+_chat_models_lock = threading.Lock()
+
+
+def _cached_chat_model(model_name: str | None, thinking_enabled: bool):
+    """Build a chat model once per (model_name, thinking_enabled) and app config.
+
+    Chat model clients hold their own HTTP session and are safe to share
+    across the queue's worker threads.
+    """
+    global _chat_models_config
+    app_config = get_app_config()
+    key = (model_name, thinking_enabled)
+    with _chat_models_lock:
+        if _chat_models_config is not app_config:
+            _chat_models.clear()
+            _chat_models_config = app_config
+        model = _chat_models.get(key)
+        if model is None:
+            model = create_chat_model(name=model_name, thinking_enabled=thinking_enabled)
+            _chat_models[key] = model
+        return model
+
+
+# memory_updates_total children keyed by success, resolved on first use.
+# src.gateway cannot be imported at module load: its package imports the app,
+# whose routers import this module.
+_update_counters: dict[bool, Any] | None = None
+
+
+def _record_update_result(success: bool) -> None:
+    """Increment memory_updates_total for a finished update; never raises."""
+    global _update_counters
+    if _update_counters is None:
+        try:
+            from src.gateway.metrics import memory_updates_total
+
+            _update_counters = {
+                True: memory_updates_total.labels(status="success"),
+                False: memory_updates_total.labels(status="failure"),
+            }
+        except Exception:
+            _update_counters = {}
+    counter = _update_counters.get(success)
+    if counter is not None:
+        try:
+            counter.inc()
+        except Exception:
+            pass
+
+
+def _fact_confidence(fact: dict[str, Any]) -> float:
+    """Sort key for trimming facts; facts without a confidence rank last."""
+    return fact.get("confidence", 0)
 
 
 class MemoryUpdater:
@@ -338,9 +574,8 @@ class MemoryUpdater:
 
     def _get_model(self):
         """Get the model for memory updates."""
-        config = get_memory_config()
-        model_name = self._model_name or config.model_name
-        return create_chat_model(name=model_name, thinking_enabled=False)
+        model_name = self._model_name or get_memory_config().model_name
+        return _cached_chat_model(model_name, False)
 
     def update_memory(
         self,
@@ -358,8 +593,7 @@ class MemoryUpdater:
         Returns:
             True if update was successful, False otherwise.
         """
-        config = get_memory_config()
-        if not config.enabled:
+        if not get_memory_config().enabled:
             return False
 
         if not messages:
@@ -376,8 +610,8 @@ class MemoryUpdater:
                 return False
 
             # Build prompt
-            prompt = MEMORY_UPDATE_PROMPT.format(
-                current_memory=json.dumps(current_memory, indent=2),
+            prompt = format_memory_update_prompt(
+                current_memory=_memory_json_for_prompt(user_id, current_memory),
                 conversation=conversation_text,
             )
 
@@ -387,15 +621,13 @@ class MemoryUpdater:
             response_text = str(response.content).strip()
 
             # Parse response
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
+            update_data = json.loads(_strip_code_fence(response_text))
 
-            update_data = json.loads(response_text)
+            # One timestamp for the updated sections, new facts and lastUpdated
+            now = datetime.now(UTC).isoformat()
 
             # Apply updates
-            updated_memory = self._apply_updates(current_memory, update_data, thread_id)
+            updated_memory = self._apply_updates(current_memory, update_data, thread_id, timestamp=now)
 
             # Strip file-upload mentions from all summaries before saving.
             # Uploaded files are session-scoped and won't exist in future sessions,
@@ -404,34 +636,18 @@ class MemoryUpdater:
             updated_memory = _strip_upload_mentions_from_memory(updated_memory)
 
             # Save for this user (uses DB or file automatically)
-            success = _save_memory(user_id, updated_memory)
-
-            try:
-                from src.gateway.metrics import memory_updates_total
-
-                memory_updates_total.labels(status="success" if success else "failure").inc()
-            except Exception:
-                pass
+            success = _save_memory(user_id, updated_memory, timestamp=now)
 
+            _record_update_result(success)
             return success
 
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to parse LLM response for memory update: {e}")
-            try:
-                from src.gateway.metrics import memory_updates_total
-
-                memory_updates_total.labels(status="failure").inc()
-            except Exception:
-                pass
+            _record_update_result(False)
             return False
         except Exception as e:
             logger.error(f"Memory update failed for user {user_id}: {e}")
-            try:
-                from src.gateway.metrics import memory_updates_total
-
-                memory_updates_total.labels(status="failure").inc()
-            except Exception:
-                pass
+            _record_update_result(False)
             return False
 
     def _apply_updates(
@@ -439,6 +655,7 @@ class MemoryUpdater:
         current_memory: dict[str, Any],
         update_data: dict[str, Any],
         thread_id: str | None = None,
+        timestamp: str | None = None,
     ) -> dict[str, Any]:
         """Apply LLM-generated updates to memory.
 
@@ -446,63 +663,66 @@ class MemoryUpdater:
             current_memory: Current memory data.
             update_data: Updates from LLM.
             thread_id: Optional thread ID for tracking.
+            timestamp: ISO-8601 time to stamp on updated sections and new facts.
+                Defaults to now.
 
         Returns:
-            Updated memory data.
+            Updated memory data as a new dict. current_memory, which is
+            usually the cached copy, is left untouched so the cache only ever
+            reflects persisted state.
         """
         config = get_memory_config()
-        now = datetime.now(UTC).isoformat()
+        now = timestamp or datetime.now(UTC).isoformat()
 
         # Update user sections
+        user = dict(current_memory.get("user", {}))
         user_updates = update_data.get("user", {})
         for section in ["workContext", "personalContext", "topOfMind"]:
             section_data = user_updates.get(section, {})
             if section_data.get("shouldUpdate") and section_data.get("summary"):
-                current_memory["user"][section] = {
+                user[section] = {
                     "summary": section_data["summary"],
                     "updatedAt": now,
                 }
 
         # Update history sections
+        history = dict(current_memory.get("history", {}))
         history_updates = update_data.get("history", {})
         for section in ["recentMonths", "earlierContext", "longTermBackground"]:
             section_data = history_updates.get(section, {})
             if section_data.get("shouldUpdate") and section_data.get("summary"):
-                current_memory["history"][section] = {
+                history[section] = {
                     "summary": section_data["summary"],
                     "updatedAt": now,
                 }
 
-        # Remove facts
-        facts_to_remove = set(update_data.get("factsToRemove", []))
-        if facts_to_remove:
-            current_memory["facts"] = [f for f in current_memory.get("facts", []) if f.get("id") not in facts_to_remove]
+        # Drop removed facts, append accepted new ones, then trim: the fact
+        # list is copied once and trimmed at most once per update
+        facts_to_remove = set(update_data.get("factsToRemove", ()))
+        facts = [f for f in current_memory.get("facts", ()) if f.get("id") not in facts_to_remove]
 
-        # Add new facts
-        new_facts = update_data.get("newFacts", [])
-        for fact in new_facts:
+        source = thread_id or "unknown"
+        threshold = config.fact_confidence_threshold
+        for fact in update_data.get("newFacts", ()):
             confidence = fact.get("confidence", 0.5)
-            if confidence >= config.fact_confidence_threshold:
-                fact_entry = {
-                    "id": f"fact_{uuid.uuid4().hex[:8]}",
-                    "content": fact.get("content", ""),
-                    "category": fact.get("category", "context"),
-                    "confidence": confidence,
-                    "createdAt": now,
-                    "source": thread_id or "unknown",
-                }
-                current_memory["facts"].append(fact_entry)
-
-        # Enforce max facts limit
-        if len(current_memory["facts"]) > config.max_facts:
-            # Sort by confidence and keep top ones
-            current_memory["facts"] = sorted(
-                current_memory["facts"],
-                key=lambda f: f.get("confidence", 0),
-                reverse=True,
-            )[: config.max_facts]
-
-        return current_memory
+            if confidence >= threshold:
+                facts.append(
+                    {
+                        "id": f"fact_{uuid.uuid4().hex[:8]}",
+                        "content": fact.get("content", ""),
+                        "category": fact.get("category", "context"),
+                        "confidence": confidence,
+                        "createdAt": now,
+                        "source": source,
+                    }
+                )
+
+        # Enforce max facts limit, keeping the highest-confidence facts (same
+        # order as a stable descending sort)
+        if len(facts) > config.max_facts:
+            facts = heapq.nlargest(config.max_facts, facts, key=_fact_confidence)
+
+        return {**current_memory, "user": user, "history": history, "facts": facts}
 
 
 def update_memory_from_conversation(
@@ -31,33 +31,38 @@ class ExecutionPhase(StrEnum):
 # Tool allowlist per phase — defines which tools are appropriate in each phase.
 # Currently used for logging/monitoring only. Future: enforce by stripping disallowed
 # tool calls in after_model.
-PHASE_TOOL_ALLOWLIST: dict[ExecutionPhase, set[str]] = {
-    ExecutionPhase.PLANNING: {
+PHASE_TOOL_ALLOWLIST: dict[ExecutionPhase, frozenset[str]] = {
+    ExecutionPhase.PLANNING: frozenset({
         "web_search", "web_fetch",
         "reflection", "read_file", "ls",
         "ask_clarification",
-    },
-    ExecutionPhase.EXECUTION: {
+    }),
+    ExecutionPhase.EXECUTION: frozenset({
         "web_search", "web_fetch",
         "reflection", "read_file", "ls",
         "ask_clarification",
         "bash", "write_file", "str_replace",
         "execute_python",
         "present_files", "task",
-    },
-    ExecutionPhase.SYNTHESIS: {
+    }),
+    ExecutionPhase.SYNTHESIS: frozenset({
         "reflection", "read_file", "ls",
         "ask_clarification",
         "bash", "write_file", "str_replace",
         "execute_python",
-    },
-    ExecutionPhase.REVIEW: {
+    }),
+    ExecutionPhase.REVIEW: frozenset({
         "reflection", "read_file", "ls",
         "ask_clarification",
         "bash",  # for running tests
-    },
+    }),
 }
 
+# Tool groups used by _detect_phase to classify recent activity
+_WRITE_TOOLS = frozenset({"write_file", "str_replace", "bash"})
+_READ_TOOLS = frozenset({"read_file", "web_search", "web_fetch", "ls"})
+_PRESENT_TOOLS = frozenset({"present_files"})
+
 
 def _detect_phase(state: AgentState) -> ExecutionPhase:
     """Heuristic phase detection from conversation state.
@@ -75,38 +80,37 @@ def _detect_phase(state: AgentState) -> ExecutionPhase:
     if not messages:
         return ExecutionPhase.PLANNING
 
-    # Count tool calls and types to infer phase
-    ai_messages = [m for m in messages if getattr(m, "type", None) == "ai"]
-    if not ai_messages:
-        return ExecutionPhase.PLANNING
-
-    # Look at recent tool calls to detect phase transitions
-    recent_tool_calls = []
-    for msg in reversed(ai_messages[-5:]):
+    # Collect tool calls from the last 5 AI messages, scanning backwards so
+    # long histories are not copied or walked in full
+    recent_set: set[str] = set()
+    ai_seen = 0
+    for msg in reversed(messages):
+        if getattr(msg, "type", None) != "ai":
+            continue
+        ai_seen += 1
         tool_calls = getattr(msg, "tool_calls", None)
         if tool_calls:
-            recent_tool_calls.extend([tc.get("name", "") for tc in tool_calls])
+            recent_set.update(tc.get("name", "") for tc in tool_calls)
+        if ai_seen >= 5:
+            break
 
-    write_tools = {"write_file", "str_replace", "bash"}
-    read_tools = {"read_file", "web_search", "web_fetch", "ls"}
-    present_tools = {"present_files"}
-
-    recent_set = set(recent_tool_calls)
+    if not ai_seen:
+        return ExecutionPhase.PLANNING
 
     # If presenting files, likely in review/synthesis phase
-    if recent_set & present_tools:
+    if not recent_set.isdisjoint(_PRESENT_TOOLS):
         return ExecutionPhase.REVIEW
 
     # If mostly writing/executing, in execution phase
-    if recent_set & write_tools:
+    if not recent_set.isdisjoint(_WRITE_TOOLS):
         return ExecutionPhase.EXECUTION
 
     # If mostly reading/searching, in planning phase
-    if recent_set & read_tools:
+    if not recent_set.isdisjoint(_READ_TOOLS):
         return ExecutionPhase.PLANNING
 
     # Default to execution for ongoing conversations
-    if len(ai_messages) > 2:
+    if ai_seen > 2:
         return ExecutionPhase.EXECUTION
 
     return ExecutionPhase.PLANNING
@@ -53,16 +53,21 @@ class SubagentLimitMiddleware(AgentMiddleware[AgentState]):
         if not tool_calls:
             return None
 
-        # Count task tool calls
-        task_indices = [i for i, tc in enumerate(tool_calls) if tc.get("name") == "task"]
-        if len(task_indices) <= self.max_concurrent:
+        # Keep the first max_concurrent task calls and every non-task call
+        truncated_tool_calls = []
+        task_kept = 0
+        dropped_count = 0
+        for tc in tool_calls:
+            if tc.get("name") == "task":
+                if task_kept >= self.max_concurrent:
+                    dropped_count += 1
+                    continue
+                task_kept += 1
+            truncated_tool_calls.append(tc)
+
+        if not dropped_count:
             return None
 
-        # Build set of indices to drop (excess task calls beyond the limit)
-        indices_to_drop = set(task_indices[self.max_concurrent :])
-        truncated_tool_calls = [tc for i, tc in enumerate(tool_calls) if i not in indices_to_drop]
-
-        dropped_count = len(indices_to_drop)
         logger.warning(f"Truncated {dropped_count} excess task tool call(s) from model response (limit: {self.max_concurrent})")
 
         # Replace the AIMessage with truncated tool_calls (same id triggers replacement)
@@ -1,27 +1,37 @@
 """Middleware for logging a chronological timeline of thread messages.
 
 Supports two storage backends:
-- **Database mode** (when DATABASE_URL is set): append-only INSERTs into
-  the ``timeline_events`` table — no locking required.
-- **File mode** (fallback): atomic JSON file writes under the thread's
-  outputs directory, guarded by a module-level threading lock.
+- **Database mode** (when DATABASE_URL is set): hooks queue a snapshot and a
+  background writer appends the new rows to the ``timeline_events`` table in
+  batches, one transaction per flush.
+- **File mode** (fallback): append-only JSON-Lines writes to
+  ``agent_timeline.jsonl`` under the thread's outputs directory, guarded by a
+  per-thread lock.
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
+import atexit
 import logging
 import os
 import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import Any, override
+from typing import Any, BinaryIO, override
 
+import orjson
 from langchain.agents import AgentState
 from langchain.agents.middleware import AgentMiddleware
 from langgraph.runtime import Runtime
+from pydantic import BaseModel
+from sqlalchemy import insert, select
 
+import src.db.engine as db_engine
 from src.config.paths import get_paths
+from src.db.batch_writer import BatchWriter
+from src.db.models import TimelineEventModel
 
 logger = logging.getLogger(__name__)
 
@@ -32,29 +42,50 @@ _FORCE_FILE_MODE = os.getenv("THINKTANK_TIMELINE_FILE_MODE", "").strip().lower()
 # File-mode helpers (kept for backward-compatibility when no DB is configured)
 # ---------------------------------------------------------------------------
 
-_WRITE_LOCK = threading.Lock()
+# One lock per thread_id: appends to a thread's timeline are serialized while
+# unrelated conversations write in parallel.
+_file_locks: dict[str, threading.Lock] = {}
+_file_locks_guard = threading.Lock()
+
+
+def _file_lock_for(thread_id: str) -> threading.Lock:
+    with _file_locks_guard:
+        lock = _file_locks.get(thread_id)
+        if lock is None:
+            lock = _file_locks[thread_id] = threading.Lock()
+        return lock
 
 
 def _utc_now() -> str:
     return datetime.now(UTC).isoformat()
 
 
+# Outputs directories this process has already created, so hooks only hit
+# the filesystem for a directory once.
+_ensured_outputs_dirs: set[str] = set()
+_fallback_outputs_paths: dict[str, str] = {}
+
+
 def _resolve_outputs_path(state: AgentState, thread_id: str) -> str:
     thread_data = state.get("thread_data") or {}
     outputs_path = thread_data.get("outputs_path")
-    if outputs_path:
+    if not outputs_path:
+        outputs_path = _fallback_outputs_paths.get(thread_id)
+        if outputs_path is None:
+            outputs_path = _fallback_outputs_paths[thread_id] = str(get_paths().sandbox_outputs_dir(thread_id))
+    if outputs_path not in _ensured_outputs_dirs:
         os.makedirs(outputs_path, exist_ok=True)
-        return outputs_path
-    fallback_path = get_paths().sandbox_outputs_dir(thread_id)
-    fallback_path.mkdir(parents=True, exist_ok=True)
-    return str(fallback_path)
+        _ensured_outputs_dirs.add(outputs_path)
+    return outputs_path
 
 
 def _serialize_message(message: Any) -> dict:
-    if hasattr(message, "model_dump"):
+    # LangChain messages are pydantic models: one type check covers them.
+    if isinstance(message, BaseModel):
         return message.model_dump()
-    if hasattr(message, "dict"):
-        return message.dict()
+    to_dict = getattr(message, "model_dump", None) or getattr(message, "dict", None)
+    if to_dict is not None:
+        return to_dict()
     return {
         "type": getattr(message, "type", None),
         "content": getattr(message, "content", None),
@@ -62,31 +93,163 @@ def _serialize_message(message: Any) -> dict:
     }
 
 
-def _load_timeline(file_path: str, thread_id: str) -> dict:
-    if os.path.exists(file_path):
+_TIMELINE_FILENAME = "agent_timeline.jsonl"
+# Pre-JSONL timelines: one JSON document rewritten on every append.
+_LEGACY_TIMELINE_FILENAME = "agent_timeline.json"
+
+# Per-file ``{"last_message_index": int, "signatures": {task_id: signature}}``,
+# derived once from the file so appends never have to re-read it.
+_file_timeline_state: dict[str, dict[str, Any]] = {}
+# Last recorded message count per thread_id, for the hook's no-op fast path.
+_file_last_index: dict[str, int] = {}
+
+
+def _encode_events(events: list[dict]) -> bytes:
+    return b"".join(orjson.dumps(event, default=str) + b"\n" for event in events)
+
+
+# Append handles kept open per timeline file, least recently used first, so
+# a hook costs one write instead of an open/write/close. Each entry records
+# the owning thread_id: appends happen under that thread's lock, and a handle
+# is only closed while that lock can be taken.
+_MAX_OPEN_TIMELINES = 128
+_file_handles: OrderedDict[str, tuple[str, BinaryIO]] = OrderedDict()
+_file_handles_lock = threading.Lock()
+
+
+def _open_for_append(file_path: str) -> BinaryIO:
+    try:
+        return open(file_path, "ab")
+    except FileNotFoundError:
+        # The outputs directory was removed after this process created it.
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return open(file_path, "ab")
+
+
+def _evict_file_handles() -> None:
+    """Close least recently used handles beyond the cap.
+
+    Must be called with ``_file_handles_lock`` held. Handles whose thread is
+    mid-append (including the caller's own) are skipped.
+    """
+    excess = len(_file_handles) - _MAX_OPEN_TIMELINES
+    for path in list(_file_handles):
+        if excess <= 0:
+            return
+        owner, handle = _file_handles[path]
+        lock = _file_lock_for(owner)
+        if not lock.acquire(blocking=False):
+            continue
         try:
-            with open(file_path, encoding="utf-8") as handle:
-                data = json.load(handle)
-            if isinstance(data, dict) and "events" in data:
-                return data
-        except Exception:
-            pass
-    return {
-        "schema_version": 1,
-        "thread_id": thread_id,
-        "created_at": _utc_now(),
-        "updated_at": _utc_now(),
-        "last_message_index": 0,
-        "last_subagent_signatures": {},
-        "events": [],
-    }
+            handle.close()
+        finally:
+            lock.release()
+        del _file_handles[path]
+        excess -= 1
+
+
+def _timeline_handle(thread_id: str, file_path: str) -> BinaryIO:
+    """Return an open append handle for *file_path*.
+
+    Must be called with the thread's file lock held.
+    """
+    with _file_handles_lock:
+        entry = _file_handles.get(file_path)
+        if entry is not None:
+            handle = entry[1]
+            if os.fstat(handle.fileno()).st_nlink:
+                _file_handles.move_to_end(file_path)
+                return handle
+            # The file was deleted underneath us; start a new one.
+            handle.close()
+            del _file_handles[file_path]
+        handle = _open_for_append(file_path)
+        _file_handles[file_path] = (thread_id, handle)
+        _evict_file_handles()
+        return handle
+
+
+@atexit.register
+def _close_file_handles() -> None:
+    with _file_handles_lock:
+        for _, handle in _file_handles.values():
+            handle.close()
+        _file_handles.clear()
+
+
+def _append_events(thread_id: str, file_path: str, events: list[dict]) -> None:
+    """Append *events* to the JSON-Lines timeline in a single write.
+
+    Must be called with the thread's file lock held.
+    """
+    handle = _timeline_handle(thread_id, file_path)
+    handle.write(_encode_events(events))
+    # Flushed per hook so the file is complete for readers and on crash.
+    handle.flush()
+
+
+def _read_events(file_path: str) -> list[dict]:
+    events: list[dict] = []
+    try:
+        with open(file_path, "rb") as handle:
+            for line in handle:
+                try:
+                    event = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # A torn final line from an interrupted append.
+                    continue
+                if isinstance(event, dict):
+                    events.append(event)
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def _migrate_legacy_timeline(outputs_path: str, file_path: str) -> None:
+    """Convert an ``agent_timeline.json`` document into the JSON-Lines file."""
+    legacy_path = os.path.join(outputs_path, _LEGACY_TIMELINE_FILENAME)
+    if os.path.exists(file_path) or not os.path.exists(legacy_path):
+        return
+    try:
+        with open(legacy_path, "rb") as handle:
+            data = orjson.loads(handle.read())
+    except Exception:
+        logger.warning("Could not read legacy timeline %s; starting a new one", legacy_path)
+        return
+    events = data.get("events") if isinstance(data, dict) else None
+    if isinstance(events, list):
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(_encode_events([event for event in events if isinstance(event, dict)]))
+        os.replace(temp_path, file_path)
+    os.remove(legacy_path)
+
+
+def _get_file_timeline_state(outputs_path: str, file_path: str) -> dict[str, Any]:
+    """Return the cached append state for *file_path*, scanning the file once.
 
+    Mirrors ``_db_get_last_message_index``: the index is derived from the
+    latest ``message`` or ``history_truncated`` event.
+    """
+    state = _file_timeline_state.get(file_path)
+    if state is not None:
+        return state
+
+    _migrate_legacy_timeline(outputs_path, file_path)
+    last_index = 0
+    signatures: dict[str, str] = {}
+    for event in _read_events(file_path):
+        kind = event.get("event")
+        if kind == "message":
+            last_index = int(event.get("message_index") or 0) + 1
+        elif kind == "history_truncated":
+            last_index = int(event.get("current_length") or 0)
+        elif kind == "subagent_trajectory" and event.get("task_id"):
+            signatures[event["task_id"]] = _json_signature(event.get("trajectory"))
 
-def _write_timeline(file_path: str, data: dict) -> None:
-    temp_path = f"{file_path}.tmp"
-    with open(temp_path, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=True)
-    os.replace(temp_path, file_path)
+    state = {"last_message_index": last_index, "signatures": signatures}
+    _file_timeline_state[file_path] = state
+    return state
 
 
 # ---------------------------------------------------------------------------
@@ -113,17 +276,17 @@ def _db_get_last_message_index(session: Any, thread_id: str) -> int:
     if cached is not None:
         return cached
 
-    from src.db.models import TimelineEventModel
-
-    latest = (
-        session.query(TimelineEventModel)
-        .filter(
+    # Reads three columns (not a full ORM object); served by the
+    # (thread_id, id) index walking backwards from the newest row.
+    latest = session.execute(
+        select(TimelineEventModel.event_type, TimelineEventModel.message_index, TimelineEventModel.message_data)
+        .where(
             TimelineEventModel.thread_id == thread_id,
             TimelineEventModel.event_type.in_(["message", "history_truncated"]),
         )
         .order_by(TimelineEventModel.id.desc())
-        .first()
-    )
+        .limit(1)
+    ).first()
 
     if latest is None:
         idx = 0
@@ -147,7 +310,7 @@ def _db_set_last_message_index(thread_id: str, value: int) -> None:
 
 def _json_signature(payload: Any) -> str:
     try:
-        return json.dumps(payload, sort_keys=True, ensure_ascii=True)
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
     except Exception:
         return repr(payload)
 
@@ -158,14 +321,9 @@ def _db_get_subagent_signatures(session: Any, thread_id: str) -> dict[str, str]:
     if cached is not None:
         return cached
 
-    from src.db.models import TimelineEventModel
-
     signatures: dict[str, str] = {}
-    rows = (
-        session.query(TimelineEventModel)
-        .filter(TimelineEventModel.thread_id == thread_id, TimelineEventModel.event_type == "subagent_trajectory")
-        .order_by(TimelineEventModel.id.asc())
-        .all()
+    rows = session.execute(
+        select(TimelineEventModel.message_id, TimelineEventModel.message_data).where(TimelineEventModel.thread_id == thread_id, TimelineEventModel.event_type == "subagent_trajectory").order_by(TimelineEventModel.id.asc())
     )
     for row in rows:
         if row.message_id and row.message_data is not None:
@@ -176,95 +334,200 @@ def _db_get_subagent_signatures(session: Any, thread_id: str) -> dict[str, str]:
     return signatures
 
 
-def _db_record_messages(
+def _timeline_row(
     thread_id: str,
-    messages: list,
+    event_type: str,
     stage: str,
-) -> None:
-    """Persist new timeline events to the database via append-only INSERTs."""
-    from src.db.engine import get_db_session
-    from src.db.models import TimelineEventModel
+    *,
+    message_index: int | None = None,
+    role: str | None = None,
+    message_id: str | None = None,
+    message_data: Any = None,
+) -> dict[str, Any]:
+    # Every row carries the same keys so a batch goes out as one INSERT.
+    return {
+        "thread_id": thread_id,
+        "event_type": event_type,
+        "stage": stage,
+        "message_index": message_index,
+        "role": role,
+        "message_id": message_id,
+        "message_data": message_data,
+    }
 
-    with get_db_session() as session:
-        last_index = _db_get_last_message_index(session, thread_id)
-        current_len = len(messages)
 
-        if current_len < last_index:
-            # History was truncated — record the event.
-            session.add(
-                TimelineEventModel(
-                    thread_id=thread_id,
-                    event_type="history_truncated",
-                    stage=stage,
-                    message_data={
-                        "previous_last_index": last_index,
-                        "current_length": current_len,
-                    },
-                )
+def _db_message_rows(thread_id: str, messages: list, stage: str) -> list[dict[str, Any]]:
+    """Build timeline rows for messages appended since the last recorded index.
+
+    The thread's index must already be cached (see ``_db_load_thread_state``).
+    """
+    with _db_last_index_lock:
+        last_index = _db_last_index[thread_id]
+    current_len = len(messages)
+    rows: list[dict[str, Any]] = []
+
+    if current_len < last_index:
+        # History was truncated — record the event.
+        rows.append(
+            _timeline_row(
+                thread_id,
+                "history_truncated",
+                stage,
+                message_data={
+                    "previous_last_index": last_index,
+                    "current_length": current_len,
+                },
             )
-            _db_set_last_message_index(thread_id, current_len)
-            last_index = current_len
+        )
+        _db_set_last_message_index(thread_id, current_len)
+        last_index = current_len
+
+    if current_len > last_index:
+        rows.extend(
+            _timeline_row(
+                thread_id,
+                "message",
+                stage,
+                message_index=idx,
+                role=getattr(msg, "type", None),
+                message_id=getattr(msg, "id", None),
+                message_data=_serialize_message(msg),
+            )
+            for idx, msg in enumerate(messages[last_index:current_len], start=last_index)
+        )
+        _db_set_last_message_index(thread_id, current_len)
 
-        if current_len > last_index:
-            for idx in range(last_index, current_len):
-                msg = messages[idx]
-                session.add(
-                    TimelineEventModel(
-                        thread_id=thread_id,
-                        event_type="message",
-                        stage=stage,
-                        message_index=idx,
-                        role=getattr(msg, "type", None),
-                        message_id=getattr(msg, "id", None),
-                        message_data=_serialize_message(msg),
-                    )
-                )
-            _db_set_last_message_index(thread_id, current_len)
+    return rows
 
-        # session.commit() is handled by the get_db_session context manager.
 
+def _db_subagent_rows(thread_id: str, trajectories: dict[str, Any], stage: str) -> list[dict[str, Any]]:
+    """Build timeline rows for subagent trajectories that changed since last recorded.
 
-def _db_record_subagent_trajectories(
-    thread_id: str,
-    trajectories: dict[str, Any],
-    stage: str,
-) -> None:
-    """Persist changed subagent trajectory snapshots to the database."""
-    from src.db.engine import get_db_session
-    from src.db.models import TimelineEventModel
+    The thread's signatures must already be cached (see ``_db_load_thread_state``).
+    """
+    if not trajectories:
+        return []
 
-    if not isinstance(trajectories, dict) or not trajectories:
+    with _db_subagent_signatures_lock:
+        signatures = _db_subagent_signatures[thread_id]
+    rows: list[dict[str, Any]] = []
+
+    for task_id, trajectory in trajectories.items():
+        signature = _json_signature(trajectory)
+        if signatures.get(task_id) == signature:
+            continue
+
+        rows.append(
+            _timeline_row(
+                thread_id,
+                "subagent_trajectory",
+                stage,
+                role="subagent",
+                message_id=task_id,
+                message_data=trajectory if isinstance(trajectory, dict) else {"value": trajectory},
+            )
+        )
+        signatures[task_id] = signature
+
+    if rows:
+        with _db_subagent_signatures_lock:
+            _db_subagent_signatures[thread_id] = signatures
+    return rows
+
+
+@dataclass(slots=True)
+class _PendingTimelineWrite:
+    """Snapshot of one hook invocation waiting to be written to the database."""
+
+    thread_id: str
+    stage: str
+    messages: list[Any]
+    trajectories: dict[str, Any]
+
+
+def _db_load_thread_state(session: Any, writes: list[_PendingTimelineWrite]) -> None:
+    """Warm the per-thread index and signature caches for a batch.
+
+    Only threads missing from the caches query the database, so a warm batch
+    never checks out a connection here.
+    """
+    for write in writes:
+        _db_get_last_message_index(session, write.thread_id)
+        if write.trajectories:
+            _db_get_subagent_signatures(session, write.thread_id)
+
+
+def _db_write_batch(writes: list[_PendingTimelineWrite]) -> None:
+    """Write a batch of pending hook snapshots in one transaction and one INSERT.
+
+    Messages are serialized between the cache lookups and the INSERT, so no
+    connection is held while ``model_dump`` runs.
+    """
+    with db_engine.get_db_session() as session:
+        _db_load_thread_state(session, writes)
+
+    rows: list[dict[str, Any]] = []
+    for write in writes:
+        rows.extend(_db_message_rows(write.thread_id, write.messages, write.stage))
+        rows.extend(_db_subagent_rows(write.thread_id, write.trajectories, write.stage))
+    if not rows:
         return
 
-    with get_db_session() as session:
-        signatures = _db_get_subagent_signatures(session, thread_id)
-        changed = False
+    with db_engine.get_db_session() as session:
+        session.execute(insert(TimelineEventModel), rows)
+        # session.commit() is handled by the get_db_session context manager.
 
-        for task_id, trajectory in trajectories.items():
-            signature = _json_signature(trajectory)
-            if signatures.get(task_id) == signature:
-                continue
 
-            session.add(
-                TimelineEventModel(
-                    thread_id=thread_id,
-                    event_type="subagent_trajectory",
-                    stage=stage,
-                    role="subagent",
-                    message_id=task_id,
-                    message_data=trajectory if isinstance(trajectory, dict) else {"value": trajectory},
-                )
-            )
-            signatures[task_id] = signature
-            changed = True
+# Flush once this many hook snapshots are pending, or after the interval.
+_FLUSH_MAX_WRITES = 500
+_FLUSH_INTERVAL_SECONDS = 0.2
+# Beyond this the oldest snapshots are dropped; a later snapshot of the same
+# thread carries the full message list, so its missing events are recovered.
+_MAX_PENDING_WRITES = 10_000
+
+
+class _DbTimelineWriter(BatchWriter[_PendingTimelineWrite]):
+    """Batches database timeline writes on a background thread.
+
+    Each batch of hook snapshots is turned into rows and inserted in a single
+    transaction by ``_db_write_batch``.
+    """
+
+    def __init__(self):
+        super().__init__(
+            "timeline-db-writer",
+            max_batch=_FLUSH_MAX_WRITES,
+            flush_interval=_FLUSH_INTERVAL_SECONDS,
+            max_pending=_MAX_PENDING_WRITES,
+        )
+
+    def write_batch(self, batch: list[_PendingTimelineWrite]) -> None:
+        _db_write_batch(batch)
 
-        if changed:
-            with _db_subagent_signatures_lock:
-                _db_subagent_signatures[thread_id] = signatures
+
+_db_writer = _DbTimelineWriter()
+
+
+def _db_record_timeline(
+    thread_id: str,
+    messages: list,
+    trajectories: dict[str, Any],
+    stage: str,
+) -> None:
+    """Queue new timeline events for the background database writer."""
+    _db_writer.submit(
+        _PendingTimelineWrite(
+            thread_id=thread_id,
+            stage=stage,
+            # Copied so later in-place changes to the state cannot leak into the batch.
+            messages=list(messages),
+            trajectories=dict(trajectories) if isinstance(trajectories, dict) else {},
+        )
+    )
 
 
 # ---------------------------------------------------------------------------
-# File-mode recording (original implementation)
+# File-mode recording
 # ---------------------------------------------------------------------------
 
 
@@ -274,20 +537,23 @@ def _file_record_messages(
     messages: list,
     stage: str,
 ) -> None:
-    """Persist new timeline events to a JSON file (legacy file-based mode)."""
+    """Append new timeline events to the thread's JSON-Lines file."""
     outputs_path = _resolve_outputs_path(state, thread_id)
-    timeline_path = os.path.join(outputs_path, "agent_timeline.json")
+    timeline_path = os.path.join(outputs_path, _TIMELINE_FILENAME)
 
-    with _WRITE_LOCK:
-        timeline = _load_timeline(timeline_path, thread_id)
-        last_index = int(timeline.get("last_message_index", 0) or 0)
+    with _file_lock_for(thread_id):
+        timeline_state = _get_file_timeline_state(outputs_path, timeline_path)
+        last_index = timeline_state["last_message_index"]
         current_len = len(messages)
+        events: list[dict] = []
+        # Events appended by one hook share a timestamp.
+        now = _utc_now()
 
         if current_len < last_index:
-            timeline["events"].append(
+            events.append(
                 {
                     "event": "history_truncated",
-                    "timestamp": _utc_now(),
+                    "timestamp": now,
                     "stage": stage,
                     "previous_last_index": last_index,
                     "current_length": current_len,
@@ -298,10 +564,10 @@ def _file_record_messages(
         if current_len > last_index:
             for idx in range(last_index, current_len):
                 msg = messages[idx]
-                timeline["events"].append(
+                events.append(
                     {
                         "event": "message",
-                        "timestamp": _utc_now(),
+                        "timestamp": now,
                         "stage": stage,
                         "message_index": idx,
                         "role": getattr(msg, "type", None),
@@ -309,10 +575,11 @@ def _file_record_messages(
                         "message": _serialize_message(msg),
                     }
                 )
-            timeline["last_message_index"] = current_len
-            timeline["updated_at"] = _utc_now()
 
-        _write_timeline(timeline_path, timeline)
+        if events:
+            _append_events(thread_id, timeline_path, events)
+            timeline_state["last_message_index"] = current_len
+        _file_last_index[thread_id] = timeline_state["last_message_index"]
 
 
 def _file_record_subagent_trajectories(
@@ -321,41 +588,38 @@ def _file_record_subagent_trajectories(
     trajectories: dict[str, Any],
     stage: str,
 ) -> None:
-    """Persist changed subagent trajectory snapshots to timeline JSON."""
+    """Append changed subagent trajectory snapshots to the timeline file."""
     if not isinstance(trajectories, dict) or not trajectories:
         return
 
     outputs_path = _resolve_outputs_path(state, thread_id)
-    timeline_path = os.path.join(outputs_path, "agent_timeline.json")
+    timeline_path = os.path.join(outputs_path, _TIMELINE_FILENAME)
 
-    with _WRITE_LOCK:
-        timeline = _load_timeline(timeline_path, thread_id)
-        signatures = timeline.get("last_subagent_signatures", {})
-        if not isinstance(signatures, dict):
-            signatures = {}
+    with _file_lock_for(thread_id):
+        signatures = _get_file_timeline_state(outputs_path, timeline_path)["signatures"]
 
-        changed = False
+        events: list[dict] = []
+        changed: dict[str, str] = {}
+        now = _utc_now()
         for task_id, trajectory in trajectories.items():
             signature = _json_signature(trajectory)
             if signatures.get(task_id) == signature:
                 continue
 
-            timeline["events"].append(
+            events.append(
                 {
                     "event": "subagent_trajectory",
-                    "timestamp": _utc_now(),
+                    "timestamp": now,
                     "stage": stage,
                     "task_id": task_id,
                     "trajectory": trajectory,
                 }
             )
-            signatures[task_id] = signature
-            changed = True
+            changed[task_id] = signature
 
-        if changed:
-            timeline["last_subagent_signatures"] = signatures
-            timeline["updated_at"] = _utc_now()
-            _write_timeline(timeline_path, timeline)
+        if events:
+            _append_events(thread_id, timeline_path, events)
+            signatures.update(changed)
 
 
 # ---------------------------------------------------------------------------
@@ -366,9 +630,9 @@ def _file_record_subagent_trajectories(
 class TimelineLoggingMiddleware(AgentMiddleware[AgentState]):
     """Logs thread messages (human/ai/tool) as an ordered timeline.
 
-    When ``DATABASE_URL`` is configured, events are persisted as
-    append-only rows in the ``timeline_events`` table (no locking).
-    Otherwise falls back to atomic JSON file writes.
+    When ``DATABASE_URL`` is configured, events are queued and persisted in
+    batches as append-only rows in the ``timeline_events`` table.
+    Otherwise falls back to appending to a JSON-Lines file.
     """
 
     def _record_messages(self, state: AgentState, runtime: Runtime, stage: str) -> None:
@@ -376,16 +640,23 @@ class TimelineLoggingMiddleware(AgentMiddleware[AgentState]):
         if not thread_id:
             return
 
-        messages = state.get("messages", [])
-        if not isinstance(messages, list):
+        try:
+            messages = state["messages"]
+        except KeyError:
             return
 
         try:
-            from src.db.engine import is_db_enabled
+            # Looked up on the module so DATABASE_URL changes (and test patches) apply.
+            use_db = not _FORCE_FILE_MODE and db_engine.is_db_enabled()
+
+            # Nothing appended since the last recorded hook (e.g. after_model
+            # right after before_model). Subagent trajectories only change
+            # alongside the task tool's ToolMessage, so they are unchanged too.
+            if (_db_last_index if use_db else _file_last_index).get(thread_id) == len(messages):
+                return
 
-            if not _FORCE_FILE_MODE and is_db_enabled():
-                _db_record_messages(thread_id, messages, stage)
-                _db_record_subagent_trajectories(thread_id, state.get("subagent_trajectories", {}), stage)
+            if use_db:
+                _db_record_timeline(thread_id, messages, state.get("subagent_trajectories", {}), stage)
             else:
                 _file_record_messages(state, thread_id, messages, stage)
                 _file_record_subagent_trajectories(state, thread_id, state.get("subagent_trajectories", {}), stage)
@@ -393,6 +664,15 @@ class TimelineLoggingMiddleware(AgentMiddleware[AgentState]):
             # Timeline logging should never break the agent loop.
             logger.exception("Timeline recording failed for thread %s", thread_id)
 
+    async def _arecord_messages(self, state: AgentState, runtime: Runtime, stage: str) -> None:
+        # Database mode only queues a snapshot for the background writer, which
+        # is cheap enough for the event loop; file mode appends to disk, so it
+        # runs in a worker thread.
+        if not _FORCE_FILE_MODE and db_engine.is_db_enabled():
+            self._record_messages(state, runtime, stage)
+        else:
+            await asyncio.to_thread(self._record_messages, state, runtime, stage)
+
     @override
     def before_model(self, state: AgentState, runtime: Runtime) -> dict | None:
         self._record_messages(state, runtime, "before_model")
@@ -410,15 +690,15 @@ class TimelineLoggingMiddleware(AgentMiddleware[AgentState]):
 
     @override
     async def abefore_model(self, state: AgentState, runtime: Runtime) -> dict | None:
-        await asyncio.to_thread(self._record_messages, state, runtime, "before_model")
+        await self._arecord_messages(state, runtime, "before_model")
         return None
 
     @override
     async def aafter_model(self, state: AgentState, runtime: Runtime) -> dict | None:
-        await asyncio.to_thread(self._record_messages, state, runtime, "after_model")
+        await self._arecord_messages(state, runtime, "after_model")
         return None
 
     @override
     async def aafter_agent(self, state: AgentState, runtime: Runtime) -> dict | None:
-        await asyncio.to_thread(self._record_messages, state, runtime, "after_agent")
+        await self._arecord_messages(state, runtime, "after_agent")
         return None
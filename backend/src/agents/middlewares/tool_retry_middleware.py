@@ -29,22 +29,23 @@ class ErrorCategory(StrEnum):
 # Tools that should never be retried
 NO_RETRY_TOOLS: set[str] = {"ask_clarification", "reflection", "present_files"}
 
-# Patterns for error classification (compiled for performance)
+# Patterns for error classification (compiled for performance). They are
+# lowercase and matched against the lowercased message: without IGNORECASE
+# the re engine can skip ahead to candidate first characters, which makes
+# a miss on a long message several times cheaper.
 _TRANSIENT_PATTERNS = re.compile(
     r"timeout|timed?\s*out|connection\s*(refused|reset|error)|"
     r"rate\s*limit|too\s*many\s*requests|"
     r"502|503|504|"
     r"temporarily\s*unavailable|service\s*unavailable|"
     r"network\s*(error|unreachable)|"
-    r"ECONNREFUSED|ECONNRESET|ETIMEDOUT",
-    re.IGNORECASE,
+    r"econnrefused|econnreset|etimedout"
 )
 
 _AUTH_PATTERNS = re.compile(
     r"401|403|forbidden|unauthorized|"
     r"api\s*key|credential|authentication\s*failed|"
-    r"access\s*denied|invalid\s*token",
-    re.IGNORECASE,
+    r"access\s*denied|invalid\s*token"
 )
 
 _PERSISTENT_PATTERNS = re.compile(
@@ -54,40 +55,52 @@ _PERSISTENT_PATTERNS = re.compile(
     r"is\s*a\s*directory|not\s*a\s*directory|"
     r"no\s*such\s*file|"
     r"syntax\s*error|"
-    r"command\s*not\s*found",
-    re.IGNORECASE,
+    r"command\s*not\s*found"
 )
 
 
+# Upper bound on how much of an error message is classified. Long tool errors
+# (stdout dumps, tracebacks) carry their signal near the start or, for
+# tracebacks, in the final exception line, so the head and tail are kept.
+_CLASSIFY_MAX_CHARS = 2048
+
+
 def classify_error(error_message: str) -> ErrorCategory:
     """Classify an error message into a category.
 
+    Messages longer than ``_CLASSIFY_MAX_CHARS`` are classified on their first
+    and last ``_CLASSIFY_MAX_CHARS // 2`` characters only.
+
     Args:
         error_message: The error string from a tool result.
 
     Returns:
         The error category.
     """
-    if _TRANSIENT_PATTERNS.search(error_message):
+    if len(error_message) > _CLASSIFY_MAX_CHARS:
+        half = _CLASSIFY_MAX_CHARS // 2
+        # NUL is not whitespace, so no pattern can match across the seam.
+        error_message = f"{error_message[:half]}\0{error_message[-half:]}"
+    message = error_message.lower()
+    if _TRANSIENT_PATTERNS.search(message):
         return ErrorCategory.TRANSIENT
-    if _AUTH_PATTERNS.search(error_message):
+    if _AUTH_PATTERNS.search(message):
         return ErrorCategory.AUTH
-    if _PERSISTENT_PATTERNS.search(error_message):
+    if _PERSISTENT_PATTERNS.search(message):
         return ErrorCategory.PERSISTENT
     return ErrorCategory.UNKNOWN
 
 
-def _is_error_result(result: ToolMessage | Command) -> bool:
-    """Check if a tool result indicates an error."""
+def _check_result(result: ToolMessage | Command) -> tuple[bool, str]:
+    """Check a tool result for an error, reading its content once.
+
+    Returns:
+        ``(is_error, content)``; content is empty for Command results.
+    """
     if isinstance(result, Command):
-        return False
+        return False, ""
     content = getattr(result, "content", "")
-    return isinstance(content, str) and content.startswith("Error:")
-
-
-def _get_error_content(result: ToolMessage) -> str:
-    """Extract error content from a ToolMessage."""
-    return getattr(result, "content", "")
+    return isinstance(content, str) and content.startswith("Error:"), content
 
 
 class ToolRetryMiddleware(AgentMiddleware[AgentState]):
@@ -106,6 +119,8 @@ class ToolRetryMiddleware(AgentMiddleware[AgentState]):
         super().__init__()
         self.max_retries = max_retries
         self.base_delay = base_delay
+        # Backoff delay before each retry attempt, computed once
+        self._delays = tuple(base_delay * (1 << attempt) for attempt in range(max_retries))
 
     def _should_retry(self, tool_name: str, error_message: str, attempt: int) -> bool:
         """Determine if a tool call should be retried.
@@ -156,17 +171,16 @@ class ToolRetryMiddleware(AgentMiddleware[AgentState]):
         # First attempt
         result = handler(request)
 
-        if not _is_error_result(result):
+        is_error, error_message = _check_result(result)
+        if not is_error:
             return result
 
-        error_message = _get_error_content(result)
-
         # Retry loop
         for attempt in range(self.max_retries):
             if not self._should_retry(tool_name, error_message, attempt):
                 return result
 
-            delay = self.base_delay * (2 ** attempt)
+            delay = self._delays[attempt]
             logger.warning(
                 "Tool '%s' failed with transient error (attempt %d/%d), retrying in %.1fs: %s",
                 tool_name, attempt + 1, self.max_retries, delay, error_message[:200],
@@ -174,10 +188,10 @@ class ToolRetryMiddleware(AgentMiddleware[AgentState]):
             time.sleep(delay)
 
             result = handler(request)
-            if not _is_error_result(result):
+            is_error, error_message = _check_result(result)
+            if not is_error:
                 logger.info("Tool '%s' succeeded on retry attempt %d", tool_name, attempt + 1)
                 return result
-            error_message = _get_error_content(result)
 
         # All retries exhausted
         logger.error("Tool '%s' failed after %d retries: %s", tool_name, self.max_retries, error_message[:200])
@@ -204,17 +218,16 @@ class ToolRetryMiddleware(AgentMiddleware[AgentState]):
         # First attempt
         result = await handler(request)
 
-        if not _is_error_result(result):
+        is_error, error_message = _check_result(result)
+        if not is_error:
             return result
 
-        error_message = _get_error_content(result)
-
         # Retry loop
         for attempt in range(self.max_retries):
             if not self._should_retry(tool_name, error_message, attempt):
                 return result
 
-            delay = self.base_delay * (2 ** attempt)
+            delay = self._delays[attempt]
             logger.warning(
                 "Tool '%s' failed with transient error (attempt %d/%d), retrying in %.1fs: %s",
                 tool_name, attempt + 1, self.max_retries, delay, error_message[:200],
@@ -222,10 +235,10 @@ class ToolRetryMiddleware(AgentMiddleware[AgentState]):
             await asyncio.sleep(delay)
 
             result = await handler(request)
-            if not _is_error_result(result):
+            is_error, error_message = _check_result(result)
+            if not is_error:
                 logger.info("Tool '%s' succeeded on retry attempt %d", tool_name, attempt + 1)
                 return result
-            error_message = _get_error_content(result)
 
         # All retries exhausted
         logger.error("Tool '%s' failed after %d retries: %s", tool_name, self.max_retries, error_message[:200])
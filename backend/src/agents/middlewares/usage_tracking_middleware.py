@@ -2,7 +2,8 @@
 
 import logging
 import threading
-from typing import override
+from collections.abc import Callable
+from typing import Any, override
 
 from langchain.agents import AgentState
 from langchain.agents.middleware import AgentMiddleware
@@ -12,33 +13,60 @@ from langgraph.runtime import Runtime
 logger = logging.getLogger(__name__)
 
 # Thread-safe accumulator for subagent usage that hasn't been drained yet.
-# Keyed by thread_id so each conversation accumulates independently.
-_pending_subagent_usage: dict[str, dict[str, int]] = {}
-_pending_lock = threading.Lock()
+# Keyed by thread_id so each conversation accumulates independently; values
+# are ``[input_tokens, output_tokens]`` and only become a dict when drained.
+_pending_subagent_usage: dict[str, list[int]] = {}
+# Striped locks: updates for one thread_id are serialized, while unrelated
+# conversations rarely share a stripe.
+_PENDING_LOCK_STRIPES = 32
+_pending_locks = tuple(threading.Lock() for _ in range(_PENDING_LOCK_STRIPES))
+
+
+def _pending_lock_for(thread_id: str) -> threading.Lock:
+    return _pending_locks[hash(thread_id) % _PENDING_LOCK_STRIPES]
 
 
 def add_subagent_usage(thread_id: str, usage: dict[str, int] | None) -> None:
     """Register subagent token usage for later draining by the lead agent."""
     if not usage or not thread_id:
         return
-    with _pending_lock:
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    with _pending_lock_for(thread_id):
         existing = _pending_subagent_usage.get(thread_id)
         if existing is None:
-            _pending_subagent_usage[thread_id] = {
-                "input_tokens": usage.get("input_tokens", 0),
-                "output_tokens": usage.get("output_tokens", 0),
-            }
+            _pending_subagent_usage[thread_id] = [input_tokens, output_tokens]
         else:
-            existing["input_tokens"] += usage.get("input_tokens", 0)
-            existing["output_tokens"] += usage.get("output_tokens", 0)
+            existing[0] += input_tokens
+            existing[1] += output_tokens
 
 
 def drain_subagent_usage(thread_id: str) -> dict[str, int] | None:
     """Pop and return any pending subagent usage for a thread."""
     if not thread_id:
         return None
-    with _pending_lock:
-        return _pending_subagent_usage.pop(thread_id, None)
+    with _pending_lock_for(thread_id):
+        pending = _pending_subagent_usage.pop(thread_id, None)
+    if pending is None:
+        return None
+    return {"input_tokens": pending[0], "output_tokens": pending[1]}
+
+
+def _stream_writer_for(runtime: Runtime) -> Callable[[Any], None] | None:
+    """Return the custom-stream writer for a model step, or ``None``.
+
+    LangGraph injects the writer into ``Runtime`` itself, so the common path is
+    an attribute read. ``get_stream_writer()`` (a config contextvar lookup that
+    raises outside a run) is only consulted for runtimes without one.
+    """
+    writer = getattr(runtime, "stream_writer", None)
+    if writer is not None:
+        return writer
+    try:
+        return get_stream_writer()
+    except Exception:
+        # Stream writer may not be available in all contexts (e.g. tests)
+        return None
 
 
 class UsageTrackingMiddleware(AgentMiddleware[AgentState]):
@@ -51,7 +79,10 @@ class UsageTrackingMiddleware(AgentMiddleware[AgentState]):
     """
 
     def _extract_and_emit(self, state: AgentState, runtime: Runtime) -> dict | None:
-        messages = state.get("messages", [])
+        try:
+            messages = state["messages"]
+        except KeyError:
+            return None
         if not messages:
             return None
 
@@ -87,8 +118,11 @@ class UsageTrackingMiddleware(AgentMiddleware[AgentState]):
             pass  # metrics unavailable
 
         # Emit custom SSE event for real-time frontend display
+        writer = _stream_writer_for(runtime)
+        if writer is None:
+            logger.debug("Could not emit usage_update event (no stream writer)")
+            return {"token_usage": delta}
         try:
-            writer = get_stream_writer()
             writer(
                 {
                     "type": "usage_update",
@@ -97,8 +131,7 @@ class UsageTrackingMiddleware(AgentMiddleware[AgentState]):
                 }
             )
         except Exception:
-            # Stream writer may not be available in all contexts (e.g. tests)
-            logger.debug("Could not emit usage_update event (no stream writer)")
+            logger.debug("Could not emit usage_update event", exc_info=True)
 
         return {"token_usage": delta}
 
@@ -38,14 +38,23 @@ class SubagentTrajectoryState(TypedDict, total=False):
 
 
 def merge_token_usage(existing: TokenUsageState | None, new: TokenUsageState | None) -> TokenUsageState:
-    """Accumulates token counts across model calls and turns."""
+    """Accumulates token counts across model calls and turns.
+
+    The state stays a plain dict because it is checkpointed and sent to the
+    frontend as ``{input_tokens, output_tokens}``. An update that adds no
+    tokens returns ``existing`` itself instead of building a new dict.
+    """
     if existing is None:
         return new or {"input_tokens": 0, "output_tokens": 0}
-    if new is None:
+    if not new:
+        return existing
+    input_delta = new.get("input_tokens", 0)
+    output_delta = new.get("output_tokens", 0)
+    if not input_delta and not output_delta:
         return existing
     return {
-        "input_tokens": existing.get("input_tokens", 0) + new.get("input_tokens", 0),
-        "output_tokens": existing.get("output_tokens", 0) + new.get("output_tokens", 0),
+        "input_tokens": existing.get("input_tokens", 0) + input_delta,
+        "output_tokens": existing.get("output_tokens", 0) + output_delta,
     }
 
 
@@ -53,10 +62,17 @@ def merge_artifacts(existing: list[str] | None, new: list[str] | None) -> list[s
     """Reducer for artifacts list - merges and deduplicates artifacts."""
     if existing is None:
         return new or []
-    if new is None:
+    if not new or existing is new:
+        return existing
+    seen = set(existing)
+    if len(seen) != len(existing):
+        # Duplicates already in the list: rebuild it deduplicated
+        # (dict.fromkeys preserves order)
+        return list(dict.fromkeys(existing + new))
+    added = [path for path in dict.fromkeys(new) if path not in seen]
+    if not added:
         return existing
-    # Use dict.fromkeys to deduplicate while preserving order
-    return list(dict.fromkeys(existing + new))
+    return existing + added
 
 
 def merge_viewed_images(existing: dict[str, ViewedImageData] | None, new: dict[str, ViewedImageData] | None) -> dict[str, ViewedImageData]:
@@ -67,13 +83,15 @@ def merge_viewed_images(existing: dict[str, ViewedImageData] | None, new: dict[s
     """
     if existing is None:
         return new or {}
-    if new is None:
+    if new is None or existing is new:
         return existing
     # Special case: empty dict means clear all viewed images
-    if len(new) == 0:
+    if not new:
         return {}
     # Merge dictionaries, new values override existing ones for same keys
-    return {**existing, **new}
+    merged = existing.copy()
+    merged.update(new)
+    return merged
 
 
 def merge_subagent_trajectories(
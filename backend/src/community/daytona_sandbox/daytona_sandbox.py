@@ -1,13 +1,31 @@
 """Sandbox implementation backed by the Daytona cloud sandbox SDK."""
 
+import base64
+import hashlib
 import logging
+import shlex
+import time
+import uuid
 
+from daytona import FileUpload
 from daytona import Sandbox as DaytonaSandboxInstance
 
-from src.sandbox.sandbox import Sandbox
+from src.sandbox.sandbox import READ_FILE_MAX_BYTES, Sandbox, decode_window
 
 logger = logging.getLogger(__name__)
 
+LIST_DIR_CACHE_TTL = 10  # seconds
+LIST_DIR_CACHE_SIZE = 64
+LIST_DIR_MAX_ENTRIES = 500
+# Appends up to this size are sent inline in the command (base64 grows it by a
+# third, staying well under the kernel's 128 KiB single-argument limit).
+# Larger appends are staged in a temporary file instead.
+APPEND_INLINE_LIMIT = 64 * 1024
+
+
+def _digest(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
 
 class DaytonaSandbox(Sandbox):
     """Sandbox implementation using the Daytona cloud sandbox.
@@ -21,11 +39,54 @@ class DaytonaSandbox(Sandbox):
     def __init__(self, id: str, daytona_sandbox: DaytonaSandboxInstance):
         super().__init__(id)
         self._sandbox = daytona_sandbox
+        # Digest of the last content uploaded to each path, so identical
+        # re-uploads can be skipped. Cleared whenever a command runs, since
+        # it may have changed any file.
+        self._upload_hashes: dict[str, bytes] = {}
+        # list_dir results keyed by (path, max_depth). Each entry records the
+        # filesystem epoch it was listed at; any write or command bumps the
+        # epoch, which invalidates every cached listing.
+        self._fs_epoch = 0
+        self._listing_cache: dict[tuple[str, int], tuple[int, float, list[str]]] = {}
 
     @property
     def daytona_sandbox(self) -> DaytonaSandboxInstance:
         return self._sandbox
 
+    def _upload(self, path: str, content: bytes) -> None:
+        digest = _digest(content)
+        if self._upload_hashes.get(path) == digest:
+            return
+        try:
+            self._sandbox.fs.upload_file(content, path)
+        except Exception:
+            self._upload_hashes.pop(path, None)
+            raise
+        finally:
+            self._fs_epoch += 1
+        self._upload_hashes[path] = digest
+
+    def _append(self, path: str, content: bytes) -> None:
+        quoted = shlex.quote(path)
+        staged: str | None = None
+        if len(content) <= APPEND_INLINE_LIMIT:
+            source = f"printf %s {base64.b64encode(content).decode('ascii')} | base64 -d"
+        else:
+            staged = f"{path}.append-{uuid.uuid4().hex}"
+            source = f"cat {shlex.quote(staged)}"
+        self._upload_hashes.pop(path, None)
+        try:
+            if staged is not None:
+                self._sandbox.fs.upload_file(content, staged)
+            command = f'mkdir -p "$(dirname {quoted})" && {source} >> {quoted}'
+            if staged is not None:
+                command = f"{command}; status=$?; rm -f {shlex.quote(staged)}; exit $status"
+            response = self._sandbox.process.exec(command, timeout=600)
+        finally:
+            self._fs_epoch += 1
+        if response.exit_code != 0:
+            raise RuntimeError(f"append to {path} failed (exit code {response.exit_code}): {response.result or ''}".strip())
+
     def execute_command(self, command: str) -> str:
         try:
             response = self._sandbox.process.exec(command, timeout=600)
@@ -36,6 +97,9 @@ class DaytonaSandbox(Sandbox):
         except Exception as e:
             logger.error("Failed to execute command in Daytona sandbox: %s", e)
             return f"Error: {e}"
+        finally:
+            self._fs_epoch += 1
+            self._upload_hashes.clear()
 
     def read_file(self, path: str) -> str:
         try:
@@ -45,15 +109,52 @@ class DaytonaSandbox(Sandbox):
             logger.error("Failed to read file in Daytona sandbox: %s", e)
             return f"Error: {e}"
 
-    def list_dir(self, path: str, max_depth: int = 2) -> list[str]:
+    def read_file_window(self, path: str, offset: int = 0, max_bytes: int = READ_FILE_MAX_BYTES) -> tuple[str, bool, int]:
+        # Cut the window inside the sandbox so only max_bytes cross the wire,
+        # instead of downloading the whole file to slice it here.
+        quoted = shlex.quote(path)
         try:
-            response = self._sandbox.process.exec(
-                f"find {path} -maxdepth {max_depth} -type f -o -type d 2>/dev/null | head -500"
-            )
+            response = self._sandbox.process.exec(f"wc -c < {quoted} && tail -c +{offset + 1} {quoted} | head -c {max_bytes} | base64 -w 0", timeout=600)
+            if response.exit_code != 0:
+                raise RuntimeError((response.result or "").strip() or f"exit code {response.exit_code}")
+            size, _, encoded = (response.result or "").partition("\n")
+            data = base64.b64decode(encoded.strip())
+        except Exception as e:
+            logger.error("Failed to read file in Daytona sandbox: %s", e)
+            return f"Error: {e}", False, offset
+        truncated = offset + len(data) < int(size)
+        text, consumed = decode_window(data, final=not truncated)
+        return text, truncated, offset + consumed
+
+    def _list_entries(self, path: str, max_depth: int) -> list[str]:
+        # One toolbox API call returning structured entries, instead of a
+        # shell round trip through find whose output has to be split.
+        try:
+            infos = self._sandbox.fs.list_files(path, depth=max_depth)
+            children = [info.path for info in infos[: LIST_DIR_MAX_ENTRIES - 1]]
+        except (TypeError, AttributeError):
+            # Older SDKs list a single level and return entries without a path
+            response = self._sandbox.process.exec(f"find {path} -maxdepth {max_depth} -type f -o -type d 2>/dev/null | head -{LIST_DIR_MAX_ENTRIES}")
             output = response.result or ""
-            if output:
-                return [line.strip() for line in output.strip().split("\n") if line.strip()]
-            return []
+            return [line.strip() for line in output.strip().split("\n") if line.strip()] if output else []
+        # Like find, the listing starts with the directory itself
+        return [path, *children]
+
+    def list_dir(self, path: str, max_depth: int = 2) -> list[str]:
+        key = (path, max_depth)
+        epoch = self._fs_epoch
+        cached = self._listing_cache.get(key)
+        if cached is not None and cached[0] == epoch and time.monotonic() - cached[1] < LIST_DIR_CACHE_TTL:
+            return list(cached[2])
+        try:
+            entries = self._list_entries(path, max_depth)
+            # Store under the epoch observed before the exec, so a write that
+            # raced with this listing still invalidates it.
+            self._listing_cache.pop(key, None)
+            if len(self._listing_cache) >= LIST_DIR_CACHE_SIZE:
+                self._listing_cache.pop(next(iter(self._listing_cache)), None)
+            self._listing_cache[key] = (epoch, time.monotonic(), entries)
+            return list(entries)
         except Exception as e:
             logger.error("Failed to list directory in Daytona sandbox: %s", e)
             return []
@@ -61,17 +162,43 @@ class DaytonaSandbox(Sandbox):
     def write_file(self, path: str, content: str, append: bool = False) -> None:
         try:
             if append:
-                existing = self.read_file(path)
-                if not existing.startswith("Error:"):
-                    content = existing + content
-            self._sandbox.fs.upload_file(content.encode("utf-8"), path)
+                # Append inside the sandbox rather than downloading and
+                # re-uploading the whole file.
+                self._append(path, content.encode("utf-8"))
+            else:
+                self._upload(path, content.encode("utf-8"))
         except Exception as e:
             logger.error("Failed to write file in Daytona sandbox: %s", e)
             raise
 
     def update_file(self, path: str, content: bytes) -> None:
         try:
-            self._sandbox.fs.upload_file(content, path)
+            self._upload(path, content)
         except Exception as e:
             logger.error("Failed to update file in Daytona sandbox: %s", e)
             raise
+
+    def update_files(self, files: list[tuple[str, bytes]]) -> None:
+        upload_files = getattr(self._sandbox.fs, "upload_files", None)
+        if upload_files is None:
+            # Older SDKs have no multipart upload; fall back to one request per file.
+            super().update_files(files)
+            return
+        pending = {}
+        for path, content in files:
+            digest = _digest(content)
+            if self._upload_hashes.get(path) != digest:
+                pending[path] = (content, digest)
+        if not pending:
+            return
+        try:
+            upload_files([FileUpload(source=content, destination=path) for path, (content, _) in pending.items()])
+        except Exception as e:
+            for path in pending:
+                self._upload_hashes.pop(path, None)
+            logger.error("Failed to upload %d file(s) to Daytona sandbox: %s", len(pending), e)
+            raise
+        finally:
+            self._fs_epoch += 1
+        for path, (_, digest) in pending.items():
+            self._upload_hashes[path] = digest
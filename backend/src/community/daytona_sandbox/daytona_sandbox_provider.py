@@ -20,6 +20,8 @@ Configuration in ``config.yaml`` under ``sandbox``:
       language: python
       # Auto-stop interval in minutes (default: 15, 0 to disable)
       auto_stop_interval: 15
+      # Ready sandboxes kept on standby so acquire() skips creation (default: 0)
+      warm_pool_size: 2
       # Environment variables to inject into the sandbox
       environment:
         NODE_ENV: production
@@ -27,11 +29,13 @@ Configuration in ``config.yaml`` under ``sandbox``:
 """
 
 import atexit
+import heapq
 import logging
 import os
 import signal
 import threading
 import time
+from collections import deque
 
 from daytona import CreateSandboxFromImageParams, Daytona, DaytonaConfig
 
@@ -49,7 +53,9 @@ DEFAULT_IMAGE = "python:3.12-slim"
 DEFAULT_LANGUAGE = "python"
 DEFAULT_AUTO_STOP = 15  # minutes
 DEFAULT_TIMEOUT = 120  # seconds to wait for sandbox creation
-IDLE_CHECK_INTERVAL = 60  # seconds
+MIN_IDLE_CHECK_INTERVAL = 1  # seconds
+DEFAULT_WARM_POOL_SIZE = 0
+WARM_POOL_CHECK_INTERVAL = 60  # seconds
 
 
 class DaytonaSandboxProvider(SandboxProvider):
@@ -63,6 +69,7 @@ class DaytonaSandboxProvider(SandboxProvider):
         image: python:3.12-slim
         language: python
         auto_stop_interval: 15
+        warm_pool_size: 0
         environment: {}
     """
 
@@ -72,13 +79,22 @@ class DaytonaSandboxProvider(SandboxProvider):
         self._thread_sandboxes: dict[str, str] = {}  # thread_id -> sandbox_id
         self._last_activity: dict[str, float] = {}  # sandbox_id -> timestamp
         self._user_sandboxes: dict[str, set[str]] = {}  # user_id -> set of sandbox_ids
+        # (earliest idle deadline, sandbox_id); one entry per live sandbox.
+        # Activity only updates _last_activity, and the idle checker re-arms
+        # entries whose sandbox was used since they were pushed.
+        self._expiry_heap: list[tuple[float, str]] = []
         self._shutdown_called = False
         self._idle_checker_stop = threading.Event()
         self._idle_checker_thread: threading.Thread | None = None
+        # (created_at, sandbox) pairs created ahead of demand, oldest first.
+        self._warm_pool: deque[tuple[float, DaytonaSandbox]] = deque()
+        self._warm_pool_wakeup = threading.Event()
+        self._warm_pool_thread: threading.Thread | None = None
 
         self._config = self._load_config()
         self._daytona = self._create_client()
         self._max_per_user: int = self._config.get("max_sandboxes_per_user", 3)
+        self._warm_pool_size: int = self._config.get("warm_pool_size", DEFAULT_WARM_POOL_SIZE)
 
         atexit.register(self.shutdown)
         self._register_signal_handlers()
@@ -86,6 +102,8 @@ class DaytonaSandboxProvider(SandboxProvider):
         idle_timeout = self._config.get("idle_timeout", DEFAULT_AUTO_STOP * 60)
         if idle_timeout > 0:
             self._start_idle_checker()
+        if self._warm_pool_size > 0:
+            self._start_warm_pool_filler()
 
     # ── Client creation ──────────────────────────────────────────────────
 
@@ -115,6 +133,7 @@ class DaytonaSandboxProvider(SandboxProvider):
             "auto_stop_interval": getattr(sandbox_cfg, "auto_stop_interval", None) or DEFAULT_AUTO_STOP,
             "idle_timeout": (getattr(sandbox_cfg, "idle_timeout", None) or DEFAULT_AUTO_STOP * 60),
             "max_sandboxes_per_user": getattr(sandbox_cfg, "max_sandboxes_per_user", 3),
+            "warm_pool_size": getattr(sandbox_cfg, "warm_pool_size", None) or DEFAULT_WARM_POOL_SIZE,
             "environment": self._resolve_env_vars(sandbox_cfg.environment or {}),
         }
 
@@ -156,7 +175,26 @@ class DaytonaSandboxProvider(SandboxProvider):
                     f"User {user_id} has reached the maximum of {self._max_per_user} concurrent sandboxes."
                 )
 
-        # Create a new Daytona sandbox
+        sandbox = self._take_warm_sandbox(thread_id)
+        if sandbox is None:
+            sandbox = self._create_sandbox(thread_id)
+        sandbox_id = sandbox.id
+
+        with self._lock:
+            self._sandboxes[sandbox_id] = sandbox
+            self._last_activity[sandbox_id] = now = time.time()
+            idle_timeout = self._config.get("idle_timeout", DEFAULT_AUTO_STOP * 60)
+            if idle_timeout > 0:
+                heapq.heappush(self._expiry_heap, (now + idle_timeout, sandbox_id))
+            if thread_id:
+                self._thread_sandboxes[thread_id] = sandbox_id
+            if user_id:
+                self._user_sandboxes.setdefault(user_id, set()).add(sandbox_id)
+
+        logger.info("Created Daytona sandbox %s for thread %s", sandbox_id, thread_id)
+        return sandbox_id
+
+    def _create_sandbox(self, thread_id: str | None = None) -> DaytonaSandbox:
         env_vars = dict(self._config.get("environment", {}))
         params = CreateSandboxFromImageParams(
             image=self._config["image"],
@@ -172,19 +210,7 @@ class DaytonaSandboxProvider(SandboxProvider):
             logger.error("Failed to create Daytona sandbox: %s", e)
             raise RuntimeError(f"Failed to create Daytona sandbox: {e}") from e
 
-        sandbox_id = daytona_sb.id
-        sandbox = DaytonaSandbox(id=sandbox_id, daytona_sandbox=daytona_sb)
-
-        with self._lock:
-            self._sandboxes[sandbox_id] = sandbox
-            self._last_activity[sandbox_id] = time.time()
-            if thread_id:
-                self._thread_sandboxes[thread_id] = sandbox_id
-            if user_id:
-                self._user_sandboxes.setdefault(user_id, set()).add(sandbox_id)
-
-        logger.info("Created Daytona sandbox %s for thread %s", sandbox_id, thread_id)
-        return sandbox_id
+        return DaytonaSandbox(id=daytona_sb.id, daytona_sandbox=daytona_sb)
 
     def get(self, sandbox_id: str) -> Sandbox | None:
         with self._lock:
@@ -224,6 +250,15 @@ class DaytonaSandboxProvider(SandboxProvider):
         if self._idle_checker_thread is not None and self._idle_checker_thread.is_alive():
             self._idle_checker_thread.join(timeout=5)
 
+        self._warm_pool_wakeup.set()
+        if self._warm_pool_thread is not None and self._warm_pool_thread.is_alive():
+            self._warm_pool_thread.join(timeout=5)
+        with self._lock:
+            warm = [sandbox for _, sandbox in self._warm_pool]
+            self._warm_pool.clear()
+        for sandbox in warm:
+            self._delete_sandbox(sandbox)
+
         logger.info("Shutting down %d Daytona sandbox(es)", len(sandbox_ids))
         for sandbox_id in sandbox_ids:
             try:
@@ -243,19 +278,36 @@ class DaytonaSandboxProvider(SandboxProvider):
 
     def _idle_checker_loop(self) -> None:
         idle_timeout = self._config.get("idle_timeout", DEFAULT_AUTO_STOP * 60)
-        while not self._idle_checker_stop.wait(timeout=IDLE_CHECK_INTERVAL):
+        wait = idle_timeout
+        while not self._idle_checker_stop.wait(timeout=wait):
             try:
-                self._cleanup_idle(idle_timeout)
+                wait = self._cleanup_idle(idle_timeout)
             except Exception as e:
                 logger.error("Error in Daytona idle checker: %s", e)
+                wait = idle_timeout
+
+    def _cleanup_idle(self, idle_timeout: float) -> float:
+        """Release sandboxes idle for longer than ``idle_timeout``.
 
-    def _cleanup_idle(self, idle_timeout: float) -> None:
+        Only heap entries whose deadline has passed are examined. Returns the
+        number of seconds until the next deadline; sandboxes created in the
+        meantime expire no sooner than ``idle_timeout`` from now.
+        """
         now = time.time()
         to_release = []
         with self._lock:
-            for sandbox_id, last in self._last_activity.items():
-                if now - last > idle_timeout:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                _, sandbox_id = heapq.heappop(heap)
+                last = self._last_activity.get(sandbox_id)
+                if last is None:
+                    continue  # already released
+                deadline = last + idle_timeout
+                if deadline <= now:
                     to_release.append(sandbox_id)
+                else:
+                    heapq.heappush(heap, (deadline, sandbox_id))
+            next_check = heap[0][0] - now if heap else idle_timeout
 
         for sandbox_id in to_release:
             logger.info("Releasing idle Daytona sandbox %s", sandbox_id)
@@ -264,6 +316,94 @@ class DaytonaSandboxProvider(SandboxProvider):
             except Exception as e:
                 logger.error("Failed to release idle Daytona sandbox %s: %s", sandbox_id, e)
 
+        return max(min(next_check, idle_timeout), MIN_IDLE_CHECK_INTERVAL)
+
+    # ── Warm pool ────────────────────────────────────────────────────────
+
+    def _warm_pool_max_age(self) -> float | None:
+        """Age after which a pooled sandbox is replaced, or ``None`` if never.
+
+        Daytona stops sandboxes after ``auto_stop_interval`` minutes without
+        activity, so pooled ones are recycled well before that.
+        """
+        auto_stop = self._config.get("auto_stop_interval", DEFAULT_AUTO_STOP)
+        return auto_stop * 60 / 2 if auto_stop > 0 else None
+
+    def _take_warm_sandbox(self, thread_id: str | None) -> DaytonaSandbox | None:
+        max_age = self._warm_pool_max_age()
+        now = time.time()
+        stale = []
+        sandbox = None
+        with self._lock:
+            while self._warm_pool:
+                created_at, candidate = self._warm_pool.popleft()
+                if max_age is not None and now - created_at > max_age:
+                    stale.append(candidate)
+                    continue
+                sandbox = candidate
+                break
+        if self._warm_pool_size > 0:
+            self._warm_pool_wakeup.set()
+        for candidate in stale:
+            self._delete_sandbox(candidate)
+        if sandbox is None:
+            return None
+
+        if thread_id:
+            try:
+                sandbox.daytona_sandbox.set_labels({"thread_id": thread_id})
+            except Exception as e:
+                logger.warning("Failed to label warm Daytona sandbox %s for thread %s: %s", sandbox.id, thread_id, e)
+        logger.info("Took Daytona sandbox %s from the warm pool", sandbox.id)
+        return sandbox
+
+    def _delete_sandbox(self, sandbox: DaytonaSandbox) -> None:
+        try:
+            self._daytona.delete(sandbox.daytona_sandbox, timeout=60)
+        except Exception as e:
+            logger.error("Failed to delete Daytona sandbox %s: %s", sandbox.id, e)
+
+    def _start_warm_pool_filler(self) -> None:
+        self._warm_pool_thread = threading.Thread(
+            target=self._warm_pool_loop,
+            name="daytona-sandbox-warm-pool",
+            daemon=True,
+        )
+        self._warm_pool_thread.start()
+
+    def _warm_pool_loop(self) -> None:
+        while not self._shutdown_called:
+            try:
+                self._fill_warm_pool()
+            except Exception as e:
+                logger.error("Error filling Daytona warm pool: %s", e)
+            self._warm_pool_wakeup.wait(timeout=WARM_POOL_CHECK_INTERVAL)
+            self._warm_pool_wakeup.clear()
+
+    def _fill_warm_pool(self) -> None:
+        """Drop stale pooled sandboxes and create new ones up to the target size."""
+        max_age = self._warm_pool_max_age()
+        stale = []
+        with self._lock:
+            if max_age is not None:
+                now = time.time()
+                while self._warm_pool and now - self._warm_pool[0][0] > max_age:
+                    stale.append(self._warm_pool.popleft()[1])
+        for sandbox in stale:
+            self._delete_sandbox(sandbox)
+
+        while not self._shutdown_called:
+            with self._lock:
+                if len(self._warm_pool) >= self._warm_pool_size:
+                    return
+            sandbox = self._create_sandbox()
+            with self._lock:
+                if not self._shutdown_called:
+                    self._warm_pool.append((time.time(), sandbox))
+                    logger.info("Added Daytona sandbox %s to the warm pool", sandbox.id)
+                    continue
+            self._delete_sandbox(sandbox)
+
     # ── Signal handling ──────────────────────────────────────────────────
 
     def _register_signal_handlers(self) -> None:
@@ -14,12 +14,34 @@ class MemoryConfig(BaseModel):
         default=".think-tank/memory.json",
         description="Path to store memory data (relative to backend directory)",
     )
+    storage_is_atomic: bool = Field(
+        default=False,
+        description="Write memory files in place instead of temp file + rename (only for storage that already replaces whole files atomically, e.g. object-store mounts)",
+    )
     debounce_seconds: int = Field(
         default=30,
         ge=1,
         le=300,
         description="Seconds to wait before processing queued updates (debounce)",
     )
+    max_concurrent_updates: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        description="Maximum number of users whose queued memory updates are processed in parallel",
+    )
+    cache_check_seconds: float = Field(
+        default=2.0,
+        ge=0.0,
+        le=60.0,
+        description="Seconds cached memory is trusted before storage is re-checked: file mtime, or a re-read in database mode (0 = check on every read)",
+    )
+    cache_max_users: int = Field(
+        default=1024,
+        ge=1,
+        le=100_000,
+        description="Maximum number of users whose memory is kept in the in-process cache (least recently used are evicted)",
+    )
     model_name: str | None = Field(
         default=None,
         description="Model name to use for memory updates (None = use default model)",
@@ -1,22 +1,29 @@
 import logging
 import os
 import threading
+from functools import cached_property
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 logger = logging.getLogger(__name__)
 _config_lock = threading.Lock()
 
 
 class TracingConfig(BaseModel):
-    """Configuration for LangSmith tracing."""
+    """Configuration for LangSmith tracing.
+
+    Read once from the environment and never changed afterwards, so it is
+    frozen and ``is_configured`` is computed only once.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     enabled: bool = Field(...)
     api_key: str | None = Field(...)
     project: str = Field(...)
     endpoint: str = Field(...)
 
-    @property
+    @cached_property
     def is_configured(self) -> bool:
         """Check if tracing is fully configured (enabled and has API key)."""
         return self.enabled and bool(self.api_key)
@@ -61,4 +68,8 @@ def is_tracing_enabled() -> bool:
     Returns:
         True if tracing is enabled and has an API key.
     """
-    return get_tracing_config().is_configured
+    # Called on every model creation; skip the getter once the config is set.
+    config = _tracing_config
+    if config is None:
+        config = get_tracing_config()
+    return config.is_configured
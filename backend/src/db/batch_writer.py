@@ -0,0 +1,90 @@
+"""Background batching for append-only database writes.
+
+Hot paths (agent middleware hooks) only append an item to an in-memory
+queue. A daemon worker writes each item within ``flush_interval`` seconds
+of it being queued, sooner once ``max_batch`` items are pending, and hands
+each batch to ``write_batch`` so it lands in a single transaction, keeping
+database round-trips off the agent loop.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter[T](ABC):
+    """Queue items and write them in batches from a daemon thread.
+
+    Subclasses implement ``write_batch``. Failed batches are logged and
+    dropped: these writes are observability data and must never break the
+    caller. Beyond ``max_pending`` queued items the oldest are dropped rather
+    than growing without bound while the database is unreachable.
+    """
+
+    def __init__(self, name: str, *, max_batch: int, flush_interval: float, max_pending: int = 10_000):
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._pending: deque[T] = deque(maxlen=max_pending)
+        self._cond = threading.Condition()
+        # Held while a batch is taken and written so batches land in order.
+        self._write_lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    @abstractmethod
+    def write_batch(self, batch: list[T]) -> None:
+        """Write one batch, in a single transaction where possible."""
+
+    def submit(self, item: T) -> None:
+        """Queue an item for the next flush."""
+        with self._cond:
+            if len(self._pending) == self._pending.maxlen:
+                logger.warning("%s queue full; dropping oldest pending item", self.name)
+            self._pending.append(item)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+                atexit.register(self.flush)
+            elif len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                # Wake an idle worker to start the flush interval, or an
+                # already-waiting one early once a full batch is ready
+                self._cond.notify()
+
+    def _run(self) -> None:
+        """Worker loop: wait for pending items, gather a batch, then flush."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.max_batch and (remaining := deadline - time.monotonic()) > 0:
+                    self._cond.wait(timeout=remaining)
+            self.flush()
+
+    def flush(self) -> None:
+        """Write everything pending now.
+
+        Called by the worker, at interpreter exit, and by tests.
+        """
+        with self._write_lock:
+            with self._cond:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return
+            try:
+                self.write_batch(batch)
+            except Exception:
+                logger.exception("%s batch write failed (%d pending items dropped)", self.name, len(batch))
+
+    @property
+    def pending_count(self) -> int:
+        """Number of items waiting to be written."""
+        with self._cond:
+            return len(self._pending)
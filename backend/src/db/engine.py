@@ -7,13 +7,14 @@ file-based storage in .think-tank/ directory.
 
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os
 from collections.abc import Generator
 from contextlib import contextmanager
 from pathlib import Path
 
-from sqlalchemy import Engine, create_engine, text
+from sqlalchemy import Connection, Engine, create_engine, text
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 logger = logging.getLogger(__name__)
@@ -30,16 +31,44 @@ def get_database_url() -> str | None:
     return os.environ.get("DATABASE_URL")
 
 
+_SYNC_DRIVERS = ("psycopg", "psycopg2")
+
+
+def _sync_scheme() -> str:
+    """URL scheme of the synchronous PostgreSQL driver.
+
+    ``DB_SYNC_DRIVER`` (``psycopg`` or ``psycopg2``) pins the driver.
+    Otherwise psycopg (v3) is preferred when installed: it prepares frequently
+    executed statements server-side and batches executemany() through pipeline
+    mode. psycopg2 remains the fallback and SQLAlchemy's default for
+    "postgresql://". Code that uses the raw DBAPI connection (e.g. COPY in
+    scripts/migrate_data.py) must handle both drivers.
+    """
+    driver = os.environ.get("DB_SYNC_DRIVER")
+    if driver is None:
+        return "postgresql+psycopg://" if importlib.util.find_spec("psycopg") is not None else "postgresql://"
+    if driver not in _SYNC_DRIVERS:
+        raise ValueError(f"DB_SYNC_DRIVER must be one of {', '.join(_SYNC_DRIVERS)}, got {driver!r}")
+    return f"postgresql+{driver}://"
+
+
+_SYNC_SCHEME = _sync_scheme()
+
+
 def get_sync_database_url() -> str | None:
     """Get a synchronous database URL from the configured DATABASE_URL.
 
-    Converts asyncpg URLs to psycopg2-compatible URLs for synchronous operations.
+    Converts asyncpg and driverless URLs to the best installed synchronous
+    driver: psycopg (v3) if available, otherwise psycopg2. URLs that already
+    name a synchronous driver are returned unchanged.
     """
     url = get_database_url()
     if not url:
         return None
-    # Convert async driver to sync driver
-    return url.replace("postgresql+asyncpg://", "postgresql://")
+    for scheme in ("postgresql+asyncpg://", "postgresql://"):
+        if url.startswith(scheme):
+            return _SYNC_SCHEME + url[len(scheme) :]
+    return url
 
 
 def is_db_enabled() -> bool:
@@ -47,6 +76,17 @@ def is_db_enabled() -> bool:
     return bool(get_database_url())
 
 
+# Connection pool sizing, per process. Every gateway worker and background
+# worker holds its own pool, so size * processes must fit the server's
+# max_connections.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+# Replace pooled connections periodically so ones silently dropped by
+# proxies or load balancers are not handed out.
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+# libpq TCP keepalives keep long-lived idle connections alive through NAT.
+_POSTGRES_CONNECT_ARGS = {"keepalives": 1, "keepalives_idle": 30}
+
 # Lazy-initialized engine and session factory
 _engine: Engine | None = None
 _session_factory: sessionmaker[Session] | None = None
@@ -65,9 +105,14 @@ def get_engine() -> Engine:
             raise RuntimeError("DATABASE_URL is not configured")
         _engine = create_engine(
             url,
-            pool_size=5,
-            max_overflow=10,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_recycle=DB_POOL_RECYCLE,
             pool_pre_ping=True,
+            # Reuse the most recently returned connection so bursts of short
+            # sessions stay on one warm connection and idle ones can time out.
+            pool_use_lifo=True,
+            connect_args=_POSTGRES_CONNECT_ARGS if url.startswith("postgresql") else {},
             echo=False,
         )
     return _engine
@@ -102,6 +147,23 @@ def get_db_session() -> Generator[Session, None, None]:
         session.close()
 
 
+@contextmanager
+def get_db_readonly() -> Generator[Connection, None, None]:
+    """Get an autocommit connection for single-statement reads.
+
+    Each statement runs on its own, so no BEGIN/COMMIT round trips are
+    spent on reads that need no transaction. Do not use it for writes
+    that must be atomic.
+
+    Usage::
+
+        with get_db_readonly() as conn:
+            conn.execute(select(UserModel.email)).all()
+    """
+    with get_engine().connect() as conn:
+        yield conn.execution_options(isolation_level="AUTOCOMMIT")
+
+
 def init_db() -> None:
     """Initialize the database: create all tables.
 
@@ -150,8 +212,7 @@ def check_db_connection() -> str:
         "healthy" if connection succeeds, error description otherwise.
     """
     try:
-        engine = get_engine()
-        with engine.connect() as conn:
+        with get_db_readonly() as conn:
             conn.execute(text("SELECT 1"))
         return "healthy"
     except Exception as e:
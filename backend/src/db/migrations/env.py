@@ -4,7 +4,6 @@ Reads DATABASE_URL from the environment and runs migrations
 against the configured PostgreSQL database.
 """
 
-import os
 from logging.config import fileConfig
 
 from alembic import context
@@ -13,7 +12,7 @@ from sqlalchemy import create_engine, pool
 import src.db.models  # noqa: F401
 
 # Import Base and all models so Alembic can detect them
-from src.db.engine import Base
+from src.db.engine import Base, get_sync_database_url
 
 config = context.config
 if config.config_file_name is not None:
@@ -23,10 +22,8 @@ target_metadata = Base.metadata
 
 
 def get_url() -> str:
-    """Get the database URL from environment."""
-    url = os.environ.get("DATABASE_URL", "")
-    # Convert asyncpg URL to sync for Alembic
-    return url.replace("postgresql+asyncpg://", "postgresql://")
+    """Get the database URL from environment, using the app's sync driver."""
+    return get_sync_database_url() or ""
 
 
 def run_migrations_offline() -> None:
@@ -0,0 +1,27 @@
+"""Add a (thread_id, id) index on timeline_events.
+
+The timeline middleware resolves a thread's latest message event with
+``WHERE thread_id = ? ORDER BY id DESC LIMIT 1``; the composite index serves
+both the filter and the ordering.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "007"
+down_revision: str | None = "006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_timeline_thread_id_id", "timeline_events", ["thread_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_timeline_thread_id_id", table_name="timeline_events")
@@ -0,0 +1,43 @@
+"""Add a covering (user_id, created_at) index on usage_log and widen its id.
+
+Per-user usage windows filter on ``user_id`` and a ``created_at`` range and
+sum the token columns; the composite index serves the filter and, through
+INCLUDE, the sums without heap fetches. It also covers every lookup the
+single-column ``user_id`` index served, so that index is dropped. ``id``
+becomes BIGINT so the append-only log cannot exhaust its key space.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: str | None = "007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_usage_log_user_created",
+        "usage_log",
+        ["user_id", sa.text("created_at DESC")],
+        postgresql_include=["input_tokens", "output_tokens"],
+    )
+    op.drop_index("idx_usage_log_user_id", table_name="usage_log")
+
+    op.alter_column("usage_log", "id", type_=sa.BigInteger, existing_type=sa.Integer, existing_nullable=False)
+    op.execute("ALTER SEQUENCE IF EXISTS usage_log_id_seq AS BIGINT")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE IF EXISTS usage_log_id_seq AS INTEGER")
+    op.alter_column("usage_log", "id", type_=sa.Integer, existing_type=sa.BigInteger, existing_nullable=False)
+
+    op.create_index("idx_usage_log_user_id", "usage_log", ["user_id"])
+    op.drop_index("idx_usage_log_user_created", table_name="usage_log")
@@ -0,0 +1,119 @@
+"""Range-partition usage_log by month on created_at.
+
+usage_log is append-only and read by time window. As monthly partitions,
+inserts only touch the current month's indexes, window queries prune to the
+months they cover, and old months can be dropped with ``DROP TABLE`` instead
+of ``DELETE`` plus vacuum. PostgreSQL requires the partition key in the
+primary key, so it becomes ``(id, created_at)`` and ``created_at`` becomes
+NOT NULL. Partitions are created for every month with existing rows through
+three months ahead; ``src.db.partitions`` keeps creating upcoming months, and
+a default partition catches anything outside them.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: str | None = "008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_MONTHS_AHEAD = 3
+_COLUMNS = "id, user_id, thread_id, model_name, input_tokens, output_tokens, created_at"
+
+
+def _month_start(value: datetime) -> datetime:
+    value = value.astimezone(UTC)
+    return datetime(value.year, value.month, 1, tzinfo=UTC)
+
+
+def _next_month(start: datetime) -> datetime:
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=UTC)
+
+
+def _create_indexes() -> None:
+    op.create_index("idx_usage_log_created_at", "usage_log", ["created_at"])
+    op.create_index(
+        "idx_usage_log_user_created",
+        "usage_log",
+        ["user_id", sa.text("created_at DESC")],
+        postgresql_include=["input_tokens", "output_tokens"],
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Detach the id sequence so dropping the old table keeps it
+    op.execute("ALTER SEQUENCE usage_log_id_seq OWNED BY NONE")
+    op.drop_index("idx_usage_log_user_created", table_name="usage_log")
+    op.drop_index("idx_usage_log_created_at", table_name="usage_log")
+    op.execute("ALTER TABLE usage_log DROP CONSTRAINT usage_log_pkey")
+    op.rename_table("usage_log", "usage_log_old")
+
+    op.execute(
+        """
+        CREATE TABLE usage_log (
+            id BIGINT NOT NULL DEFAULT nextval('usage_log_id_seq'::regclass),
+            user_id VARCHAR(32) NOT NULL,
+            thread_id VARCHAR(64),
+            model_name VARCHAR(128),
+            input_tokens INTEGER DEFAULT 0,
+            output_tokens INTEGER DEFAULT 0,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+
+    now = datetime.now(UTC)
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM usage_log_old")).scalar()
+    start = _month_start(min(oldest, now) if oldest is not None else now)
+    stop = _month_start(now)
+    for _ in range(_MONTHS_AHEAD):
+        stop = _next_month(stop)
+    while start <= stop:
+        end = _next_month(start)
+        op.execute(f"CREATE TABLE usage_log_y{start.year:04d}m{start.month:02d} PARTITION OF usage_log FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+        start = end
+    op.execute("CREATE TABLE usage_log_default PARTITION OF usage_log DEFAULT")
+    _create_indexes()
+
+    op.execute(f"INSERT INTO usage_log ({_COLUMNS}) SELECT id, user_id, thread_id, model_name, input_tokens, output_tokens, COALESCE(created_at, now()) FROM usage_log_old")
+    op.drop_table("usage_log_old")
+    op.execute("ALTER SEQUENCE usage_log_id_seq OWNED BY usage_log.id")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE usage_log_id_seq OWNED BY NONE")
+    op.rename_table("usage_log", "usage_log_partitioned")
+    for index in ("idx_usage_log_user_created", "idx_usage_log_created_at"):
+        op.drop_index(index, table_name="usage_log_partitioned")
+    op.execute("ALTER TABLE usage_log_partitioned DROP CONSTRAINT usage_log_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE usage_log (
+            id BIGINT NOT NULL DEFAULT nextval('usage_log_id_seq'::regclass) PRIMARY KEY,
+            user_id VARCHAR(32) NOT NULL,
+            thread_id VARCHAR(64),
+            model_name VARCHAR(128),
+            input_tokens INTEGER DEFAULT 0,
+            output_tokens INTEGER DEFAULT 0,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+        """
+    )
+    _create_indexes()
+
+    op.execute(f"INSERT INTO usage_log ({_COLUMNS}) SELECT {_COLUMNS} FROM usage_log_partitioned")
+    # Dropping the parent drops every partition with it
+    op.drop_table("usage_log_partitioned")
+    op.execute("ALTER SEQUENCE usage_log_id_seq OWNED BY usage_log.id")
@@ -0,0 +1,34 @@
+"""Add a GIN (jsonb_path_ops) index on user_memory.memory_json.
+
+The column is already JSONB NOT NULL on PostgreSQL (migration 001); the index
+lets containment (``@>``) lookups into memory documents use an index instead
+of decoding every row. ``jsonb_path_ops`` only supports ``@>`` but is
+smaller and faster to maintain than the default ``jsonb_ops``.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "010"
+down_revision: str | None = "009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_user_memory_json",
+        "user_memory",
+        ["memory_json"],
+        postgresql_using="gin",
+        postgresql_ops={"memory_json": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_user_memory_json", table_name="user_memory")
@@ -0,0 +1,120 @@
+"""Range-partition timeline_events by month on created_at.
+
+Same layout as usage_log (migration 009): the timeline is append-only and
+only ever grows, so monthly partitions keep inserts on the current month's
+indexes and let old months be removed with ``DROP TABLE`` instead of
+``DELETE`` plus vacuum. The primary key becomes ``(id, created_at)``,
+``created_at`` becomes NOT NULL and ``id`` is widened to BIGINT.
+``src.db.partitions`` keeps creating upcoming months.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "011"
+down_revision: str | None = "010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_MONTHS_AHEAD = 3
+_COLUMNS = "id, thread_id, event_type, stage, message_index, role, message_id, message_data, created_at"
+_INDEXES = ("idx_timeline_thread_id", "idx_timeline_created_at", "idx_timeline_thread_id_id")
+
+
+def _month_start(value: datetime) -> datetime:
+    value = value.astimezone(UTC)
+    return datetime(value.year, value.month, 1, tzinfo=UTC)
+
+
+def _next_month(start: datetime) -> datetime:
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=UTC)
+
+
+def _create_indexes() -> None:
+    op.create_index("idx_timeline_thread_id", "timeline_events", ["thread_id"])
+    op.create_index("idx_timeline_created_at", "timeline_events", ["created_at"])
+    op.create_index("idx_timeline_thread_id_id", "timeline_events", ["thread_id", "id"])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Detach the id sequence so dropping the old table keeps it
+    op.execute("ALTER SEQUENCE timeline_events_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE timeline_events_id_seq AS BIGINT")
+    for index in _INDEXES:
+        op.drop_index(index, table_name="timeline_events")
+    op.execute("ALTER TABLE timeline_events DROP CONSTRAINT timeline_events_pkey")
+    op.rename_table("timeline_events", "timeline_events_old")
+
+    op.execute(
+        """
+        CREATE TABLE timeline_events (
+            id BIGINT NOT NULL DEFAULT nextval('timeline_events_id_seq'::regclass),
+            thread_id VARCHAR(64) NOT NULL,
+            event_type VARCHAR(64) NOT NULL,
+            stage VARCHAR(32),
+            message_index INTEGER,
+            role VARCHAR(32),
+            message_id TEXT,
+            message_data JSONB,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+
+    now = datetime.now(UTC)
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM timeline_events_old")).scalar()
+    start = _month_start(min(oldest, now) if oldest is not None else now)
+    stop = _month_start(now)
+    for _ in range(_MONTHS_AHEAD):
+        stop = _next_month(stop)
+    while start <= stop:
+        end = _next_month(start)
+        op.execute(f"CREATE TABLE timeline_events_y{start.year:04d}m{start.month:02d} PARTITION OF timeline_events FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+        start = end
+    op.execute("CREATE TABLE timeline_events_default PARTITION OF timeline_events DEFAULT")
+    _create_indexes()
+
+    op.execute(f"INSERT INTO timeline_events ({_COLUMNS}) SELECT id, thread_id, event_type, stage, message_index, role, message_id, message_data, COALESCE(created_at, now()) FROM timeline_events_old")
+    op.drop_table("timeline_events_old")
+    op.execute("ALTER SEQUENCE timeline_events_id_seq OWNED BY timeline_events.id")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE timeline_events_id_seq OWNED BY NONE")
+    op.rename_table("timeline_events", "timeline_events_partitioned")
+    for index in _INDEXES:
+        op.drop_index(index, table_name="timeline_events_partitioned")
+    op.execute("ALTER TABLE timeline_events_partitioned DROP CONSTRAINT timeline_events_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE timeline_events (
+            id INTEGER NOT NULL DEFAULT nextval('timeline_events_id_seq'::regclass) PRIMARY KEY,
+            thread_id VARCHAR(64) NOT NULL,
+            event_type VARCHAR(64) NOT NULL,
+            stage VARCHAR(32),
+            message_index INTEGER,
+            role VARCHAR(32),
+            message_id TEXT,
+            message_data JSONB,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+        """
+    )
+    _create_indexes()
+
+    op.execute(f"INSERT INTO timeline_events ({_COLUMNS}) SELECT {_COLUMNS} FROM timeline_events_partitioned")
+    # Dropping the parent drops every partition with it
+    op.drop_table("timeline_events_partitioned")
+    op.execute("ALTER SEQUENCE timeline_events_id_seq AS INTEGER")
+    op.execute("ALTER SEQUENCE timeline_events_id_seq OWNED BY timeline_events.id")
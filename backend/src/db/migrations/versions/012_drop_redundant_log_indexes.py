@@ -0,0 +1,36 @@
+"""Drop single-column indexes on timeline_events and usage_log.
+
+Every timeline read is "events of thread X ordered by id", which the
+composite ``(thread_id, id)`` index (migration 007) serves on its own, and
+usage reads are per user in a time window, served by
+``(user_id, created_at DESC)`` (migration 008). ``idx_timeline_thread_id``
+is a prefix of the composite index, and nothing scans either table by
+``created_at`` alone: both are partitioned by month, so time ranges prune to
+partitions and retention drops whole partitions. The three indexes only
+cost work on every insert into these append-only tables.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "012"
+down_revision: str | None = "011"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.drop_index("idx_timeline_thread_id", table_name="timeline_events")
+    op.drop_index("idx_timeline_created_at", table_name="timeline_events")
+    op.drop_index("idx_usage_log_created_at", table_name="usage_log")
+
+
+def downgrade() -> None:
+    op.create_index("idx_usage_log_created_at", "usage_log", ["created_at"])
+    op.create_index("idx_timeline_created_at", "timeline_events", ["created_at"])
+    op.create_index("idx_timeline_thread_id", "timeline_events", ["thread_id"])
@@ -18,6 +18,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
@@ -26,6 +27,11 @@ from sqlalchemy.types import JSON
 from src.db.engine import Base
 
 
+# Timestamps default to the database clock on insert (the migrations declare
+# DEFAULT now() too). On PostgreSQL that is a timestamptz fetched back through
+# RETURNING; SQLite, which only backs the test suite, stores CURRENT_TIMESTAMP
+# as naive UTC with second resolution. updated_at is set in Python on update,
+# so the value stays loaded on the instance after flush.
 def _utcnow() -> datetime:
     return datetime.now(UTC)
 
@@ -34,6 +40,9 @@ def _utcnow() -> datetime:
 # In PostgreSQL this will use JSONB; in SQLite it uses JSON
 _JSONType = JSON().with_variant(JSONB, "postgresql")
 
+# 64-bit autoincrement key; SQLite only autoincrements INTEGER PRIMARY KEY
+_BigIntIdType = BigInteger().with_variant(Integer, "sqlite")
+
 
 class UserModel(Base):
     """User account model."""
@@ -44,8 +53,8 @@ class UserModel(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     display_name: Mapped[str | None] = mapped_column(String(128), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=_utcnow)
 
     def to_dict(self, include_password: bool = False) -> dict:
         """Convert to dictionary representation."""
@@ -68,8 +77,8 @@ class ThreadModel(Base):
     thread_id: Mapped[str] = mapped_column(String(64), primary_key=True)
     user_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     title: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=_utcnow)
     s3_sync_status: Mapped[str] = mapped_column(String(16), nullable=False, server_default="none")
     last_accessed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     local_evicted: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=sa.text("false"))
@@ -92,8 +101,8 @@ class ProjectModel(Base):
     project_id: Mapped[str] = mapped_column(String(32), primary_key=True)
     user_id: Mapped[str] = mapped_column(String(32), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=_utcnow)
 
     __table_args__ = (
         UniqueConstraint("user_id", "name", name="uq_projects_user_name"),
@@ -108,7 +117,12 @@ class UserMemoryModel(Base):
 
     user_id: Mapped[str] = mapped_column(String(32), primary_key=True)
     memory_json: Mapped[dict] = mapped_column(_JSONType, nullable=False, default=dict)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=_utcnow)
+
+    __table_args__ = (
+        # Serves JSONB containment (@>) lookups into the memory document
+        Index("idx_user_memory_json", "memory_json", postgresql_using="gin", postgresql_ops={"memory_json": "jsonb_path_ops"}),
+    )
 
 
 class UserApiKeyModel(Base):
@@ -120,7 +134,7 @@ class UserApiKeyModel(Base):
     user_id: Mapped[str] = mapped_column(String(32), nullable=False)
     provider: Mapped[str] = mapped_column(String(64), nullable=False)
     encrypted_key: Mapped[str] = mapped_column(Text, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (
         UniqueConstraint("user_id", "provider", name="uq_user_api_keys_user_provider"),
@@ -138,7 +152,7 @@ class UserModelPreferenceModel(Base):
     thinking_effort: Mapped[str | None] = mapped_column(String(32), nullable=True)
     provider_enabled: Mapped[dict] = mapped_column(_JSONType, nullable=False, default=dict)
     enabled_models: Mapped[dict] = mapped_column(_JSONType, nullable=False, default=dict)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=_utcnow)
 
 
 class UploadModel(Base):
@@ -153,7 +167,7 @@ class UploadModel(Base):
     content_type: Mapped[str | None] = mapped_column(String(128), nullable=True)
     size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     storage_path: Mapped[str] = mapped_column(Text, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (Index("idx_uploads_thread_id", "thread_id"),)
 
@@ -163,11 +177,14 @@ class TimelineEventModel(Base):
 
     Records every message (human/ai/tool) and history truncation event
     as an ordered timeline for observability and debugging.
+
+    Partitioned by month on ``created_at`` in PostgreSQL like ``usage_log``,
+    so its primary key there is ``(id, created_at)``.
     """
 
     __tablename__ = "timeline_events"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(_BigIntIdType, primary_key=True, autoincrement=True)
     thread_id: Mapped[str] = mapped_column(String(64), nullable=False)
     event_type: Mapped[str] = mapped_column(String(64), nullable=False)
     stage: Mapped[str | None] = mapped_column(String(32), nullable=True)
@@ -175,28 +192,31 @@ class TimelineEventModel(Base):
     role: Mapped[str | None] = mapped_column(String(32), nullable=True)
     message_id: Mapped[str | None] = mapped_column(Text, nullable=True)
     message_data: Mapped[dict | None] = mapped_column(_JSONType, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    __table_args__ = (
-        Index("idx_timeline_thread_id", "thread_id"),
-        Index("idx_timeline_created_at", "created_at"),
-    )
+    # Reads filter by thread and order by id; time ranges prune to partitions
+    __table_args__ = (Index("idx_timeline_thread_id_id", "thread_id", "id"),)
 
 
 class UsageLogModel(Base):
-    """Usage tracking / rate limiting model."""
+    """Usage tracking / rate limiting model.
+
+    In PostgreSQL the table is range-partitioned by month on ``created_at``
+    (see ``src.db.partitions``), so its primary key there is
+    ``(id, created_at)``; ``id`` alone stays unique through its sequence.
+    """
 
     __tablename__ = "usage_log"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(_BigIntIdType, primary_key=True, autoincrement=True)
     user_id: Mapped[str] = mapped_column(String(32), nullable=False)
     thread_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     model_name: Mapped[str | None] = mapped_column(String(128), nullable=True)
     input_tokens: Mapped[int] = mapped_column(Integer, default=0)
     output_tokens: Mapped[int] = mapped_column(Integer, default=0)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (
-        Index("idx_usage_log_user_id", "user_id"),
-        Index("idx_usage_log_created_at", "created_at"),
+        # Per-user time-window scans read the token counts from the index alone
+        Index("idx_usage_log_user_created", "user_id", sa.text("created_at DESC"), postgresql_include=["input_tokens", "output_tokens"]),
     )
@@ -0,0 +1,135 @@
+"""Maintenance for monthly range-partitioned PostgreSQL tables.
+
+``usage_log`` and ``timeline_events`` are partitioned by month on
+``created_at`` (migrations 009 and 011). Rows for a month without its own
+partition land in the table's default partition, and a month's partition
+cannot be created once the default holds rows for it, so upcoming months are
+created ahead of time. When ``PARTITION_RETENTION_MONTHS`` is set, months
+older than that are detached and dropped.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.db.engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("usage_log", "timeline_events")
+DEFAULT_MONTHS_AHEAD = 3
+# Whole months of data to keep besides the current one; 0 keeps everything
+PARTITION_RETENTION_MONTHS = int(os.environ.get("PARTITION_RETENTION_MONTHS", "0"))
+
+
+def month_start(value: datetime) -> datetime:
+    """Return the first instant (UTC) of the month containing ``value``."""
+    value = value.astimezone(UTC)
+    return datetime(value.year, value.month, 1, tzinfo=UTC)
+
+
+def next_month(start: datetime) -> datetime:
+    """Return the first instant of the month after ``start``."""
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=UTC)
+
+
+def months_before(start: datetime, months: int) -> datetime:
+    """Return the first instant of the month ``months`` before ``start``."""
+    index = start.year * 12 + start.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=UTC)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    """Name of the partition holding ``table`` rows for the month of ``start``."""
+    return f"{table}_y{start.year:04d}m{start.month:02d}"
+
+
+def _child_partitions(conn, table: str) -> list[str]:
+    return list(
+        conn.execute(
+            text("SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid JOIN pg_class parent ON parent.oid = pg_inherits.inhparent WHERE parent.relname = :table"),
+            {"table": table},
+        ).scalars()
+    )
+
+
+def ensure_monthly_partitions(table: str, months_ahead: int = DEFAULT_MONTHS_AHEAD, now: datetime | None = None) -> list[str]:
+    """Create the partitions of ``table`` for this month and ``months_ahead`` more.
+
+    Safe to call from several processes at once: creation is serialized with a
+    transaction-scoped advisory lock and existing partitions are skipped. A
+    no-op outside PostgreSQL.
+
+    Returns:
+        Names of the partitions that were created.
+    """
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        return []
+
+    start = month_start(now or datetime.now(UTC))
+    created = []
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"partitions:{table}"})
+        existing = set(_child_partitions(conn, table))
+        for _ in range(months_ahead + 1):
+            end = next_month(start)
+            name = partition_name(table, start)
+            if name not in existing:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"))
+                    created.append(name)
+                except DBAPIError as e:
+                    # Usually the default partition already holds rows for this month
+                    logger.warning("Could not create partition %s: %s", name, str(e.orig).strip())
+            start = end
+
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
+
+
+def drop_expired_partitions(table: str, retention_months: int, now: datetime | None = None) -> list[str]:
+    """Detach and drop the monthly partitions of ``table`` past retention.
+
+    A partition is dropped once its whole month lies more than
+    ``retention_months`` months before the current one. The default
+    partition is never touched. A no-op outside PostgreSQL.
+
+    Returns:
+        Names of the partitions that were dropped.
+    """
+    engine = get_engine()
+    if engine.dialect.name != "postgresql" or retention_months <= 0:
+        return []
+
+    cutoff = months_before(month_start(now or datetime.now(UTC)), retention_months)
+    pattern = re.compile(rf"{re.escape(table)}_y(\d{{4}})m(\d{{2}})")
+    dropped = []
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"partitions:{table}"})
+        for name in sorted(_child_partitions(conn, table)):
+            match = pattern.fullmatch(name)
+            if match is None or datetime(int(match[1]), int(match[2]), 1, tzinfo=UTC) >= cutoff:
+                continue
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+    if dropped:
+        logger.info("Dropped expired partitions: %s", ", ".join(dropped))
+    return dropped
+
+
+def maintain_partitions(months_ahead: int = DEFAULT_MONTHS_AHEAD, retention_months: int = PARTITION_RETENTION_MONTHS) -> None:
+    """Create upcoming partitions and drop expired ones for every partitioned table."""
+    for table in PARTITIONED_TABLES:
+        ensure_monthly_partitions(table, months_ahead)
+        drop_expired_partitions(table, retention_months)
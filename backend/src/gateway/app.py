@@ -1,7 +1,11 @@
+import asyncio
+import contextlib
 import logging
+import sys
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+import httpx
 from fastapi import FastAPI
 
 from src.config.app_config import get_app_config
@@ -29,6 +33,25 @@ configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Outbound HTTP from the gateway (currently the LangGraph health probe)
+HTTP_CLIENT_TIMEOUT = 5.0  # seconds
+HTTP_CLIENT_MAX_KEEPALIVE = 20
+
+# How often the gateway creates upcoming monthly partitions and drops expired ones
+PARTITION_MAINTENANCE_INTERVAL = 24 * 60 * 60  # seconds
+
+
+async def _maintain_partitions() -> None:
+    """Maintain the partitions of time-partitioned tables, once a day."""
+    from src.db.partitions import maintain_partitions
+
+    while True:
+        try:
+            await asyncio.to_thread(maintain_partitions)
+        except Exception as e:
+            logger.error(f"Failed to maintain table partitions: {e}", exc_info=True)
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
@@ -55,6 +78,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         except Exception as e:
             logger.error(f"Failed to apply database migrations: {e}", exc_info=True)
             sys.exit(1)
+        partition_task = asyncio.create_task(_maintain_partitions())
+    else:
+        partition_task = None
 
     # Log tracing status
     try:
@@ -68,6 +94,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception:
         logger.debug("Could not load tracing config")
 
+    # One pooled client for outbound HTTP, so probes reuse connections
+    # instead of opening a new one per call
+    app.state.http = httpx.AsyncClient(
+        timeout=HTTP_CLIENT_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=HTTP_CLIENT_MAX_KEEPALIVE),
+    )
+
     # NOTE: MCP tools initialization is NOT done here because:
     # 1. Gateway doesn't use MCP tools - they are used by Agents in the LangGraph Server
     # 2. Gateway and LangGraph Server are separate processes with independent caches
@@ -75,6 +108,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     yield
     logger.info("Shutting down API Gateway")
+    await app.state.http.aclose()
+    if partition_task is not None:
+        partition_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await partition_task
 
 
 def create_app() -> FastAPI:
@@ -219,16 +257,19 @@ This gateway provides custom endpoints for models, MCP configuration, skills, an
 
     async def _check_langgraph_health() -> str:
         """Check if the LangGraph server is reachable."""
-        import httpx
-
         url = get_gateway_config().langgraph_url
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            client = getattr(app.state, "http", None)
+            if client is None:
+                # The lifespan has not run (e.g. an app driven without startup)
+                async with httpx.AsyncClient(timeout=HTTP_CLIENT_TIMEOUT) as client:
+                    response = await client.get(f"{url}/ok")
+            else:
                 response = await client.get(f"{url}/ok")
-                if response.status_code == 200:
-                    return "healthy"
-                logger.warning("LangGraph health check returned status %s", response.status_code)
-                return f"unhealthy: status {response.status_code}"
+            if response.status_code == 200:
+                return "healthy"
+            logger.warning("LangGraph health check returned status %s", response.status_code)
+            return f"unhealthy: status {response.status_code}"
         except Exception as e:
             logger.error("LangGraph health check failed: %s", e)
             return f"unhealthy: {e}"
@@ -246,15 +287,19 @@ This gateway provides custom endpoints for models, MCP configuration, skills, an
         from src.db.engine import check_db_connection, is_db_enabled
         from src.queue.redis_connection import check_redis_health, is_redis_available
 
-        checks: dict[str, str] = {"gateway": "healthy"}
-
+        # Run the probes concurrently so the response takes as long as the
+        # slowest one rather than their sum; the sync ones go to threads.
+        probes = {}
         if is_db_enabled():
-            checks["database"] = check_db_connection()
-
+            probes["database"] = asyncio.to_thread(check_db_connection)
         if is_redis_available():
-            checks["redis"] = check_redis_health()
+            probes["redis"] = asyncio.to_thread(check_redis_health)
+        probes["langgraph"] = _check_langgraph_health()
+        results = await asyncio.gather(*probes.values(), return_exceptions=True)
 
-        checks["langgraph"] = await _check_langgraph_health()
+        checks: dict[str, str] = {"gateway": "healthy"}
+        for name, result in zip(probes, results):
+            checks[name] = f"unhealthy: {result}" if isinstance(result, BaseException) else result
 
         all_healthy = all(v == "healthy" for v in checks.values())
         status = "healthy" if all_healthy else "degraded"
@@ -19,6 +19,11 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 15
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 ALGORITHM = "HS256"
 
+# (secret file, secret) once the file fallback has been read or created, so
+# token checks on every request do not touch the disk. Keyed by the path so
+# pointing _SECRET_FILE elsewhere (as tests do) reads the new file.
+_file_secret: tuple[Path, str] | None = None
+
 
 def _get_secret_key() -> str:
     """Get or create the JWT secret key.
@@ -28,7 +33,10 @@ def _get_secret_key() -> str:
 
     When REQUIRE_ENV_SECRETS is set (production mode), the JWT_SECRET_KEY
     environment variable is required and file-based fallback is disabled.
+
+    The file is read once per process; replacing it takes effect on restart.
     """
+    global _file_secret
     env_secret = os.environ.get("JWT_SECRET_KEY")
     if env_secret:
         return env_secret
@@ -36,18 +44,23 @@ def _get_secret_key() -> str:
     if os.environ.get("REQUIRE_ENV_SECRETS"):
         raise RuntimeError("JWT_SECRET_KEY environment variable is required when REQUIRE_ENV_SECRETS is set. Set JWT_SECRET_KEY in your environment or .env file for production deployments.")
 
+    cached = _file_secret
+    if cached is not None and cached[0] == _SECRET_FILE:
+        return cached[1]
+
     _STORE_DIR.mkdir(parents=True, exist_ok=True)
     if _SECRET_FILE.exists():
-        return _SECRET_FILE.read_text(encoding="utf-8").strip()
-
-    secret = secrets.token_urlsafe(64)
-    tmp_path = _SECRET_FILE.with_suffix(".tmp")
-    tmp_path.write_text(secret, encoding="utf-8")
-    os.replace(tmp_path, _SECRET_FILE)
-    try:
-        os.chmod(_SECRET_FILE, 0o600)
-    except OSError:
-        pass
+        secret = _SECRET_FILE.read_text(encoding="utf-8").strip()
+    else:
+        secret = secrets.token_urlsafe(64)
+        tmp_path = _SECRET_FILE.with_suffix(".tmp")
+        tmp_path.write_text(secret, encoding="utf-8")
+        os.replace(tmp_path, _SECRET_FILE)
+        try:
+            os.chmod(_SECRET_FILE, 0o600)
+        except OSError:
+            pass
+    _file_secret = (_SECRET_FILE, secret)
     return secret
 
 
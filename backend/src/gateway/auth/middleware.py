@@ -10,7 +10,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from src.gateway.auth.jwt import decode_token
-from src.gateway.auth.user_store import get_user_by_id
+from src.gateway.auth.user_store import cache_user, get_cached_user, get_user_by_id
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +18,25 @@ _bearer_scheme = HTTPBearer(auto_error=True)
 _bearer_scheme_optional = HTTPBearer(auto_error=False)
 
 
+def _load_user(user_id: str) -> dict[str, Any] | None:
+    """Return the public profile of ``user_id``, from the cache when fresh."""
+    user = get_cached_user(user_id)
+    if user is not None:
+        return user
+
+    record = get_user_by_id(user_id)
+    if not record:
+        return None
+    user = {
+        "id": record["id"],
+        "email": record["email"],
+        "display_name": record.get("display_name"),
+        "created_at": record["created_at"],
+    }
+    cache_user(user)
+    return user
+
+
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(_bearer_scheme)],
 ) -> dict[str, Any]:
@@ -56,7 +75,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = get_user_by_id(user_id)
+    user = _load_user(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,12 +83,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return {
-        "id": user["id"],
-        "email": user["email"],
-        "display_name": user.get("display_name"),
-        "created_at": user["created_at"],
-    }
+    return user
 
 
 async def get_optional_user(
@@ -95,13 +109,4 @@ async def get_optional_user(
     if not user_id:
         return None
 
-    user = get_user_by_id(user_id)
-    if not user:
-        return None
-
-    return {
-        "id": user["id"],
-        "email": user["email"],
-        "display_name": user.get("display_name"),
-        "created_at": user["created_at"],
-    }
+    return _load_user(user_id)
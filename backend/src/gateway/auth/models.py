@@ -2,8 +2,15 @@
 
 from __future__ import annotations
 
+import re
+
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
+# Compiled once; each search stops at the first match. Like str.isdigit and
+# str.isalpha these accept any Unicode digit or letter, not only ASCII.
+_DIGIT_RE = re.compile(r"\d")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
 
 class UserRegisterRequest(BaseModel):
     """Request body for user registration."""
@@ -15,11 +22,10 @@ class UserRegisterRequest(BaseModel):
     @field_validator("password")
     @classmethod
     def validate_password_strength(cls, v: str) -> str:
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters")
-        if not any(c.isdigit() for c in v):
+        # Length is already enforced by the Field constraints, which run first
+        if _DIGIT_RE.search(v) is None:
             raise ValueError("Password must contain at least one digit")
-        if not any(c.isalpha() for c in v):
+        if _LETTER_RE.search(v) is None:
             raise ValueError("Password must contain at least one letter")
         return v
 
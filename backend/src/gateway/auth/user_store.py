@@ -9,6 +9,7 @@ from __future__ import annotations
 import json
 import os
 import threading
+import time
 import uuid
 from datetime import UTC, datetime
 from pathlib import Path
@@ -236,3 +237,45 @@ def get_user_by_id(user_id: str) -> dict[str, Any] | None:
     if is_db_enabled():
         return _db_get_user_by_id(user_id)
     return _file_get_user_by_id(user_id)
+
+
+# ---------------------------------------------------------------------------
+# Profile cache for the auth dependencies
+# ---------------------------------------------------------------------------
+# Public profiles (no password_hash) of recently authenticated users, so
+# get_current_user does not hit the store on every request. Only users that
+# exist are cached; a changed profile must be dropped with invalidate_user.
+USER_CACHE_TTL = 60  # seconds
+USER_CACHE_SIZE = 10_000
+_user_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+_user_cache_lock = threading.Lock()
+
+
+def get_cached_user(user_id: str) -> dict[str, Any] | None:
+    """Return a copy of the cached profile for ``user_id``, or None if absent or stale."""
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= USER_CACHE_TTL:
+            del _user_cache[user_id]
+            return None
+        return dict(entry[1])
+
+
+def cache_user(user: dict[str, Any]) -> None:
+    """Cache a public user profile under its ``id``."""
+    with _user_cache_lock:
+        _user_cache.pop(user["id"], None)
+        if len(_user_cache) >= USER_CACHE_SIZE:
+            _user_cache.pop(next(iter(_user_cache)), None)
+        _user_cache[user["id"]] = (time.monotonic(), dict(user))
+
+
+def invalidate_user(user_id: str | None = None) -> None:
+    """Drop the cached profile for ``user_id``, or every profile when omitted."""
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(user_id, None)
@@ -308,6 +308,7 @@ async def upload_files(
     uploads_dir = get_uploads_dir(thread_id)
     paths = get_paths()
     uploaded_files = []
+    sandbox_files: list[tuple[str, bytes]] = []
 
     sandbox_provider = get_sandbox_provider()
     sandbox_id = sandbox_provider.acquire(thread_id)
@@ -324,7 +325,7 @@ async def upload_files(
 
             # For non-local sandboxes, also sync to virtual path for runtime visibility
             if sandbox_id != "local":
-                sandbox.update_file(virtual_path, content)
+                sandbox_files.append((virtual_path, content))
 
             file_info = {
                 "filename": safe_filename,
@@ -355,7 +356,7 @@ async def upload_files(
                     md_virtual_path = f"{VIRTUAL_PATH_PREFIX}/uploads/{md_path.name}"
 
                     if sandbox_id != "local":
-                        sandbox.update_file(md_virtual_path, md_path.read_bytes())
+                        sandbox_files.append((md_virtual_path, md_path.read_bytes()))
 
                     file_info["markdown_file"] = md_path.name
                     file_info["markdown_path"] = md_relative_path
@@ -370,6 +371,14 @@ async def upload_files(
             logger.error(f"Failed to upload {safe_filename}: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to upload {safe_filename}: {str(e)}")
 
+    # Sync everything in one call so remote sandboxes can batch the uploads
+    if sandbox_files:
+        try:
+            sandbox.update_files(sandbox_files)
+        except Exception as e:
+            logger.error(f"Failed to sync uploads to sandbox {sandbox_id}: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to sync uploads to sandbox: {str(e)}")
+
     return UploadResponse(
         success=True,
         files=uploaded_files,
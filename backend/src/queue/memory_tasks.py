@@ -1,19 +1,21 @@
 """Redis-backed memory update tasks for distributed processing.
 
 This module defines RQ job functions that run in background worker processes.
-Messages must be pre-serialized to JSON-safe dicts before enqueuing.
+Messages must be pre-serialized to a JSON array (or JSON-safe dicts) before enqueuing.
 """
 
 import logging
 from typing import Any
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 
 def process_memory_update(
     user_id: str,
     thread_id: str,
-    messages_json: list[dict[str, Any]],
+    messages_json: bytes | list[dict[str, Any]],
 ) -> bool:
     """RQ job function: process a single memory update.
 
@@ -23,7 +25,8 @@ def process_memory_update(
     Args:
         user_id: The user whose memory to update.
         thread_id: The conversation thread ID.
-        messages_json: Serialized message list (dicts, not LangChain objects).
+        messages_json: Serialized message list, either the JSON array bytes
+            produced by the queue or a list of dicts (not LangChain objects).
 
     Returns:
         True if update succeeded.
@@ -32,9 +35,11 @@ def process_memory_update(
 
     logger.info(f"Processing memory update for user {user_id}, thread {thread_id}")
 
+    messages = orjson.loads(messages_json) if isinstance(messages_json, bytes | str) else messages_json
+
     updater = MemoryUpdater()
     success = updater.update_memory(
-        messages=messages_json,
+        messages=messages,
         thread_id=thread_id,
         user_id=user_id,
     )
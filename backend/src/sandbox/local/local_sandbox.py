@@ -5,7 +5,7 @@ import subprocess
 from pathlib import Path
 
 from src.sandbox.local.list_dir import list_dir
-from src.sandbox.sandbox import Sandbox
+from src.sandbox.sandbox import READ_FILE_MAX_BYTES, Sandbox, decode_window
 
 # Module-level cache for detected shell executable (avoids filesystem checks per call).
 _cached_shell: str | None = None
@@ -202,6 +202,16 @@ class LocalSandbox(Sandbox):
         with open(resolved_path) as f:
             return f.read()
 
+    def read_file_window(self, path: str, offset: int = 0, max_bytes: int = READ_FILE_MAX_BYTES) -> tuple[str, bool, int]:
+        resolved_path = self._resolve_path(path)
+        with open(resolved_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(offset)
+            data = f.read(max_bytes)
+        truncated = offset + len(data) < size
+        text, consumed = decode_window(data, final=not truncated)
+        return text, truncated, offset + consumed
+
     def write_file(self, path: str, content: str, append: bool = False) -> None:
         resolved_path = self._resolve_path(path)
         dir_path = os.path.dirname(resolved_path)
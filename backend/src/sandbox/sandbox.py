@@ -1,5 +1,31 @@
+import codecs
 from abc import ABC, abstractmethod
 
+# Default size of one read_file_window page
+READ_FILE_MAX_BYTES = 1 << 20
+
+
+def decode_window(data: bytes, final: bool) -> tuple[str, int]:
+    """Decode a window of UTF-8 bytes read from the middle of a file.
+
+    Unless ``final`` is set, a multi-byte character cut off at the end of the
+    window is left undecoded, so the next window starts on its first byte.
+
+    Args:
+        data: The bytes of the window.
+        final: Whether the window reaches the end of the file.
+
+    Returns:
+        The decoded text and the number of bytes it consumed.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    text = decoder.decode(data, final=final)
+    pending = len(decoder.getstate()[0])
+    if pending == len(data):
+        # Window too small to hold a whole character; consume it anyway
+        return decoder.decode(b"", final=True), len(data)
+    return text, len(data) - pending
+
 
 class Sandbox(ABC):
     """Abstract base class for sandbox environments"""
@@ -37,6 +63,28 @@ class Sandbox(ABC):
         """
         pass
 
+    def read_file_window(self, path: str, offset: int = 0, max_bytes: int = READ_FILE_MAX_BYTES) -> tuple[str, bool, int]:
+        """Read at most ``max_bytes`` of a file, starting at byte ``offset``.
+
+        Lets callers page through large files without holding all of them in
+        memory. The default reads the whole file and slices it; sandboxes
+        that can seek should override this.
+
+        Args:
+            path: The absolute path of the file to read.
+            offset: Byte offset to start reading at.
+            max_bytes: Maximum number of bytes to read.
+
+        Returns:
+            The text read, whether the file continues past it, and the
+            offset to pass to read the next window.
+        """
+        data = self.read_file(path).encode("utf-8")
+        window = data[offset : offset + max_bytes]
+        truncated = offset + len(window) < len(data)
+        text, consumed = decode_window(window, final=not truncated)
+        return text, truncated, offset + consumed
+
     @abstractmethod
     def list_dir(self, path: str, max_depth=2) -> list[str]:
         """List the contents of a directory.
@@ -70,3 +118,15 @@ class Sandbox(ABC):
             content: The binary content to write to the file.
         """
         pass
+
+    def update_files(self, files: list[tuple[str, bytes]]) -> None:
+        """Update several files with binary content.
+
+        Sandboxes backed by a remote API can override this to send all files
+        in a single request. The default writes them one by one.
+
+        Args:
+            files: ``(path, content)`` pairs, where each path is absolute.
+        """
+        for path, content in files:
+            self.update_file(path, content)
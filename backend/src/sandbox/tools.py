@@ -371,28 +371,38 @@ def read_file_tool(
     path: str,
     start_line: int | None = None,
     end_line: int | None = None,
+    offset: int | None = None,
 ) -> str:
     """Read the contents of a text file. Use this to examine source code, configuration files, logs, or any text-based file.
 
+    Large files are returned one page at a time; the end of a page says which offset to pass to read the next one.
+
     Examples:
         read_file(description="Read config", path="/mnt/user-data/uploads/config.yaml")
         read_file(description="Read function definition", path="/mnt/user-data/workspace/app.py", start_line=50, end_line=75)
+        read_file(description="Continue reading log", path="/mnt/user-data/uploads/app.log", offset=1048576)
 
     Args:
         description: Explain why you are reading this file in short words. ALWAYS PROVIDE THIS PARAMETER FIRST.
         path: The **absolute** path to the file to read.
         start_line: Optional starting line number (1-indexed, inclusive). Use with end_line to read a specific range.
         end_line: Optional ending line number (1-indexed, inclusive). Use with start_line to read a specific range.
+        offset: Optional byte offset to start reading at, as given at the end of the previous page. Ignored when start_line and end_line are given.
     """
     try:
         with sandbox_context(runtime) as (sandbox, thread_data):
             if thread_data:
                 path = replace_virtual_path(path, thread_data)
-            content = sandbox.read_file(path)
+            if start_line is not None and end_line is not None:
+                content = sandbox.read_file(path)
+                if not content:
+                    return "(empty)"
+                return "\n".join(content.splitlines()[start_line - 1 : end_line])
+            content, truncated, next_offset = sandbox.read_file_window(path, offset or 0)
             if not content:
                 return "(empty)"
-            if start_line is not None and end_line is not None:
-                content = "\n".join(content.splitlines()[start_line - 1 : end_line])
+            if truncated:
+                content += f"\n\n[Truncated at byte {next_offset}. Call read_file with offset={next_offset} to read the next page, or use start_line/end_line.]"
             return content
     except SandboxError as e:
         return f"Error: {e}"
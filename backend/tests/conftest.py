@@ -70,6 +70,21 @@ def jwt_secret(tmp_store_dir: Path) -> str:
     os.environ.pop("JWT_SECRET_KEY", None)
 
 
+@pytest.fixture()
+def tmp_memory_dir(tmp_path: Path) -> Generator[Path, None, None]:
+    """Store file-based memory under a temporary directory.
+
+    Points DEER_FLOW_HOME at ``tmp_path`` and resets the resolved-path and
+    created-directory caches so saves never touch the real .think-tank.
+    """
+    with (
+        patch.dict(os.environ, {"DEER_FLOW_HOME": str(tmp_path)}),
+        patch("src.agents.memory.updater._memory_file_path_cache", {}),
+        patch("src.agents.memory.updater._ensured_dirs", set()),
+    ):
+        yield tmp_path / "memory"
+
+
 @pytest.fixture()
 def sample_user_data() -> dict[str, str]:
     """Provide sample user registration data."""
@@ -9,6 +9,15 @@ from fastapi import HTTPException
 
 from src.gateway.auth.middleware import get_current_user, get_optional_user
 from src.gateway.auth.ownership import verify_thread_ownership
+from src.gateway.auth.user_store import invalidate_user
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Reset the cached user profiles between tests."""
+    invalidate_user()
+    yield
+    invalidate_user()
 
 
 def _make_credentials(token: str = "valid-token"):
@@ -141,6 +150,95 @@ class TestGetOptionalUser:
         assert result is None
 
 
+# ---------------------------------------------------------------------------
+# user profile cache
+# ---------------------------------------------------------------------------
+class TestUserCache:
+    """Tests for the profile cache shared by the auth dependencies."""
+
+    _USER = {
+        "id": "user-1",
+        "email": "test@example.com",
+        "display_name": "Test",
+        "created_at": "2025-01-01T00:00:00Z",
+        "password_hash": "hash",
+    }
+
+    @pytest.mark.asyncio
+    @patch("src.gateway.auth.middleware.get_user_by_id")
+    @patch("src.gateway.auth.middleware.decode_token")
+    async def test_store_is_read_once(self, mock_decode, mock_get_user) -> None:
+        mock_decode.return_value = {"type": "access", "sub": "user-1"}
+        mock_get_user.return_value = self._USER
+
+        first = await get_current_user(_make_credentials())
+        second = await get_optional_user(_make_credentials())
+
+        assert first == second
+        assert "password_hash" not in first
+        mock_get_user.assert_called_once_with("user-1")
+
+    @pytest.mark.asyncio
+    @patch("src.gateway.auth.middleware.get_user_by_id")
+    @patch("src.gateway.auth.middleware.decode_token")
+    async def test_callers_get_independent_copies(self, mock_decode, mock_get_user) -> None:
+        mock_decode.return_value = {"type": "access", "sub": "user-1"}
+        mock_get_user.return_value = self._USER
+
+        (await get_current_user(_make_credentials()))["email"] = "changed@example.com"
+
+        assert (await get_current_user(_make_credentials()))["email"] == "test@example.com"
+
+    @pytest.mark.asyncio
+    @patch("src.gateway.auth.middleware.get_user_by_id")
+    @patch("src.gateway.auth.middleware.decode_token")
+    async def test_invalidate_user_forces_reload(self, mock_decode, mock_get_user) -> None:
+        mock_decode.return_value = {"type": "access", "sub": "user-1"}
+        mock_get_user.return_value = self._USER
+        await get_current_user(_make_credentials())
+
+        invalidate_user("user-1")
+        mock_get_user.return_value = {**self._USER, "display_name": "Renamed"}
+
+        assert (await get_current_user(_make_credentials()))["display_name"] == "Renamed"
+        assert mock_get_user.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("src.gateway.auth.middleware.get_user_by_id")
+    @patch("src.gateway.auth.middleware.decode_token")
+    async def test_entries_expire(self, mock_decode, mock_get_user) -> None:
+        mock_decode.return_value = {"type": "access", "sub": "user-1"}
+        mock_get_user.return_value = self._USER
+
+        with patch("src.gateway.auth.user_store.USER_CACHE_TTL", 0):
+            await get_current_user(_make_credentials())
+            await get_current_user(_make_credentials())
+
+        assert mock_get_user.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("src.gateway.auth.middleware.get_user_by_id")
+    @patch("src.gateway.auth.middleware.decode_token")
+    async def test_missing_user_is_not_cached(self, mock_decode, mock_get_user) -> None:
+        mock_decode.return_value = {"type": "access", "sub": "user-1"}
+        mock_get_user.return_value = None
+        assert await get_optional_user(_make_credentials()) is None
+
+        mock_get_user.return_value = self._USER
+
+        assert (await get_optional_user(_make_credentials()))["id"] == "user-1"
+
+    def test_cache_is_bounded(self) -> None:
+        from src.gateway.auth import user_store
+
+        with patch.object(user_store, "USER_CACHE_SIZE", 2):
+            for index in range(3):
+                user_store.cache_user({"id": f"user-{index}"})
+
+            assert user_store.get_cached_user("user-0") is None
+            assert user_store.get_cached_user("user-2") == {"id": "user-2"}
+
+
 # ---------------------------------------------------------------------------
 # verify_thread_ownership
 # ---------------------------------------------------------------------------
@@ -45,6 +45,18 @@ class TestUserRegisterRequest:
         req = UserRegisterRequest(email="user@example.com", password="Abcdefg1")
         assert req.password == "Abcdefg1"
 
+    def test_password_error_names_missing_class(self):
+        """The validation error says which character class is missing."""
+        with pytest.raises(ValidationError, match="at least one digit"):
+            UserRegisterRequest(email="user@example.com", password="NoDigitsHere")
+        with pytest.raises(ValidationError, match="at least one letter"):
+            UserRegisterRequest(email="user@example.com", password="1234_5678")
+
+    def test_password_accepts_non_ascii_letters(self):
+        """Letters outside ASCII count as letters."""
+        req = UserRegisterRequest(email="user@example.com", password="пароль123")
+        assert req.password == "пароль123"
+
     def test_display_name_optional(self):
         """Display name is optional and defaults to None."""
         req = UserRegisterRequest(email="user@example.com", password="SecurePass1")
@@ -0,0 +1,73 @@
+"""Tests for the background batch writer."""
+
+from __future__ import annotations
+
+import threading
+
+from src.db.batch_writer import BatchWriter
+
+
+class _ListWriter(BatchWriter[int]):
+    def __init__(self, **kwargs):
+        super().__init__("test-writer", **kwargs)
+        self.batches: list[list[int]] = []
+        self.written = threading.Event()
+
+    def write_batch(self, batch: list[int]) -> None:
+        self.batches.append(batch)
+        self.written.set()
+
+
+def test_flush_writes_pending_items_in_order() -> None:
+    writer = _ListWriter(max_batch=100, flush_interval=60)
+    for i in range(3):
+        writer.submit(i)
+
+    writer.flush()
+
+    assert writer.batches == [[0, 1, 2]]
+    assert writer.pending_count == 0
+
+
+def test_full_batch_wakes_worker() -> None:
+    writer = _ListWriter(max_batch=2, flush_interval=60)
+    writer.submit(1)
+    writer.submit(2)
+
+    assert writer.written.wait(timeout=5)
+    assert writer.batches[0] == [1, 2]
+
+
+def test_item_after_idle_is_written_within_interval() -> None:
+    writer = _ListWriter(max_batch=256, flush_interval=0.1)
+    writer.submit(1)
+    assert writer.written.wait(timeout=5)
+    writer.written.clear()
+
+    writer.submit(2)
+
+    assert writer.written.wait(timeout=1)
+    assert writer.batches[-1] == [2]
+
+
+def test_oldest_items_dropped_beyond_max_pending() -> None:
+    writer = _ListWriter(max_batch=100, flush_interval=60, max_pending=2)
+    for i in range(3):
+        writer.submit(i)
+
+    writer.flush()
+
+    assert writer.batches == [[1, 2]]
+
+
+def test_failed_batch_is_dropped() -> None:
+    class _FailingWriter(BatchWriter[int]):
+        def write_batch(self, batch: list[int]) -> None:
+            raise RuntimeError("db down")
+
+    writer = _FailingWriter("failing-writer", max_batch=100, flush_interval=60)
+    writer.submit(1)
+
+    writer.flush()
+
+    assert writer.pending_count == 0
@@ -0,0 +1,371 @@
+"""Tests for DaytonaSandbox: Daytona SDK wrapper."""
+
+from collections import deque
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from daytona import FileUpload
+
+from src.community.daytona_sandbox.daytona_sandbox import DaytonaSandbox
+from src.community.daytona_sandbox.daytona_sandbox_provider import DaytonaSandboxProvider
+
+
+def _make_sandbox(fs=None) -> DaytonaSandbox:
+    return DaytonaSandbox(id="dt-1", daytona_sandbox=SimpleNamespace(fs=fs or MagicMock(), process=MagicMock()))
+
+
+class TestUpdateFiles:
+    def test_uploads_all_files_in_one_request(self):
+        sandbox = _make_sandbox()
+
+        sandbox.update_files([("/mnt/a.txt", b"a"), ("/mnt/b.txt", b"b")])
+
+        fs = sandbox.daytona_sandbox.fs
+        fs.upload_files.assert_called_once_with([FileUpload(source=b"a", destination="/mnt/a.txt"), FileUpload(source=b"b", destination="/mnt/b.txt")])
+        fs.upload_file.assert_not_called()
+
+    def test_empty_batch_is_a_no_op(self):
+        sandbox = _make_sandbox()
+
+        sandbox.update_files([])
+
+        sandbox.daytona_sandbox.fs.upload_files.assert_not_called()
+
+    def test_falls_back_to_per_file_uploads(self):
+        fs = MagicMock(spec=["upload_file"])
+        sandbox = _make_sandbox(fs)
+
+        sandbox.update_files([("/mnt/a.txt", b"a"), ("/mnt/b.txt", b"b")])
+
+        assert [c.args for c in fs.upload_file.call_args_list] == [(b"a", "/mnt/a.txt"), (b"b", "/mnt/b.txt")]
+
+    def test_bulk_upload_error_is_raised(self):
+        sandbox = _make_sandbox()
+        sandbox.daytona_sandbox.fs.upload_files.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            sandbox.update_files([("/mnt/a.txt", b"a")])
+
+
+class TestUploadDedup:
+    def test_identical_update_is_skipped(self):
+        sandbox = _make_sandbox()
+
+        sandbox.update_file("/mnt/common.sh", b"echo hi")
+        sandbox.update_file("/mnt/common.sh", b"echo hi")
+
+        sandbox.daytona_sandbox.fs.upload_file.assert_called_once_with(b"echo hi", "/mnt/common.sh")
+
+    def test_changed_content_is_uploaded(self):
+        sandbox = _make_sandbox()
+
+        sandbox.update_file("/mnt/common.sh", b"echo hi")
+        sandbox.write_file("/mnt/common.sh", "echo bye")
+
+        assert sandbox.daytona_sandbox.fs.upload_file.call_count == 2
+
+    def test_command_invalidates_upload_hashes(self):
+        sandbox = _make_sandbox()
+        sandbox.daytona_sandbox.process.exec.return_value = SimpleNamespace(result="", exit_code=0)
+
+        sandbox.update_file("/mnt/common.sh", b"echo hi")
+        sandbox.execute_command("rm /mnt/common.sh")
+        sandbox.update_file("/mnt/common.sh", b"echo hi")
+
+        assert sandbox.daytona_sandbox.fs.upload_file.call_count == 2
+
+    def test_failed_upload_is_retried(self):
+        sandbox = _make_sandbox()
+        sandbox.daytona_sandbox.fs.upload_file.side_effect = [RuntimeError("boom"), None]
+
+        with pytest.raises(RuntimeError):
+            sandbox.update_file("/mnt/a.txt", b"a")
+        sandbox.update_file("/mnt/a.txt", b"a")
+
+        assert sandbox.daytona_sandbox.fs.upload_file.call_count == 2
+
+    def test_bulk_upload_skips_unchanged_files(self):
+        sandbox = _make_sandbox()
+        sandbox.update_files([("/mnt/a.txt", b"a"), ("/mnt/b.txt", b"b")])
+
+        sandbox.update_files([("/mnt/a.txt", b"a"), ("/mnt/b.txt", b"b2")])
+        sandbox.update_files([("/mnt/a.txt", b"a"), ("/mnt/b.txt", b"b2")])
+
+        calls = sandbox.daytona_sandbox.fs.upload_files.call_args_list
+        assert len(calls) == 2
+        assert calls[1].args[0] == [FileUpload(source=b"b2", destination="/mnt/b.txt")]
+
+
+class TestListDirCache:
+    def _sandbox_with_listing(self, *listings: list[str]) -> DaytonaSandbox:
+        sandbox = _make_sandbox()
+        sandbox.daytona_sandbox.fs.list_files.side_effect = [[SimpleNamespace(path=p) for p in paths] for paths in listings]
+        return sandbox
+
+    def test_repeated_listing_is_served_from_cache(self):
+        sandbox = self._sandbox_with_listing(["/mnt/a.txt"])
+
+        first = sandbox.list_dir("/mnt")
+        first.append("mutated")
+
+        assert sandbox.list_dir("/mnt") == ["/mnt", "/mnt/a.txt"]
+        assert sandbox.daytona_sandbox.fs.list_files.call_count == 1
+
+    def test_depth_is_part_of_the_key(self):
+        sandbox = self._sandbox_with_listing([], ["/mnt/a"])
+
+        sandbox.list_dir("/mnt", max_depth=1)
+
+        assert sandbox.list_dir("/mnt", max_depth=2) == ["/mnt", "/mnt/a"]
+        assert sandbox.daytona_sandbox.fs.list_files.call_args.kwargs == {"depth": 2}
+
+    def test_write_invalidates_listing(self):
+        sandbox = self._sandbox_with_listing([], ["/mnt/new.txt"])
+
+        sandbox.list_dir("/mnt")
+        sandbox.write_file("/mnt/new.txt", "x")
+
+        assert sandbox.list_dir("/mnt") == ["/mnt", "/mnt/new.txt"]
+
+    def test_command_invalidates_listing(self):
+        sandbox = self._sandbox_with_listing(["/mnt/a.txt"], [])
+        sandbox.daytona_sandbox.process.exec.return_value = SimpleNamespace(result="", exit_code=0)
+
+        sandbox.list_dir("/mnt")
+        sandbox.execute_command("rm /mnt/a.txt")
+
+        assert sandbox.list_dir("/mnt") == ["/mnt"]
+
+    def test_listing_expires(self, monkeypatch):
+        import src.community.daytona_sandbox.daytona_sandbox as mod
+
+        sandbox = self._sandbox_with_listing([], ["/mnt/b"])
+        now = [1000.0]
+        monkeypatch.setattr(mod.time, "monotonic", lambda: now[0])
+
+        sandbox.list_dir("/mnt")
+        now[0] += mod.LIST_DIR_CACHE_TTL
+
+        assert sandbox.list_dir("/mnt") == ["/mnt", "/mnt/b"]
+
+    def test_failed_listing_is_not_cached(self):
+        sandbox = _make_sandbox()
+        sandbox.daytona_sandbox.fs.list_files.side_effect = [RuntimeError("down"), []]
+
+        assert sandbox.list_dir("/mnt") == []
+        assert sandbox.list_dir("/mnt") == ["/mnt"]
+
+    def test_listing_is_capped(self):
+        import src.community.daytona_sandbox.daytona_sandbox as mod
+
+        sandbox = self._sandbox_with_listing([f"/mnt/{i}" for i in range(mod.LIST_DIR_MAX_ENTRIES + 10)])
+
+        assert len(sandbox.list_dir("/mnt")) == mod.LIST_DIR_MAX_ENTRIES
+
+    def test_falls_back_to_find_on_older_sdks(self):
+        fs = MagicMock()
+        fs.list_files.side_effect = TypeError("unexpected keyword argument 'depth'")
+        sandbox = _make_sandbox(fs)
+        sandbox.daytona_sandbox.process.exec.return_value = SimpleNamespace(result="/mnt\n/mnt/a.txt\n", exit_code=0)
+
+        assert sandbox.list_dir("/mnt") == ["/mnt", "/mnt/a.txt"]
+        assert "find /mnt -maxdepth 2" in sandbox.daytona_sandbox.process.exec.call_args.args[0]
+
+
+class TestAppend:
+    @staticmethod
+    def _local_sandbox() -> DaytonaSandbox:
+        """A sandbox whose exec and uploads run against the local filesystem."""
+        import subprocess
+        from pathlib import Path
+
+        def run(command, timeout=None):
+            proc = subprocess.run(["sh", "-c", command], capture_output=True, text=True, timeout=timeout)
+            return SimpleNamespace(result=proc.stdout + proc.stderr, exit_code=proc.returncode)
+
+        fs = MagicMock()
+        fs.upload_file.side_effect = lambda content, path: Path(path).write_bytes(content)
+        sandbox = _make_sandbox(fs)
+        sandbox.daytona_sandbox.process.exec.side_effect = run
+        return sandbox
+
+    def test_append_runs_in_sandbox_without_download(self, tmp_path):
+        sandbox = self._local_sandbox()
+        target = tmp_path / "logs dir" / "out's.txt"
+
+        sandbox.write_file(str(target), "first\n", append=True)
+        sandbox.write_file(str(target), "héllo $HOME `x`\n", append=True)
+
+        assert target.read_text(encoding="utf-8") == "first\nhéllo $HOME `x`\n"
+        sandbox.daytona_sandbox.fs.download_file.assert_not_called()
+        assert sandbox.daytona_sandbox.process.exec.call_count == 2
+
+    def test_large_append_is_staged_and_cleaned_up(self, tmp_path):
+        import src.community.daytona_sandbox.daytona_sandbox as mod
+
+        sandbox = self._local_sandbox()
+        target = tmp_path / "big.txt"
+        target.write_text("head\n")
+        payload = "x" * (mod.APPEND_INLINE_LIMIT + 1)
+
+        sandbox.write_file(str(target), payload, append=True)
+
+        assert target.read_text() == "head\n" + payload
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["big.txt"]
+
+    def test_append_failure_raises(self):
+        sandbox = _make_sandbox()
+        sandbox.daytona_sandbox.process.exec.return_value = SimpleNamespace(result="Permission denied", exit_code=1)
+
+        with pytest.raises(RuntimeError, match="Permission denied"):
+            sandbox.write_file("/etc/x", "data", append=True)
+
+    def test_append_forgets_upload_hash(self):
+        sandbox = _make_sandbox()
+        sandbox.daytona_sandbox.process.exec.return_value = SimpleNamespace(result="", exit_code=0)
+
+        sandbox.update_file("/mnt/a.txt", b"a")
+        sandbox.write_file("/mnt/a.txt", "b", append=True)
+        sandbox.update_file("/mnt/a.txt", b"a")
+
+        assert sandbox.daytona_sandbox.fs.upload_file.call_count == 2
+
+
+class TestReadFileWindow:
+    def test_pages_through_file_without_download(self, tmp_path):
+        sandbox = TestAppend._local_sandbox()
+        target = tmp_path / "data's.txt"
+        target.write_text("aé" * 10, encoding="utf-8")
+
+        pages = []
+        offset, truncated = 0, True
+        while truncated:
+            text, truncated, offset = sandbox.read_file_window(str(target), offset, max_bytes=4)
+            pages.append(text)
+
+        assert "".join(pages) == "aé" * 10
+        assert all(page for page in pages)
+        assert offset == target.stat().st_size
+        sandbox.daytona_sandbox.fs.download_file.assert_not_called()
+
+    def test_missing_file_returns_error(self, tmp_path):
+        sandbox = TestAppend._local_sandbox()
+
+        text, truncated, offset = sandbox.read_file_window(str(tmp_path / "missing.txt"), 7)
+
+        assert text.startswith("Error:")
+        assert (truncated, offset) == (False, 7)
+
+
+def _make_provider(**config) -> DaytonaSandboxProvider:
+    """Create a provider with a mocked Daytona client and no background threads."""
+    config = {"image": "python:3.12-slim", "language": "python", "auto_stop_interval": 15, "idle_timeout": 600, "environment": {}, **config}
+    client = MagicMock()
+    client.create.side_effect = lambda params, timeout=None: SimpleNamespace(id=f"dt-{client.create.call_count}", fs=MagicMock(), process=MagicMock(), set_labels=MagicMock())
+    with (
+        patch.object(DaytonaSandboxProvider, "_load_config", return_value=config),
+        patch.object(DaytonaSandboxProvider, "_create_client", return_value=client),
+        patch.object(DaytonaSandboxProvider, "_register_signal_handlers"),
+        patch.object(DaytonaSandboxProvider, "_start_idle_checker"),
+        patch.object(DaytonaSandboxProvider, "_start_warm_pool_filler"),
+        patch("src.community.daytona_sandbox.daytona_sandbox_provider.atexit.register"),
+    ):
+        return DaytonaSandboxProvider()
+
+
+class TestIdleCleanup:
+    def test_releases_only_expired_sandboxes(self):
+        provider = _make_provider()
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1000.0):
+            old_id = provider.acquire("thread-old")
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1300.0):
+            new_id = provider.acquire("thread-new")
+
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1700.0):
+            wait = provider._cleanup_idle(600)
+
+        assert provider.get(old_id) is None
+        assert provider.get(new_id) is not None
+        assert wait == 200.0
+
+    def test_recent_activity_rearms_deadline(self):
+        provider = _make_provider()
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1000.0):
+            sandbox_id = provider.acquire("thread-1")
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1500.0):
+            provider.get(sandbox_id)
+
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1650.0):
+            wait = provider._cleanup_idle(600)
+
+        assert sandbox_id in provider._sandboxes
+        assert provider._expiry_heap == [(2100.0, sandbox_id)]
+        assert wait == 450.0
+
+    def test_released_sandbox_entries_are_dropped(self):
+        provider = _make_provider()
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1000.0):
+            sandbox_id = provider.acquire()
+        provider.release(sandbox_id)
+
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=2000.0):
+            wait = provider._cleanup_idle(600)
+
+        assert provider._expiry_heap == []
+        assert wait == 600
+        provider._daytona.delete.assert_called_once()
+
+
+class TestWarmPool:
+    def test_fill_creates_up_to_target_size(self):
+        provider = _make_provider(warm_pool_size=2)
+
+        provider._fill_warm_pool()
+        provider._fill_warm_pool()
+
+        assert len(provider._warm_pool) == 2
+        assert provider._daytona.create.call_count == 2
+        assert provider._daytona.create.call_args.args[0].labels is None
+
+    def test_acquire_takes_warm_sandbox_and_labels_it(self):
+        provider = _make_provider(warm_pool_size=1)
+        provider._fill_warm_pool()
+
+        sandbox_id = provider.acquire("thread-1", user_id="user-1")
+
+        assert sandbox_id == "dt-1"
+        assert provider._daytona.create.call_count == 1
+        provider.get(sandbox_id).daytona_sandbox.set_labels.assert_called_once_with({"thread_id": "thread-1"})
+        assert provider.acquire("thread-1") == sandbox_id
+        assert provider._user_sandboxes == {"user-1": {sandbox_id}}
+        assert provider._warm_pool_wakeup.is_set()
+
+    def test_acquire_creates_when_pool_is_empty(self):
+        provider = _make_provider(warm_pool_size=1)
+
+        sandbox_id = provider.acquire("thread-1")
+
+        assert provider._daytona.create.call_args.args[0].labels == {"thread_id": "thread-1"}
+        assert provider.get(sandbox_id) is not None
+
+    def test_stale_warm_sandboxes_are_replaced(self):
+        provider = _make_provider(warm_pool_size=1, auto_stop_interval=15)
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1000.0):
+            provider._fill_warm_pool()
+
+        with patch("src.community.daytona_sandbox.daytona_sandbox_provider.time.time", return_value=1000.0 + 15 * 60):
+            sandbox_id = provider.acquire("thread-1")
+
+        assert sandbox_id == "dt-2"
+        provider._daytona.delete.assert_called_once()
+        assert provider._daytona.delete.call_args.args[0].id == "dt-1"
+
+    def test_shutdown_deletes_pooled_sandboxes(self):
+        provider = _make_provider(warm_pool_size=2)
+        provider._fill_warm_pool()
+
+        provider.shutdown()
+
+        assert provider._warm_pool == deque()
+        assert provider._daytona.delete.call_count == 2
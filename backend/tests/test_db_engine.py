@@ -0,0 +1,101 @@
+"""Tests for database URL and engine configuration."""
+
+from unittest.mock import patch
+
+import pytest
+
+import src.db.engine as engine_module
+
+
+@pytest.mark.parametrize("driver_scheme", ["postgresql+psycopg://", "postgresql://"])
+class TestSyncDatabaseUrl:
+    """Tests for get_sync_database_url driver selection."""
+
+    def test_async_url_uses_sync_driver(self, monkeypatch, driver_scheme):
+        monkeypatch.setenv("DATABASE_URL", "postgresql+asyncpg://u:p@db:5432/app")
+        with patch.object(engine_module, "_SYNC_SCHEME", driver_scheme):
+            assert engine_module.get_sync_database_url() == f"{driver_scheme}u:p@db:5432/app"
+
+    def test_driverless_url_uses_sync_driver(self, monkeypatch, driver_scheme):
+        monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@db:5432/app")
+        with patch.object(engine_module, "_SYNC_SCHEME", driver_scheme):
+            assert engine_module.get_sync_database_url() == f"{driver_scheme}u:p@db:5432/app"
+
+    def test_explicit_sync_driver_is_kept(self, monkeypatch, driver_scheme):
+        monkeypatch.setenv("DATABASE_URL", "postgresql+psycopg2://u:p@db:5432/app")
+        with patch.object(engine_module, "_SYNC_SCHEME", driver_scheme):
+            assert engine_module.get_sync_database_url() == "postgresql+psycopg2://u:p@db:5432/app"
+
+
+class TestSyncDriverSelection:
+    """Tests for choosing the synchronous driver scheme."""
+
+    @pytest.mark.parametrize("installed", [True, False])
+    def test_env_pins_driver(self, monkeypatch, installed):
+        monkeypatch.setenv("DB_SYNC_DRIVER", "psycopg2")
+        with patch("importlib.util.find_spec", return_value=object() if installed else None):
+            assert engine_module._sync_scheme() == "postgresql+psycopg2://"
+
+    def test_defaults_to_psycopg_when_installed(self, monkeypatch):
+        monkeypatch.delenv("DB_SYNC_DRIVER", raising=False)
+        with patch("importlib.util.find_spec", return_value=object()):
+            assert engine_module._sync_scheme() == "postgresql+psycopg://"
+
+    def test_defaults_to_psycopg2_without_psycopg(self, monkeypatch):
+        monkeypatch.delenv("DB_SYNC_DRIVER", raising=False)
+        with patch("importlib.util.find_spec", return_value=None):
+            assert engine_module._sync_scheme() == "postgresql://"
+
+    def test_unknown_driver_is_rejected(self, monkeypatch):
+        monkeypatch.setenv("DB_SYNC_DRIVER", "asyncpg")
+        with pytest.raises(ValueError, match="DB_SYNC_DRIVER"):
+            engine_module._sync_scheme()
+
+
+def test_unset_database_url(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    assert engine_module.get_sync_database_url() is None
+
+
+class TestReadonlyConnection:
+    """Tests for the autocommit read helper."""
+
+    def test_runs_statements_in_autocommit(self, db_enabled):
+        from sqlalchemy import text
+
+        with engine_module.get_db_readonly() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            assert conn.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
+
+    def test_health_check_reports_healthy(self, db_enabled):
+        assert engine_module.check_db_connection() == "healthy"
+
+
+class TestEngineOptions:
+    """Tests for the pool and connection options passed to create_engine."""
+
+    def _create(self, monkeypatch, url: str) -> dict:
+        monkeypatch.setenv("DATABASE_URL", url)
+        monkeypatch.setattr(engine_module, "_engine", None)
+        with patch.object(engine_module, "create_engine") as create:
+            engine_module.get_engine()
+        monkeypatch.setattr(engine_module, "_engine", None)
+        return create.call_args.kwargs
+
+    def test_postgres_engine_options(self, monkeypatch):
+        monkeypatch.setattr(engine_module, "DB_POOL_SIZE", 7)
+        monkeypatch.setattr(engine_module, "DB_MAX_OVERFLOW", 3)
+
+        kwargs = self._create(monkeypatch, "postgresql+asyncpg://u:p@db/app")
+
+        assert kwargs["pool_size"] == 7
+        assert kwargs["max_overflow"] == 3
+        assert kwargs["pool_recycle"] == engine_module.DB_POOL_RECYCLE
+        assert kwargs["pool_use_lifo"] is True
+        assert kwargs["connect_args"] == {"keepalives": 1, "keepalives_idle": 30}
+
+    def test_non_postgres_engine_gets_no_keepalives(self, monkeypatch):
+        kwargs = self._create(monkeypatch, "sqlite:///:memory:")
+
+        assert kwargs["connect_args"] == {}
@@ -0,0 +1,31 @@
+"""Tests for monthly partition maintenance helpers."""
+
+from datetime import UTC, datetime, timedelta, timezone
+
+from src.db.partitions import drop_expired_partitions, ensure_monthly_partitions, month_start, months_before, next_month, partition_name
+
+
+class TestMonthArithmetic:
+    def test_month_start_uses_utc(self):
+        local = datetime(2026, 3, 1, 0, 30, tzinfo=timezone(timedelta(hours=2)))
+
+        assert month_start(local) == datetime(2026, 2, 1, tzinfo=UTC)
+
+    def test_next_month_rolls_over_year(self):
+        assert next_month(datetime(2026, 11, 1, tzinfo=UTC)) == datetime(2026, 12, 1, tzinfo=UTC)
+        assert next_month(datetime(2026, 12, 1, tzinfo=UTC)) == datetime(2027, 1, 1, tzinfo=UTC)
+
+    def test_months_before_rolls_back_year(self):
+        assert months_before(datetime(2026, 2, 1, tzinfo=UTC), 3) == datetime(2025, 11, 1, tzinfo=UTC)
+        assert months_before(datetime(2026, 2, 1, tzinfo=UTC), 0) == datetime(2026, 2, 1, tzinfo=UTC)
+
+    def test_partition_name(self):
+        assert partition_name("usage_log", datetime(2026, 2, 1, tzinfo=UTC)) == "usage_log_y2026m02"
+
+
+def test_ensure_is_a_no_op_outside_postgres(db_enabled):
+    assert ensure_monthly_partitions("usage_log") == []
+
+
+def test_drop_expired_is_a_no_op_outside_postgres(db_enabled):
+    assert drop_expired_partitions("timeline_events", 1) == []
@@ -319,6 +319,48 @@ class TestDBMemoryStore:
         assert len(result["facts"]) == 2
         assert result["facts"][0]["id"] == "new-fact-1"
 
+    def test_cached_memory_rereads_after_check_window(self, db_enabled):
+        """Writes made by another process become visible once the cache-check window passes."""
+        from unittest.mock import patch
+
+        from src.agents.memory.updater import _save_memory, get_memory_data
+        from src.config.memory_config import MemoryConfig
+        from src.db.engine import get_db_session
+        from src.db.models import UserMemoryModel
+
+        _save_memory("db-ttl-user", _create_empty_memory())
+        assert get_memory_data("db-ttl-user")["facts"] == []
+
+        with get_db_session() as session:
+            record = session.get(UserMemoryModel, "db-ttl-user")
+            record.memory_json = {**record.memory_json, "facts": [{"id": "other-process"}]}
+
+        assert get_memory_data("db-ttl-user")["facts"] == []
+        with patch("src.agents.memory.updater.get_memory_config", return_value=MemoryConfig(cache_check_seconds=0)):
+            assert get_memory_data("db-ttl-user")["facts"] == [{"id": "other-process"}]
+
+    def test_failed_save_rolls_back_and_keeps_cache(self, db_enabled):
+        """A failing write returns False, leaves the cache alone, and does not poison the pool."""
+        from unittest.mock import patch
+
+        from sqlalchemy.exc import OperationalError
+
+        from src.agents.memory.updater import _save_memory, get_memory_data
+
+        mem1 = _create_empty_memory()
+        mem1["facts"] = [{"id": "kept-fact"}]
+        _save_memory("db-fail-user", mem1)
+
+        mem2 = _create_empty_memory()
+        mem2["facts"] = [{"id": "lost-fact"}]
+        with patch("sqlalchemy.orm.Session.execute", side_effect=OperationalError("upsert", {}, Exception("boom"))):
+            assert _save_memory("db-fail-user", mem2) is False
+
+        assert _memory_data["db-fail-user"]["facts"] == [{"id": "kept-fact"}]
+
+        _memory_data.clear()
+        assert get_memory_data("db-fail-user")["facts"] == [{"id": "kept-fact"}]
+
 
 class TestDBHealthCheck:
     """Tests for the health check endpoint with database."""
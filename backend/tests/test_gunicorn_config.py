@@ -2,8 +2,9 @@
 
 import importlib.util
 import os
+import sys
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 GUNICORN_CONF_PATH = Path(__file__).parent.parent / "gunicorn.conf.py"
 
@@ -66,3 +67,22 @@ class TestGunicornConfig:
         """preload_app should be True for copy-on-write benefits."""
         config = self._load_config()
         assert config.preload_app is True
+
+    def test_on_starting_preloads_orm_without_connecting(self):
+        """on_starting should import the ORM models and memory queue without creating an engine."""
+        import src.db.engine as db_engine
+
+        config = self._load_config()
+        with patch.object(db_engine, "create_engine") as mock_create_engine:
+            config.on_starting(MagicMock())
+
+        assert "src.db.models" in sys.modules
+        assert "src.agents.memory.queue" in sys.modules
+        mock_create_engine.assert_not_called()
+
+    def test_worker_exit_flushes_memory_queue(self):
+        """worker_exit should flush pending memory updates."""
+        config = self._load_config()
+        with patch("src.agents.memory.queue.flush_memory_queue") as mock_flush:
+            config.worker_exit(MagicMock(), MagicMock())
+        mock_flush.assert_called_once()
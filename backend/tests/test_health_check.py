@@ -1,5 +1,7 @@
 """Tests for the health check endpoint."""
 
+import asyncio
+import threading
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -80,3 +82,78 @@ class TestHealthCheck:
             response = client.get("/health")
             body = response.json()
             assert body["status"] == "healthy"
+
+    def test_probes_run_concurrently(self, client):
+        """The sync probes run in threads while the LangGraph probe is awaited."""
+        langgraph_started = threading.Event()
+
+        def check_db_connection():
+            # Only returns once the LangGraph probe is in flight
+            return "healthy" if langgraph_started.wait(timeout=5) else "unhealthy: probes ran serially"
+
+        async def get(*args, **kwargs):
+            langgraph_started.set()
+            await asyncio.sleep(0)
+            response = AsyncMock()
+            response.status_code = 200
+            return response
+
+        with (
+            patch("src.db.engine.is_db_enabled", return_value=True),
+            patch("src.db.engine.check_db_connection", side_effect=check_db_connection),
+            patch("httpx.AsyncClient.get", side_effect=get),
+        ):
+            body = client.get("/health").json()
+
+        assert body["checks"]["database"] == "healthy"
+        assert body["status"] == "healthy"
+
+    def test_failing_probe_reports_unhealthy(self, client):
+        """A probe that raises is reported instead of failing the endpoint."""
+        with (
+            patch("src.db.engine.is_db_enabled", return_value=True),
+            patch("src.db.engine.check_db_connection", side_effect=RuntimeError("boom")),
+            patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get,
+        ):
+            mock_get.return_value.status_code = 200
+            response = client.get("/health")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["checks"]["database"] == "unhealthy: boom"
+        assert body["status"] == "degraded"
+
+
+class TestSharedHttpClient:
+    """Tests for the pooled HTTP client created by the lifespan."""
+
+    def test_probe_uses_app_client(self, client):
+        """The LangGraph probe goes through app.state.http when it is set."""
+        shared = AsyncMock()
+        shared.get.return_value.status_code = 200
+        client.app.state.http = shared
+
+        with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
+            body = client.get("/health").json()
+
+        assert body["checks"]["langgraph"] == "healthy"
+        shared.get.assert_awaited_once()
+        mock_get.assert_not_called()
+
+    def test_lifespan_opens_and_closes_client(self):
+        """The lifespan creates the client on startup and closes it on shutdown."""
+        import httpx
+
+        from src.gateway.app import create_app, lifespan
+
+        app = create_app()
+
+        async def run() -> httpx.AsyncClient:
+            with patch("src.gateway.app.get_app_config"), patch("src.db.engine.is_db_enabled", return_value=False):
+                async with lifespan(app):
+                    http = app.state.http
+                    assert isinstance(http, httpx.AsyncClient)
+                    assert not http.is_closed
+            return http
+
+        assert asyncio.run(run()).is_closed
@@ -8,6 +8,7 @@ external services (Redis, Docker) to be running.
 import threading
 from unittest.mock import MagicMock, patch
 
+import orjson
 import pytest
 
 
@@ -51,8 +52,9 @@ class TestRedisQueueCycle:
         ]
         serialized = RedisMemoryUpdateQueue._serialize_messages(messages)
 
-        # Verify serialized form is JSON-safe dicts
-        for msg in serialized:
+        # Verify serialized form is a JSON array of message dicts
+        assert isinstance(serialized, bytes)
+        for msg in orjson.loads(serialized):
             assert isinstance(msg, dict)
             assert "type" in msg
             assert "content" in msg
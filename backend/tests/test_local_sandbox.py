@@ -125,6 +125,16 @@ class TestFileOperations:
         with pytest.raises(FileNotFoundError):
             sandbox.read_file(str(tmp_path / "missing.txt"))
 
+    def test_read_file_window_pages(self, tmp_path: Path) -> None:
+        f = tmp_path / "test.txt"
+        f.write_text("héllo wörld", encoding="utf-8")
+        sandbox = LocalSandbox(id="local")
+
+        first, truncated, offset = sandbox.read_file_window(str(f), max_bytes=2)
+        assert (first, truncated, offset) == ("h", True, 1)
+        rest, truncated, offset = sandbox.read_file_window(str(f), offset, max_bytes=100)
+        assert (first + rest, truncated, offset) == ("héllo wörld", False, f.stat().st_size)
+
     def test_write_file_creates(self, tmp_path: Path) -> None:
         target = tmp_path / "output.txt"
         sandbox = LocalSandbox(id="local")
@@ -1,11 +1,16 @@
 """Tests for per-user memory isolation."""
 
 import json
+import sys
+from unittest.mock import patch
+
+import pytest
 
 from src.agents.memory.updater import (
     DEFAULT_USER_ID,
     _create_empty_memory,
     _get_memory_file_path,
+    _memory_cache_check_ts,
     _memory_data,
     _memory_file_mtime,
     get_memory_data,
@@ -44,6 +49,7 @@ class TestMemoryDataIsolation:
         """Clear the module-level caches before each test."""
         _memory_data.clear()
         _memory_file_mtime.clear()
+        _memory_cache_check_ts.clear()
 
     def test_empty_memory_structure(self):
         """Empty memory has the expected structure."""
@@ -93,3 +99,119 @@ class TestMemoryDataIsolation:
         reloaded = reload_memory_data(unique_user)
         assert len(reloaded["facts"]) == 1
         assert reloaded["facts"][0]["id"] == "disk-fact"
+
+    def test_save_and_load_round_trip_preserves_unicode(self, tmp_memory_dir):
+        """Saved memory is written as UTF-8 JSON and reads back unchanged."""
+        import uuid
+
+        from src.agents.memory.updater import _load_memory_from_file, _save_memory_to_file
+
+        unique_user = f"roundtrip-user-{uuid.uuid4().hex[:8]}"
+        memory = _create_empty_memory()
+        memory["facts"].append({"id": "fact-1", "content": "Prefers café names in 日本語", "confidence": 0.9})
+
+        assert _save_memory_to_file(unique_user, memory) is True
+
+        raw = _get_memory_file_path(unique_user).read_text(encoding="utf-8")
+        assert "café" in raw
+        assert _load_memory_from_file(unique_user)["facts"] == memory["facts"]
+
+    def test_cached_memory_skips_stat_within_check_window(self):
+        """Reads inside the cache-check window do not stat the memory file."""
+        import uuid
+        from pathlib import Path
+
+        unique_user = f"ttl-user-{uuid.uuid4().hex[:8]}"
+        first = get_memory_data(unique_user)
+
+        with patch.object(Path, "stat", side_effect=AssertionError("stat() should not be called")):
+            assert get_memory_data(unique_user) is first
+
+    def test_cached_memory_rechecked_after_window(self, tmp_memory_dir):
+        """With a zero check window, external file changes are picked up on the next read."""
+        import uuid
+
+        from src.config.memory_config import MemoryConfig
+
+        unique_user = f"ttl-zero-user-{uuid.uuid4().hex[:8]}"
+        with patch("src.agents.memory.updater.get_memory_config", return_value=MemoryConfig(cache_check_seconds=0)):
+            assert get_memory_data(unique_user)["facts"] == []
+
+            file_path = _get_memory_file_path(unique_user)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            custom_memory = _create_empty_memory()
+            custom_memory["facts"].append({"id": "external-fact"})
+            file_path.write_text(json.dumps(custom_memory), encoding="utf-8")
+
+            assert get_memory_data(unique_user)["facts"][0]["id"] == "external-fact"
+
+    @pytest.mark.skipif(sys.platform == "darwin", reason="macOS uses F_FULLFSYNC instead of os.fsync")
+    def test_save_syncs_file_and_directory(self, tmp_memory_dir):
+        """Saving fsyncs the temp file before the rename and the directory after it."""
+        import os
+        import uuid
+
+        from src.agents.memory.updater import _save_memory_to_file
+
+        unique_user = f"fsync-user-{uuid.uuid4().hex[:8]}"
+        with patch("src.agents.memory.updater.os.fsync", wraps=os.fsync) as fsync:
+            assert _save_memory_to_file(unique_user, _create_empty_memory()) is True
+
+        assert fsync.call_count == 2
+        assert not _get_memory_file_path(unique_user).with_suffix(".tmp").exists()
+
+    def test_save_writes_in_place_on_atomic_storage(self, tmp_memory_dir):
+        """With storage_is_atomic the target file is written directly, without a temp file."""
+        import uuid
+
+        from src.agents.memory.updater import _save_memory_to_file
+        from src.config.memory_config import MemoryConfig
+
+        unique_user = f"atomic-user-{uuid.uuid4().hex[:8]}"
+        with (
+            patch("src.agents.memory.updater.get_memory_config", return_value=MemoryConfig(storage_is_atomic=True)),
+            patch("pathlib.Path.replace", side_effect=AssertionError("replace() should not be called")),
+        ):
+            assert _save_memory_to_file(unique_user, _create_empty_memory()) is True
+
+        assert json.loads(_get_memory_file_path(unique_user).read_text(encoding="utf-8"))["version"] == "1.0"
+
+    def test_cache_evicts_least_recently_used_user(self):
+        """The per-user cache is bounded and evicts the least recently used user."""
+        from src.config.memory_config import MemoryConfig
+
+        with patch("src.agents.memory.updater.get_memory_config", return_value=MemoryConfig(cache_max_users=2)):
+            get_memory_data("lru-user-a")
+            get_memory_data("lru-user-b")
+            get_memory_data("lru-user-a")
+            get_memory_data("lru-user-c")
+
+        assert list(_memory_data) == ["lru-user-a", "lru-user-c"]
+        assert "lru-user-b" not in _memory_cache_check_ts
+        assert "lru-user-b" not in _memory_file_mtime
+
+    def test_memory_dir_created_once_and_recreated_after_removal(self, tmp_memory_dir):
+        """Saves mkdir the memory directory once, and recreate it if it disappears."""
+        import shutil
+        from pathlib import Path
+
+        from src.agents.memory.updater import _save_memory_to_file
+
+        user_id = "mkdir-user"
+        with patch.object(Path, "mkdir", autospec=True, side_effect=Path.mkdir) as mkdir:
+            assert _save_memory_to_file(user_id, _create_empty_memory()) is True
+            assert _save_memory_to_file(user_id, _create_empty_memory()) is True
+        assert mkdir.call_count == 1
+
+        shutil.rmtree(tmp_memory_dir)
+        assert _save_memory_to_file(user_id, _create_empty_memory()) is True
+        assert (tmp_memory_dir / f"{user_id}.json").is_file()
+
+    def test_corrupt_memory_file_loads_as_empty(self, tmp_memory_dir):
+        """An unparseable memory file falls back to empty memory."""
+        from src.agents.memory.updater import _load_memory_from_file
+
+        tmp_memory_dir.mkdir()
+        (tmp_memory_dir / "corrupt-user.json").write_bytes(b"{not json")
+
+        assert _load_memory_from_file("corrupt-user")["facts"] == []
@@ -0,0 +1,191 @@
+"""Tests for the in-process memory update queue."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agents.memory.queue import ConversationContext, MemoryUpdateQueue
+
+
+@pytest.fixture
+def queue():
+    """Create an in-process queue and make sure no timer outlives the test."""
+    q = MemoryUpdateQueue()
+    yield q
+    q.clear()
+
+
+class TestConversationContext:
+    """Tests for the queued context record."""
+
+    def test_uses_slots(self):
+        context = ConversationContext(user_id="user-1", thread_id="thread-1")
+        assert not hasattr(context, "__dict__")
+        assert context.timestamp is None
+
+
+class TestMemoryUpdateQueueDedup:
+    """Tests for (user_id, thread_id) de-duplication."""
+
+    def test_same_thread_replaces_pending_context(self, queue):
+        queue.add("thread-1", ["v1"], user_id="user-1")
+        queue.add("thread-1", ["v2"], user_id="user-1")
+
+        assert queue.pending_count == 1
+
+    def test_distinct_keys_are_kept(self, queue):
+        queue.add("thread-1", [], user_id="user-1")
+        queue.add("thread-2", [], user_id="user-1")
+        queue.add("thread-1", [], user_id="user-2")
+
+        assert queue.pending_count == 3
+
+    def test_flush_processes_latest_context_in_order(self, queue):
+        queue.add("thread-1", ["old"], user_id="user-1")
+        queue.add("thread-2", ["other"], user_id="user-1")
+        queue.add("thread-1", ["new"], user_id="user-1")
+
+        mock_updater = MagicMock()
+        mock_updater.update_memory.return_value = True
+        with (
+            patch("src.agents.memory.updater.MemoryUpdater", return_value=mock_updater),
+        ):
+            queue.flush()
+
+        calls = [(c.kwargs["thread_id"], c.kwargs["messages"]) for c in mock_updater.update_memory.call_args_list]
+        assert calls == [("thread-2", ["other"]), ("thread-1", ["new"])]
+        assert queue.pending_count == 0
+
+
+class TestMemoryUpdateQueueConfig:
+    """Tests for reading the memory config on each call."""
+
+    def test_disabled_config_skips_enqueue(self, queue):
+        with patch("src.agents.memory.queue.get_memory_config", return_value=MagicMock(enabled=False)):
+            queue.add("thread-1", [], user_id="user-1")
+
+        assert queue.pending_count == 0
+        assert queue._worker is None
+
+    def test_config_change_after_construction_applies(self, queue):
+        """A queue built before the config is (re)loaded still sees the new values."""
+        with patch("src.agents.memory.queue.get_memory_config", return_value=MagicMock(enabled=False)):
+            queue.add("thread-1", [], user_id="user-1")
+        assert queue.pending_count == 0
+
+        with patch("src.agents.memory.queue.get_memory_config", return_value=MagicMock(enabled=True, debounce_seconds=30)):
+            queue.add("thread-1", [], user_id="user-1")
+        assert queue.pending_count == 1
+
+
+class TestMemoryUpdateQueueDebounce:
+    """Tests for the deadline-based debounce worker."""
+
+    def test_burst_of_adds_processes_once_with_single_worker(self, queue):
+        config = MagicMock(enabled=True, debounce_seconds=0.05, max_concurrent_updates=4)
+        mock_updater = MagicMock()
+        mock_updater.update_memory.return_value = True
+
+        with (
+            patch("src.agents.memory.queue.get_memory_config", return_value=config),
+            patch("src.agents.memory.updater.MemoryUpdater", return_value=mock_updater),
+        ):
+            queue.add("thread-1", [], user_id="user-1")
+            worker = queue._worker
+            queue.add("thread-2", [], user_id="user-1")
+            queue.add("thread-1", [], user_id="user-1")
+
+            assert queue._worker is worker
+            worker.join(timeout=2)
+
+        assert not worker.is_alive()
+        assert mock_updater.update_memory.call_count == 2
+        assert queue.pending_count == 0
+
+    def test_clear_cancels_pending_deadline(self, queue):
+        config = MagicMock(enabled=True, debounce_seconds=0.05, max_concurrent_updates=4)
+        mock_updater = MagicMock()
+
+        with (
+            patch("src.agents.memory.queue.get_memory_config", return_value=config),
+            patch("src.agents.memory.updater.MemoryUpdater", return_value=mock_updater),
+        ):
+            queue.add("thread-1", [], user_id="user-1")
+            worker = queue._worker
+            queue.clear()
+            worker.join(timeout=2)
+
+        assert not worker.is_alive()
+        mock_updater.update_memory.assert_not_called()
+
+
+class TestMemoryUpdateQueueConcurrency:
+    """Tests for per-user parallel processing."""
+
+    def test_users_processed_in_parallel_threads_in_order(self, queue):
+        seen: list[tuple[str, str, str]] = []
+
+        def fake_update(messages, thread_id, user_id):
+            seen.append((user_id, thread_id, threading.current_thread().name))
+            return True
+
+        mock_updater = MagicMock()
+        mock_updater.update_memory.side_effect = fake_update
+
+        queue.add("thread-1", [], user_id="user-1")
+        queue.add("thread-2", [], user_id="user-1")
+        queue.add("thread-3", [], user_id="user-2")
+
+        with patch("src.agents.memory.updater.MemoryUpdater", return_value=mock_updater):
+            queue.flush()
+
+        assert len(seen) == 3
+        user1 = [entry for entry in seen if entry[0] == "user-1"]
+        assert [thread_id for _, thread_id, _ in user1] == ["thread-1", "thread-2"]
+        # Both of one user's updates run on the same worker thread
+        assert user1[0][2] == user1[1][2]
+        assert all(name.startswith("memory-update") for _, _, name in seen)
+
+    def test_failing_update_does_not_stop_other_users(self, queue):
+        def fake_update(messages, thread_id, user_id):
+            if user_id == "user-1":
+                raise RuntimeError("boom")
+            return True
+
+        mock_updater = MagicMock()
+        mock_updater.update_memory.side_effect = fake_update
+
+        queue.add("thread-1", [], user_id="user-1")
+        queue.add("thread-2", [], user_id="user-2")
+
+        with patch("src.agents.memory.updater.MemoryUpdater", return_value=mock_updater):
+            queue.flush()
+
+        assert mock_updater.update_memory.call_count == 2
+        assert not queue.is_processing
+
+    def test_updater_is_reused_across_flushes(self, queue):
+        mock_updater = MagicMock()
+        mock_updater.update_memory.return_value = True
+
+        with patch("src.agents.memory.updater.MemoryUpdater", return_value=mock_updater) as mock_cls:
+            queue.add("thread-1", [], user_id="user-1")
+            queue.flush()
+            queue.add("thread-2", [], user_id="user-1")
+            queue.flush()
+
+        mock_cls.assert_called_once()
+        assert mock_updater.update_memory.call_count == 2
+
+
+class TestMemoryUpdaterConfig:
+    """Tests for the updater reading the memory config on each call."""
+
+    def test_config_change_reaches_existing_updater(self):
+        from src.agents.memory.updater import MemoryUpdater
+
+        with patch("src.agents.memory.updater.get_memory_config", return_value=MagicMock(enabled=True)):
+            updater = MemoryUpdater()
+        with patch("src.agents.memory.updater.get_memory_config", return_value=MagicMock(enabled=False)):
+            assert updater.update_memory(["msg"]) is False
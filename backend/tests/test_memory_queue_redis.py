@@ -2,7 +2,9 @@
 
 from unittest.mock import MagicMock, patch
 
+import orjson
 import pytest
+from langchain_core.messages import AIMessage
 
 from src.agents.memory.queue import (
     MemoryUpdateQueue,
@@ -56,27 +58,27 @@ class TestGetMemoryQueueFallback:
 class TestRedisMemoryUpdateQueueSerialize:
     """Tests for message serialization."""
 
-    def test_serialize_plain_dicts(self):
-        """Plain dicts should pass through unchanged."""
-        messages = [{"type": "human", "content": "hello"}]
-        result = RedisMemoryUpdateQueue._serialize_messages(messages)
-        assert result == [{"type": "human", "content": "hello"}]
+    def test_serialize_returns_json_bytes(self):
+        """The payload should be a single JSON array encoded as bytes."""
+        result = RedisMemoryUpdateQueue._serialize_messages([{"type": "human", "content": "hello"}])
+        assert isinstance(result, bytes)
+        assert orjson.loads(result) == [{"type": "human", "content": "hello"}]
 
-    def test_serialize_objects_with_model_dump(self):
-        """Objects with model_dump() should be serialized via that method."""
-        mock_msg = MagicMock()
-        mock_msg.model_dump.return_value = {"type": "ai", "content": "hi"}
-        # Ensure hasattr check for model_dump succeeds
-        mock_msg.__class__ = type("MockMessage", (), {"model_dump": lambda s: {"type": "ai", "content": "hi"}})
+    def test_serialize_empty_list(self):
+        """No messages should serialize to an empty JSON array."""
+        assert orjson.loads(RedisMemoryUpdateQueue._serialize_messages([])) == []
 
-        messages = [mock_msg]
-        result = RedisMemoryUpdateQueue._serialize_messages(messages)
-        assert result[0] == {"type": "ai", "content": "hi"}
+    def test_serialize_pydantic_messages(self):
+        """Pydantic messages should be dumped via model_dump_json()."""
+        messages = [AIMessage(content="hi")]
+        result = orjson.loads(RedisMemoryUpdateQueue._serialize_messages(messages))
+        assert result[0]["type"] == "ai"
+        assert result[0]["content"] == "hi"
 
     def test_serialize_fallback_for_unknown_types(self):
         """Unknown types should be serialized as {type, content} dicts."""
         messages = ["plain string message"]
-        result = RedisMemoryUpdateQueue._serialize_messages(messages)
+        result = orjson.loads(RedisMemoryUpdateQueue._serialize_messages(messages))
         assert result[0]["type"] == "str"
         assert result[0]["content"] == "plain string message"
 
@@ -86,7 +88,7 @@ class TestRedisMemoryUpdateQueueSerialize:
             {"type": "human", "content": "hello"},
             42,  # unexpected type
         ]
-        result = RedisMemoryUpdateQueue._serialize_messages(messages)
+        result = orjson.loads(RedisMemoryUpdateQueue._serialize_messages(messages))
         assert len(result) == 2
         assert result[0] == {"type": "human", "content": "hello"}
         assert result[1]["type"] == "int"
@@ -135,31 +137,67 @@ class TestRedisMemoryUpdateQueueAdd:
         assert call_args[0][1] == "src.queue.memory_tasks.process_memory_update"
 
     def test_add_cancels_existing_job_for_same_key(self):
-        """add() should cancel the previous pending job for the same (user_id, thread_id)."""
+        """add() should drop the previous pending job for the same (user_id, thread_id)."""
         queue, mock_rq = self._make_queue()
+        mock_rq.key = "rq:queue:memory_updates"
+        mock_rq.scheduled_job_registry.key = "rq:scheduled:memory_updates"
+        mock_pipe = queue._redis.pipeline.return_value
+        # job-1 is still in the scheduled registry
+        mock_pipe.execute.return_value = [1, 0]
 
         mock_job_1 = MagicMock()
         mock_job_1.id = "job-1"
-        mock_job_1.get_status.return_value = "scheduled"
 
         mock_job_2 = MagicMock()
         mock_job_2.id = "job-2"
         mock_rq.enqueue_in.side_effect = [mock_job_1, mock_job_2]
 
-        with (
-            patch("src.config.memory_config.get_memory_config") as mock_config,
-            patch("rq.job.Job.fetch", return_value=mock_job_1),
-        ):
-            mock_config.return_value.enabled = True
-            mock_config.return_value.debounce_seconds = 30
-
+        with patch("rq.job.Job.fetch") as mock_fetch:
             # First add
             queue.add("thread-1", [{"content": "v1"}], user_id="user-1")
+            mock_pipe.execute.assert_not_called()
             # Second add for same key should cancel first
             queue.add("thread-1", [{"content": "v2"}], user_id="user-1")
 
-        # The first job should have been cancelled
-        mock_job_1.cancel.assert_called_once()
+        # The first job is removed in a single pipeline, without fetching it
+        mock_fetch.assert_not_called()
+        mock_pipe.zrem.assert_called_once_with("rq:scheduled:memory_updates", "job-1")
+        mock_pipe.lrem.assert_called_once_with("rq:queue:memory_updates", 0, "job-1")
+        mock_pipe.execute.assert_called_once()
+        queue._redis.delete.assert_called_once_with("rq:job:job-1")
+        assert queue._pending_jobs[("user-1", "thread-1")] == "job-2"
+
+    def test_clear_cancels_all_jobs_in_one_pipeline(self):
+        """clear() should drop every tracked job with a single pipeline execute."""
+        queue, mock_rq = self._make_queue()
+        mock_pipe = queue._redis.pipeline.return_value
+        mock_pipe.execute.return_value = [1, 0, 0, 1]
+        queue._pending_jobs = {("user-1", "thread-1"): "job-1", ("user-1", "thread-2"): "job-2"}
+
+        queue.clear()
+
+        mock_pipe.execute.assert_called_once()
+        queue._redis.delete.assert_called_once_with("rq:job:job-1", "rq:job:job-2")
+        assert queue.pending_count == 0
+
+    def test_cancel_keeps_started_jobs(self):
+        """A job already taken by a worker must keep its hash."""
+        queue, _ = self._make_queue()
+        mock_pipe = queue._redis.pipeline.return_value
+        # job-1 is still queued; job-2 is in neither the registry nor the queue
+        mock_pipe.execute.return_value = [0, 1, 0, 0]
+
+        queue._cancel_jobs(["job-1", "job-2"])
+
+        queue._redis.delete.assert_called_once_with("rq:job:job-1")
+
+    def test_cancel_skips_delete_when_nothing_pending(self):
+        queue, _ = self._make_queue()
+        queue._redis.pipeline.return_value.execute.return_value = [0, 0]
+
+        queue._cancel_jobs(["job-1"])
+
+        queue._redis.delete.assert_not_called()
 
     def test_pending_count(self):
         """pending_count should track number of pending jobs."""
@@ -178,12 +216,73 @@ class TestRedisMemoryUpdateQueueAdd:
             queue.add("thread-2", [], user_id="user-1")
             assert queue.pending_count == 2
 
+    def test_pending_jobs_bounded_lru(self):
+        """The tracked job map should evict the least recently queued key."""
+        queue, mock_rq = self._make_queue()
+        queue.MAX_TRACKED_JOBS = 2
+        mock_rq.enqueue_in.side_effect = [MagicMock(id=f"job-{i}") for i in range(4)]
+
+        queue.add("thread-1", [], user_id="user-1")
+        queue.add("thread-2", [], user_id="user-1")
+        queue.add("thread-1", [], user_id="user-1")  # refreshes thread-1
+        queue.add("thread-3", [], user_id="user-1")  # evicts thread-2
+
+        assert list(queue._pending_jobs) == [("user-1", "thread-1"), ("user-1", "thread-3")]
+        assert queue.pending_count == 2
+
+    def test_flush_promotes_scheduled_jobs(self):
+        """flush() should move still-scheduled jobs to the ready queue and stop tracking them."""
+        from rq.job import JobStatus
+
+        queue, mock_rq = self._make_queue()
+        queue._pending_jobs[("user-1", "thread-1")] = "job-1"
+        queue._pending_jobs[("user-1", "thread-2")] = "job-2"
+        scheduled = MagicMock(id="job-1")
+        scheduled.get_status.return_value = JobStatus.SCHEDULED
+        finished = MagicMock(id="job-2")
+        finished.get_status.return_value = JobStatus.FINISHED
+        mock_pipe = queue._redis.pipeline.return_value.__enter__.return_value
+
+        with patch("rq.job.Job.fetch_many", return_value=[scheduled, finished]):
+            queue.flush()
+
+        mock_rq.enqueue_job.assert_called_once_with(scheduled, pipeline=mock_pipe)
+        mock_rq.scheduled_job_registry.remove.assert_called_once_with(scheduled, pipeline=mock_pipe)
+        mock_pipe.execute.assert_called_once()
+        assert queue.pending_count == 0
+
     def test_is_processing_always_false(self):
         """is_processing should be False (processing happens in workers)."""
         queue, _ = self._make_queue()
         assert queue.is_processing is False
 
 
+class TestFlushMemoryQueue:
+    """Tests for the shutdown flush helper."""
+
+    def test_no_queue_is_created(self):
+        """flush_memory_queue() should not instantiate a queue."""
+        from src.agents.memory import queue as queue_module
+
+        with patch("src.queue.redis_connection.is_redis_available") as mock_available:
+            queue_module.flush_memory_queue()
+
+        mock_available.assert_not_called()
+        assert queue_module._memory_queue is None
+
+    def test_flushes_existing_queue(self):
+        """flush_memory_queue() should flush the existing singleton."""
+        from src.agents.memory.queue import flush_memory_queue
+
+        with patch("src.queue.redis_connection.is_redis_available", return_value=False):
+            queue = get_memory_queue()
+
+        with patch.object(queue, "flush") as mock_flush:
+            flush_memory_queue()
+
+        mock_flush.assert_called_once()
+
+
 class TestMemoryTaskFunction:
     """Tests for the RQ job function."""
 
@@ -223,3 +322,19 @@ class TestMemoryTaskFunction:
             )
 
         assert result is False
+
+    def test_process_memory_update_decodes_json_payload(self):
+        """A JSON bytes payload from the queue should be decoded before updating."""
+        from src.queue.memory_tasks import process_memory_update
+
+        mock_updater = MagicMock()
+        mock_updater.update_memory.return_value = True
+
+        with patch("src.agents.memory.updater.MemoryUpdater", return_value=mock_updater):
+            process_memory_update(
+                user_id="user-1",
+                thread_id="thread-1",
+                messages_json=b'[{"type": "human", "content": "hello"}]',
+            )
+
+        assert mock_updater.update_memory.call_args.kwargs["messages"] == [{"type": "human", "content": "hello"}]
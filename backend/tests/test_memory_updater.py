@@ -0,0 +1,323 @@
+"""Tests for MemoryUpdater._apply_updates."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.agents.memory.updater import MemoryUpdater, _create_empty_memory
+from src.config.memory_config import MemoryConfig
+
+
+@pytest.fixture
+def updater():
+    """Create an updater with a small fact limit."""
+    with patch("src.agents.memory.updater.get_memory_config", return_value=MemoryConfig(max_facts=10, fact_confidence_threshold=0.5)):
+        yield MemoryUpdater()
+
+
+def _memory_with_facts(*confidences: float) -> dict:
+    memory = _create_empty_memory()
+    memory["facts"] = [{"id": f"fact_{i}", "content": f"fact {i}", "confidence": c} for i, c in enumerate(confidences)]
+    return memory
+
+
+class TestApplyUpdatesFacts:
+    """Tests for fact removal, addition and trimming."""
+
+    def test_trims_to_highest_confidence_facts(self, updater):
+        memory = _memory_with_facts(*[0.6] * 8, 0.9, 0.95)
+        update = {"newFacts": [{"content": "new high", "confidence": 0.99}, {"content": "new low", "confidence": 0.55}]}
+
+        result = updater._apply_updates(memory, update, thread_id="thread-1")
+
+        assert len(result["facts"]) == 10
+        assert [f["confidence"] for f in result["facts"][:3]] == [0.99, 0.95, 0.9]
+        assert all(f["content"] != "new low" for f in result["facts"])
+
+    def test_trim_keeps_original_order_for_ties(self, updater):
+        memory = _memory_with_facts(*[0.8] * 12)
+
+        result = updater._apply_updates(memory, {})
+
+        assert [f["id"] for f in result["facts"]] == [f"fact_{i}" for i in range(10)]
+
+    def test_removes_listed_facts(self, updater):
+        memory = _memory_with_facts(0.9, 0.8, 0.7)
+
+        result = updater._apply_updates(memory, {"factsToRemove": ["fact_1", "missing"]})
+
+        assert [f["id"] for f in result["facts"]] == ["fact_0", "fact_2"]
+
+    def test_low_confidence_new_facts_are_ignored(self, updater):
+        memory = _create_empty_memory()
+
+        result = updater._apply_updates(memory, {"newFacts": [{"content": "maybe", "confidence": 0.2}]})
+
+        assert result["facts"] == []
+
+    def test_remove_add_and_trim_in_one_update(self, updater):
+        memory = _memory_with_facts(*[0.6] * 10)
+        update = {
+            "factsToRemove": ["fact_0", "fact_1"],
+            "newFacts": [{"content": f"new {i}", "confidence": 0.9} for i in range(4)],
+        }
+
+        result = updater._apply_updates(memory, update, thread_id="thread-1")
+
+        ids = [f["id"] for f in result["facts"]]
+        assert len(ids) == 10
+        assert "fact_0" not in ids and "fact_1" not in ids
+        assert [f["content"] for f in result["facts"][:4]] == [f"new {i}" for i in range(4)]
+        assert all(f["source"] == "thread-1" for f in result["facts"][:4])
+
+    def test_missing_facts_key_is_created(self, updater):
+        memory = _create_empty_memory()
+        del memory["facts"]
+
+        result = updater._apply_updates(memory, {"newFacts": [{"content": "x", "confidence": 0.9}]})
+
+        assert [f["content"] for f in result["facts"]] == ["x"]
+
+    def test_does_not_mutate_current_memory(self, updater):
+        import copy
+
+        memory = _memory_with_facts(0.9, 0.8)
+        snapshot = copy.deepcopy(memory)
+        update = {
+            "user": {"topOfMind": {"shouldUpdate": True, "summary": "New focus"}},
+            "history": {"recentMonths": {"shouldUpdate": True, "summary": "Recent work"}},
+            "factsToRemove": ["fact_0"],
+            "newFacts": [{"content": "new", "confidence": 0.9}],
+        }
+
+        result = updater._apply_updates(memory, update)
+
+        assert memory == snapshot
+        assert result is not memory
+        assert result["user"]["topOfMind"]["summary"] == "New focus"
+        assert [f["id"] for f in result["facts"]][0] == "fact_1"
+
+    def test_upload_scrub_leaves_shared_sections_untouched(self, updater):
+        from src.agents.memory.updater import _strip_upload_mentions_from_memory
+
+        memory = _create_empty_memory()
+        memory["user"]["workContext"]["summary"] = "User uploaded a file yesterday. User likes Go."
+        snapshot = memory["user"]["workContext"]["summary"]
+
+        result = _strip_upload_mentions_from_memory(updater._apply_updates(memory, {}))
+
+        assert memory["user"]["workContext"]["summary"] == snapshot
+        assert result["user"]["workContext"]["summary"] == "User likes Go."
+
+
+class TestMemoryJsonForPrompt:
+    """Tests for the cached prompt serialization of memory."""
+
+    def setup_method(self):
+        from src.agents.memory.updater import _memory_json_cache
+
+        _memory_json_cache.clear()
+
+    def test_reuses_text_for_same_memory_dict(self):
+        from src.agents.memory.updater import _memory_json_for_prompt
+
+        memory = _create_empty_memory()
+        first = _memory_json_for_prompt("user-1", memory)
+
+        with patch("src.agents.memory.updater.orjson.dumps", side_effect=AssertionError("should reuse cached text")):
+            assert _memory_json_for_prompt("user-1", memory) is first
+
+    def test_new_memory_dict_is_reserialized(self):
+        import json
+
+        from src.agents.memory.updater import _memory_json_for_prompt
+
+        _memory_json_for_prompt("user-1", _create_empty_memory())
+        replacement = _memory_with_facts(0.9)
+
+        assert json.loads(_memory_json_for_prompt("user-1", replacement))["facts"][0]["id"] == "fact_0"
+
+    def test_file_save_primes_cache_with_saved_content(self, tmp_memory_dir):
+        import json
+
+        from src.agents.memory.updater import _memory_json_cache, _save_memory_to_file
+
+        user_id = "prompt-cache"
+        memory = _memory_with_facts(0.9)
+        _memory_json_cache[user_id] = (memory, "stale")
+
+        assert _save_memory_to_file(user_id, memory) is True
+
+        cached_memory, text = _memory_json_cache[user_id]
+        assert cached_memory is memory
+        assert json.loads(text)["lastUpdated"] == memory["lastUpdated"]
+
+
+class TestStripCodeFence:
+    """Tests for removing markdown fences from LLM responses."""
+
+    def test_plain_json_unchanged(self):
+        from src.agents.memory.updater import _strip_code_fence
+
+        assert _strip_code_fence('{"a": 1}') == '{"a": 1}'
+
+    def test_json_fence_removed(self):
+        from src.agents.memory.updater import _strip_code_fence
+
+        assert _strip_code_fence('```json\n{"a": 1}\n```') == '{"a": 1}'
+
+    def test_bare_fence_removed(self):
+        from src.agents.memory.updater import _strip_code_fence
+
+        assert _strip_code_fence('```\n{\n  "a": 1\n}\n```') == '{\n  "a": 1\n}'
+
+    def test_unterminated_fence_drops_opening_line(self):
+        from src.agents.memory.updater import _strip_code_fence
+
+        assert _strip_code_fence('```json\n{"a": 1}') == '{"a": 1}'
+
+
+class TestModelCache:
+    """Tests for reusing the memory model client."""
+
+    @pytest.fixture(autouse=True)
+    def app_config(self):
+        import src.agents.memory.updater as updater_module
+
+        config = object()
+        with (
+            patch.object(updater_module, "_chat_models", {}),
+            patch.object(updater_module, "_chat_models_config", None),
+            patch("src.agents.memory.updater.get_app_config", return_value=config) as mock_get,
+        ):
+            yield mock_get
+
+    def test_model_created_once_per_name(self):
+        with patch("src.agents.memory.updater.create_chat_model", side_effect=lambda **kw: object()) as mock_create:
+            first = MemoryUpdater(model_name="model-a")._get_model()
+            second = MemoryUpdater(model_name="model-a")._get_model()
+            other = MemoryUpdater(model_name="model-b")._get_model()
+
+        assert first is second
+        assert other is not first
+        assert mock_create.call_count == 2
+
+    def test_config_reload_drops_cached_models(self, app_config):
+        with patch("src.agents.memory.updater.create_chat_model", side_effect=lambda **kw: object()) as mock_create:
+            updater = MemoryUpdater(model_name="model-a")
+            first = updater._get_model()
+            app_config.return_value = object()
+            assert updater._get_model() is not first
+
+        assert mock_create.call_count == 2
+
+    def test_model_name_follows_memory_config(self):
+        with (
+            patch("src.agents.memory.updater.create_chat_model", side_effect=lambda **kw: kw["name"]),
+            patch("src.agents.memory.updater.get_memory_config", return_value=MemoryConfig(model_name="model-a")) as mock_config,
+        ):
+            updater = MemoryUpdater()
+            assert updater._get_model() == "model-a"
+            mock_config.return_value = MemoryConfig(model_name="model-b")
+            assert updater._get_model() == "model-b"
+
+
+class TestUpdateMetrics:
+    """Tests for recording memory update outcomes."""
+
+    def test_counter_children_resolved_once(self):
+        from unittest.mock import MagicMock
+
+        import src.agents.memory.updater as updater_module
+
+        counter = MagicMock()
+        with (
+            patch.object(updater_module, "_update_counters", None),
+            patch("src.gateway.metrics.memory_updates_total", counter),
+        ):
+            updater_module._record_update_result(True)
+            updater_module._record_update_result(False)
+            updater_module._record_update_result(True)
+
+        assert counter.labels.call_count == 2
+        counter.labels.assert_any_call(status="success")
+        counter.labels.assert_any_call(status="failure")
+        assert counter.labels.return_value.inc.call_count == 3
+
+    def test_failed_update_records_failure(self):
+        from unittest.mock import MagicMock
+
+        updater = MemoryUpdater()
+        model = MagicMock()
+        model.invoke.return_value = MagicMock(content="not json")
+
+        with (
+            patch("src.agents.memory.updater.get_memory_data", return_value=_create_empty_memory()),
+            patch.object(updater, "_get_model", return_value=model),
+            patch("src.agents.memory.updater._record_update_result") as record,
+        ):
+            assert updater.update_memory([MagicMock(type="human", content="hi")], user_id="metrics-user") is False
+
+        record.assert_called_once_with(False)
+
+
+class TestUpdateTimestamp:
+    """Tests for the single timestamp used per update."""
+
+    def test_update_uses_one_timestamp_throughout(self):
+        import json
+        from unittest.mock import MagicMock
+
+        updater = MemoryUpdater()
+        reply = {
+            "user": {"workContext": {"shouldUpdate": True, "summary": "Builds agents"}},
+            "newFacts": [{"content": "Uses Python", "confidence": 0.9}],
+        }
+        model = MagicMock()
+        model.invoke.return_value = MagicMock(content=json.dumps(reply))
+        saved = {}
+
+        def fake_save(user_id, memory, timestamp=None):
+            saved.update(memory=memory, timestamp=timestamp)
+            return True
+
+        with (
+            patch("src.agents.memory.updater.get_memory_data", return_value=_create_empty_memory()),
+            patch.object(updater, "_get_model", return_value=model),
+            patch("src.agents.memory.updater._save_memory", side_effect=fake_save),
+            patch("src.agents.memory.updater.get_memory_config", return_value=MemoryConfig(fact_confidence_threshold=0.5)),
+        ):
+            assert updater.update_memory([MagicMock(type="human", content="hi")], thread_id="t-1", user_id="ts-user") is True
+
+        memory = saved["memory"]
+        assert saved["timestamp"] is not None
+        assert memory["user"]["workContext"]["updatedAt"] == saved["timestamp"]
+        assert memory["facts"][0]["createdAt"] == saved["timestamp"]
+
+    def test_file_save_records_given_timestamp(self, tmp_memory_dir):
+        from src.agents.memory.updater import _load_memory_from_file, _save_memory_to_file
+
+        user_id = "ts-file"
+        assert _save_memory_to_file(user_id, _create_empty_memory(), timestamp="2026-01-02T03:04:05+00:00") is True
+
+        assert _load_memory_from_file(user_id)["lastUpdated"] == "2026-01-02T03:04:05+00:00"
+
+
+class TestFormatMemoryUpdatePrompt:
+    """Tests for the pre-split memory update prompt."""
+
+    def test_matches_str_format(self):
+        from src.agents.memory.prompt import MEMORY_UPDATE_PROMPT, format_memory_update_prompt
+
+        memory = '{\n  "facts": [{"id": "x"}]\n}'
+        conversation = "User: what is {placeholder}?"
+
+        assert format_memory_update_prompt(memory, conversation) == MEMORY_UPDATE_PROMPT.format(current_memory=memory, conversation=conversation)
+
+    def test_escaped_braces_are_unescaped(self):
+        from src.agents.memory.prompt import format_memory_update_prompt
+
+        prompt = format_memory_update_prompt("{}", "")
+
+        assert '"user": {' in prompt
+        assert "{{" not in prompt
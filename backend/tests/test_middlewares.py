@@ -23,8 +23,8 @@ from src.agents.middlewares.usage_tracking_middleware import (
     UsageTrackingMiddleware,
     add_subagent_usage,
     drain_subagent_usage,
+    _pending_lock_for,
     _pending_subagent_usage,
-    _pending_lock,
 )
 from src.agents.middlewares.view_image_middleware import ViewImageMiddleware
 
@@ -41,34 +41,30 @@ class TestUsageTrackingHelpers:
     """Tests for add_subagent_usage and drain_subagent_usage."""
 
     def setup_method(self) -> None:
-        with _pending_lock:
-            _pending_subagent_usage.clear()
+        _pending_subagent_usage.clear()
 
     def teardown_method(self) -> None:
-        with _pending_lock:
-            _pending_subagent_usage.clear()
+        _pending_subagent_usage.clear()
 
     def test_add_subagent_usage(self) -> None:
         add_subagent_usage("t1", {"input_tokens": 10, "output_tokens": 5})
-        with _pending_lock:
-            assert _pending_subagent_usage["t1"]["input_tokens"] == 10
-            assert _pending_subagent_usage["t1"]["output_tokens"] == 5
+        with _pending_lock_for("t1"):
+            assert _pending_subagent_usage["t1"] == [10, 5]
 
     def test_add_accumulates(self) -> None:
         add_subagent_usage("t1", {"input_tokens": 10, "output_tokens": 5})
         add_subagent_usage("t1", {"input_tokens": 20, "output_tokens": 15})
-        with _pending_lock:
-            assert _pending_subagent_usage["t1"]["input_tokens"] == 30
-            assert _pending_subagent_usage["t1"]["output_tokens"] == 20
+        with _pending_lock_for("t1"):
+            assert _pending_subagent_usage["t1"] == [30, 20]
 
     def test_add_none_usage_noop(self) -> None:
         add_subagent_usage("t1", None)
-        with _pending_lock:
+        with _pending_lock_for("t1"):
             assert "t1" not in _pending_subagent_usage
 
     def test_add_empty_thread_id_noop(self) -> None:
         add_subagent_usage("", {"input_tokens": 10, "output_tokens": 5})
-        with _pending_lock:
+        with _pending_lock_for(""):
             assert "" not in _pending_subagent_usage
 
     def test_drain_returns_and_removes(self) -> None:
@@ -83,17 +79,32 @@ class TestUsageTrackingHelpers:
     def test_drain_empty_thread_id(self) -> None:
         assert drain_subagent_usage("") is None
 
+    def test_lock_is_stable_per_thread(self) -> None:
+        assert _pending_lock_for("t1") is _pending_lock_for("t1")
+
+    def test_concurrent_adds_are_not_lost(self) -> None:
+        def add_many(thread_id: str) -> None:
+            for _ in range(1000):
+                add_subagent_usage(thread_id, {"input_tokens": 1, "output_tokens": 2})
+
+        workers = [threading.Thread(target=add_many, args=(f"t{i % 3}",)) for i in range(6)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        for i in range(3):
+            assert drain_subagent_usage(f"t{i}") == {"input_tokens": 2000, "output_tokens": 4000}
+
 
 class TestUsageTrackingMiddleware:
     """Tests for UsageTrackingMiddleware._extract_and_emit."""
 
     def setup_method(self) -> None:
-        with _pending_lock:
-            _pending_subagent_usage.clear()
+        _pending_subagent_usage.clear()
 
     def teardown_method(self) -> None:
-        with _pending_lock:
-            _pending_subagent_usage.clear()
+        _pending_subagent_usage.clear()
 
     def test_extracts_usage_from_ai_message(self) -> None:
         mw = UsageTrackingMiddleware()
@@ -116,6 +127,10 @@ class TestUsageTrackingMiddleware:
         runtime = _make_runtime()
         assert mw._extract_and_emit(state, runtime) is None
 
+    def test_returns_none_without_messages_key(self) -> None:
+        mw = UsageTrackingMiddleware()
+        assert mw._extract_and_emit({}, _make_runtime()) is None
+
     def test_returns_none_for_non_ai_message(self) -> None:
         mw = UsageTrackingMiddleware()
         state: dict[str, Any] = {"messages": [HumanMessage(content="hi")]}
@@ -145,6 +160,27 @@ class TestUsageTrackingMiddleware:
         assert result["token_usage"]["input_tokens"] == 150
         assert result["token_usage"]["output_tokens"] == 75
 
+    def test_uses_runtime_stream_writer_without_lookup(self) -> None:
+        mw = UsageTrackingMiddleware()
+        ai_msg = AIMessage(content="hi")
+        ai_msg.usage_metadata = {"input_tokens": 10, "output_tokens": 5}
+        events: list[dict] = []
+        runtime = SimpleNamespace(context={"thread_id": "t1"}, stream_writer=events.append)
+
+        with patch("src.agents.middlewares.usage_tracking_middleware.get_stream_writer", side_effect=AssertionError("should not be called")):
+            result = mw._extract_and_emit({"messages": [ai_msg]}, runtime)
+
+        assert events == [{"type": "usage_update", "input_tokens": 10, "output_tokens": 5}]
+        assert result == {"token_usage": {"input_tokens": 10, "output_tokens": 5}}
+
+    def test_failing_writer_still_returns_usage(self) -> None:
+        mw = UsageTrackingMiddleware()
+        ai_msg = AIMessage(content="hi")
+        ai_msg.usage_metadata = {"input_tokens": 10, "output_tokens": 5}
+        runtime = SimpleNamespace(context={}, stream_writer=MagicMock(side_effect=RuntimeError("closed")))
+
+        assert mw._extract_and_emit({"messages": [ai_msg]}, runtime) == {"token_usage": {"input_tokens": 10, "output_tokens": 5}}
+
 
 # ---------------------------------------------------------------------------
 # ClarificationMiddleware
@@ -307,6 +343,14 @@ class TestSubagentLimitMiddleware:
         bash_calls = [tc for tc in updated_msg.tool_calls if tc["name"] == "bash"]
         assert len(bash_calls) == 1
 
+    def test_truncation_keeps_first_tasks_in_order(self) -> None:
+        mw = SubagentLimitMiddleware(max_concurrent=2)
+        names = ["task", "bash", "task", "task", "read_file", "task"]
+        ai_msg = AIMessage(content="", tool_calls=[{"name": n, "id": f"tc{i}", "args": {}} for i, n in enumerate(names)])
+        result = mw._truncate_task_calls({"messages": [ai_msg]})
+        assert result is not None
+        assert [tc["id"] for tc in result["messages"][0].tool_calls] == ["tc0", "tc1", "tc2", "tc4"]
+
     def test_no_truncation_for_non_task(self) -> None:
         mw = SubagentLimitMiddleware(max_concurrent=2)
         ai_msg = AIMessage(content="", tool_calls=[
@@ -362,6 +406,12 @@ class TestDetectPhase:
         state: dict[str, Any] = {"messages": msgs}
         assert _detect_phase(state) == ExecutionPhase.EXECUTION
 
+    def test_only_last_five_ai_messages_considered(self) -> None:
+        old = AIMessage(content="", tool_calls=[{"name": "present_files", "id": "tc0", "args": {}}])
+        recent = [AIMessage(content="", tool_calls=[{"name": "read_file", "id": f"tc{i}", "args": {}}]) for i in range(1, 6)]
+        state: dict[str, Any] = {"messages": [old, HumanMessage(content="next"), *recent]}
+        assert _detect_phase(state) == ExecutionPhase.PLANNING
+
 
 # ---------------------------------------------------------------------------
 # MemoryMiddleware — _filter_messages_for_memory
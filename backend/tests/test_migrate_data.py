@@ -0,0 +1,66 @@
+"""Tests for the file-to-PostgreSQL data migration script."""
+
+import csv
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts import migrate_data
+
+ROWS = [("user-1", {"facts": []}), ("user-2", {"facts": [{"content": 'says "hi", twice'}]})]
+
+
+def _session(driver: str) -> tuple[MagicMock, MagicMock]:
+    session = MagicMock()
+    connection = session.connection.return_value
+    connection.dialect.driver = driver
+    cursor = connection.connection.cursor.return_value
+    cursor.rowcount = len(ROWS)
+    return session, cursor
+
+
+def _parse_csv(data: str) -> list[tuple[str, dict]]:
+    return [(user_id, json.loads(memory_json)) for user_id, memory_json, _ in csv.reader(io.StringIO(data))]
+
+
+class TestCopyMemoryRows:
+    """Tests for the driver-specific COPY of memory rows."""
+
+    def test_psycopg2_uses_copy_expert(self):
+        session, cursor = _session("psycopg2")
+
+        assert migrate_data._copy_memory_rows(session, ROWS) == 2
+
+        sql, buffer = cursor.copy_expert.call_args.args
+        assert sql.startswith("COPY user_memory_import")
+        assert _parse_csv(buffer.getvalue()) == ROWS
+        cursor.copy.assert_not_called()
+        cursor.close.assert_called_once()
+
+    def test_psycopg3_uses_cursor_copy(self):
+        session, cursor = _session("psycopg")
+        copy = cursor.copy.return_value.__enter__.return_value
+
+        assert migrate_data._copy_memory_rows(session, ROWS) == 2
+
+        assert cursor.copy.call_args.args[0].startswith("COPY user_memory_import")
+        assert _parse_csv(copy.write.call_args.args[0]) == ROWS
+        cursor.copy_expert.assert_not_called()
+        cursor.close.assert_called_once()
+
+    @pytest.mark.parametrize("driver", ["pg8000", "asyncpg"])
+    def test_other_drivers_fall_back_to_batched_insert(self, driver):
+        from src.db.models import UserMemoryModel
+
+        session, cursor = _session(driver)
+        with patch.object(migrate_data, "_insert_missing", return_value=(1, 2)) as insert_missing:
+            assert migrate_data._copy_memory_rows(session, ROWS) == 1
+
+        (called_session, model, rows), kwargs = insert_missing.call_args
+        assert called_session is session
+        assert model is UserMemoryModel
+        assert kwargs == {"index_elements": ["user_id"]}
+        assert [(row["user_id"], row["memory_json"]) for row in rows] == ROWS
+        session.connection.return_value.connection.cursor.assert_not_called()
@@ -74,3 +74,15 @@ def test_partial_update_preserves_existing_fields(tmp_store_dir) -> None:
     assert loaded["provider_enabled"]["openai"] is True
     assert loaded["enabled_models"]["openai:gpt-5.2:standard"] is True
 
+
+def test_update_existing_row_db_store(db_enabled) -> None:
+    first = set_model_preferences(user_id="user-db-update", model_name="openai:gpt-5.2:standard", thinking_effort="medium")
+    second = set_model_preferences(user_id="user-db-update", thinking_effort="high")
+
+    assert second["model_name"] == "openai:gpt-5.2:standard"
+    assert second["thinking_effort"] == "high"
+    assert first["updated_at"] is not None
+    assert second["updated_at"] is not None
+    loaded = get_model_preferences("user-db-update")
+    assert loaded is not None
+    assert loaded["thinking_effort"] == "high"
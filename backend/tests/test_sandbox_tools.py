@@ -561,6 +561,42 @@ class TestBashToolTruncation:
         assert result == "Error: fail"
 
 
+# ---------------------------------------------------------------------------
+# read_file paging
+# ---------------------------------------------------------------------------
+class TestReadFileToolPaging:
+    """Tests for read_file_tool paging through large files."""
+
+    @patch("src.sandbox.tools.get_sandbox_provider")
+    def test_truncated_page_reports_next_offset(self, mock_provider_fn) -> None:
+        from src.sandbox.tools import read_file_tool
+
+        fake_sandbox = MagicMock()
+        fake_sandbox.read_file_window.return_value = ("page", True, 4)
+        mock_provider_fn.return_value.get.return_value = fake_sandbox
+
+        runtime = _make_runtime(state={"sandbox": {"sandbox_id": "aio-1"}})
+        result = read_file_tool.func(runtime, "test", "/mnt/big.log", offset=0)
+
+        fake_sandbox.read_file_window.assert_called_once_with("/mnt/big.log", 0)
+        assert result.startswith("page")
+        assert "offset=4" in result
+
+    @patch("src.sandbox.tools.get_sandbox_provider")
+    def test_line_range_reads_whole_file(self, mock_provider_fn) -> None:
+        from src.sandbox.tools import read_file_tool
+
+        fake_sandbox = MagicMock()
+        fake_sandbox.read_file.return_value = "a\nb\nc"
+        mock_provider_fn.return_value.get.return_value = fake_sandbox
+
+        runtime = _make_runtime(state={"sandbox": {"sandbox_id": "aio-1"}})
+        result = read_file_tool.func(runtime, "test", "/mnt/f.txt", start_line=2, end_line=3)
+
+        assert result == "b\nc"
+        fake_sandbox.read_file_window.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # Cached regex pattern (Fix 1)
 # ---------------------------------------------------------------------------
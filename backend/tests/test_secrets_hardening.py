@@ -49,6 +49,26 @@ class TestJWTSecretHardening:
         secret2 = jwt_mod._get_secret_key()
         assert secret1 == secret2
 
+    def test_file_secret_read_once(self, tmp_store_dir):
+        """The file fallback is not re-read on every call."""
+        import src.gateway.auth.jwt as jwt_mod
+
+        os.environ.pop("JWT_SECRET_KEY", None)
+        os.environ.pop("REQUIRE_ENV_SECRETS", None)
+        secret = jwt_mod._get_secret_key()
+        with patch.object(jwt_mod.Path, "read_text", side_effect=AssertionError("secret file re-read")):
+            assert jwt_mod._get_secret_key() == secret
+
+    def test_env_var_overrides_cached_file_secret(self, tmp_store_dir):
+        """A JWT_SECRET_KEY set later still takes precedence."""
+        import src.gateway.auth.jwt as jwt_mod
+
+        os.environ.pop("JWT_SECRET_KEY", None)
+        os.environ.pop("REQUIRE_ENV_SECRETS", None)
+        jwt_mod._get_secret_key()
+        with patch.dict(os.environ, {"JWT_SECRET_KEY": "from-env"}):
+            assert jwt_mod._get_secret_key() == "from-env"
+
 
 class TestEncryptionKeyHardening:
     """Test encryption key production enforcement."""
@@ -49,6 +49,30 @@ class TestMergeArtifacts:
         result = merge_artifacts([], [])
         assert result == []
 
+    def test_no_new_artifacts_returns_existing(self) -> None:
+        existing = ["a", "b"]
+        assert merge_artifacts(existing, ["b"]) is existing
+        assert merge_artifacts(existing, []) is existing
+
+    def test_repeated_merges_keep_order_and_dedupe(self) -> None:
+        artifacts: list[str] = []
+        for batch in (["a", "b"], ["b", "c", "c"], ["a"], ["d"]):
+            artifacts = merge_artifacts(artifacts, batch)
+        assert artifacts == ["a", "b", "c", "d"]
+
+    def test_duplicates_in_existing_are_removed(self) -> None:
+        assert merge_artifacts(["a", "a", "b"], ["c"]) == ["a", "b", "c"]
+
+    def test_list_changed_in_place_is_merged(self) -> None:
+        artifacts = merge_artifacts(["a"], ["b"])
+        artifacts.append("c")
+        assert merge_artifacts(artifacts, ["c", "d"]) == ["a", "b", "c", "d"]
+
+    def test_merge_does_not_mutate_existing(self) -> None:
+        existing = merge_artifacts(["a"], ["b"])
+        merge_artifacts(existing, ["c"])
+        assert existing == ["a", "b"]
+
 
 # ---------------------------------------------------------------------------
 # merge_viewed_images
@@ -85,6 +109,17 @@ class TestMergeViewedImages:
         assert "a.png" in result
         assert "b.png" in result
 
+    def test_merge_does_not_mutate_inputs(self) -> None:
+        existing = {"a.png": {"base64": "a", "mime_type": "image/png"}}
+        new = {"b.png": {"base64": "b", "mime_type": "image/png"}}
+        result = merge_viewed_images(existing, new)
+        assert result is not existing
+        assert list(existing) == ["a.png"]
+
+    def test_same_dict_returns_existing(self) -> None:
+        existing = {"a.png": {"base64": "a", "mime_type": "image/png"}}
+        assert merge_viewed_images(existing, existing) is existing
+
 
 # ---------------------------------------------------------------------------
 # merge_token_usage
@@ -145,3 +180,8 @@ class TestThreadStateAnnotations:
         assert "uploaded_files" in annotations
         assert "viewed_images" in annotations
         assert "token_usage" in annotations
+
+    def test_zero_delta_returns_existing(self) -> None:
+        existing = {"input_tokens": 10, "output_tokens": 20}
+        assert merge_token_usage(existing, {"input_tokens": 0, "output_tokens": 0}) is existing
+        assert merge_token_usage(existing, {}) is existing
@@ -4,15 +4,25 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, HumanMessage
 
 from src.agents.middlewares.timeline_logging_middleware import (
+    _db_last_index,
+    _db_subagent_signatures,
+    _db_write_batch,
+    _DbTimelineWriter,
+    _file_record_messages,
     _file_record_subagent_trajectories,
+    _file_timeline_state,
+    _PendingTimelineWrite,
 )
 
 
-def _read_timeline(timeline_path: Path) -> dict:
+def _read_events(timeline_path: Path) -> list[dict]:
     with timeline_path.open(encoding="utf-8") as handle:
-        return json.load(handle)
+        return [json.loads(line) for line in handle]
 
 
 def test_file_timeline_records_subagent_trajectory_changes(tmp_path) -> None:
@@ -30,9 +40,8 @@ def test_file_timeline_records_subagent_trajectory_changes(tmp_path) -> None:
     _file_record_subagent_trajectories(state, thread_id, trajectories_v1, "after_agent")
     _file_record_subagent_trajectories(state, thread_id, trajectories_v1, "after_agent")
 
-    timeline_path = tmp_path / "agent_timeline.json"
-    timeline = _read_timeline(timeline_path)
-    subagent_events = [event for event in timeline["events"] if event.get("event") == "subagent_trajectory"]
+    timeline_path = tmp_path / "agent_timeline.jsonl"
+    subagent_events = [event for event in _read_events(timeline_path) if event.get("event") == "subagent_trajectory"]
     assert len(subagent_events) == 1
 
     trajectories_v2 = {
@@ -47,6 +56,318 @@ def test_file_timeline_records_subagent_trajectory_changes(tmp_path) -> None:
     }
     _file_record_subagent_trajectories(state, thread_id, trajectories_v2, "after_agent")
 
-    timeline = _read_timeline(timeline_path)
-    subagent_events = [event for event in timeline["events"] if event.get("event") == "subagent_trajectory"]
+    subagent_events = [event for event in _read_events(timeline_path) if event.get("event") == "subagent_trajectory"]
     assert len(subagent_events) == 2
+
+
+def test_file_timeline_appends_only_new_messages(tmp_path) -> None:
+    state = {"thread_data": {"outputs_path": str(tmp_path)}}
+    messages = [HumanMessage(content="héllo", id="m0"), AIMessage(content="hi", id="m1")]
+
+    _file_record_messages(state, "thread-1", messages, "after_model")
+    _file_record_messages(state, "thread-1", messages, "before_model")
+    messages.append(HumanMessage(content="again", id="m2"))
+    _file_record_messages(state, "thread-1", messages, "after_model")
+
+    events = _read_events(tmp_path / "agent_timeline.jsonl")
+    assert [(event["event"], event["message_index"], event["stage"]) for event in events] == [
+        ("message", 0, "after_model"),
+        ("message", 1, "after_model"),
+        ("message", 2, "after_model"),
+    ]
+    assert events[0]["message"]["content"] == "héllo"
+    assert events[0]["timestamp"] == events[1]["timestamp"]
+
+
+def test_file_timeline_resumes_from_existing_file(tmp_path) -> None:
+    state = {"thread_data": {"outputs_path": str(tmp_path)}}
+    timeline_path = tmp_path / "agent_timeline.jsonl"
+    messages = [HumanMessage(content="a", id="m0"), AIMessage(content="b", id="m1")]
+    _file_record_messages(state, "thread-1", messages, "after_model")
+    _file_timeline_state.pop(str(timeline_path))
+
+    _file_record_messages(state, "thread-1", [*messages, HumanMessage(content="c", id="m2")], "after_model")
+    _file_timeline_state.pop(str(timeline_path))
+    _file_record_messages(state, "thread-1", messages[:1], "after_agent")
+
+    events = _read_events(timeline_path)
+    assert [event["event"] for event in events] == ["message", "message", "message", "history_truncated"]
+    assert events[-1]["previous_last_index"] == 3
+    assert events[-1]["current_length"] == 1
+
+
+def test_file_timeline_migrates_legacy_json(tmp_path) -> None:
+    state = {"thread_data": {"outputs_path": str(tmp_path)}}
+    legacy = {
+        "schema_version": 1,
+        "thread_id": "thread-1",
+        "last_message_index": 1,
+        "events": [{"event": "message", "timestamp": "t0", "stage": "after_model", "message_index": 0, "message": {"content": "old"}}],
+    }
+    (tmp_path / "agent_timeline.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    _file_record_messages(state, "thread-1", [HumanMessage(content="old", id="m0"), AIMessage(content="new", id="m1")], "after_model")
+
+    events = _read_events(tmp_path / "agent_timeline.jsonl")
+    assert [event["message_index"] for event in events] == [0, 1]
+    assert events[0]["message"] == {"content": "old"}
+    assert not (tmp_path / "agent_timeline.json").exists()
+
+
+def test_db_timeline_batch_records_events_in_order(db_enabled, db_session) -> None:
+    from src.db.models import TimelineEventModel
+
+    thread_id = "thread-db-batch"
+    _db_last_index.pop(thread_id, None)
+    _db_subagent_signatures.pop(thread_id, None)
+    messages = [HumanMessage(content="hi", id="m0"), AIMessage(content="hello", id="m1")]
+    trajectories = {"task-1": {"task_id": "task-1", "status": "running"}}
+
+    _db_write_batch(
+        [
+            _PendingTimelineWrite(thread_id, "after_model", messages, trajectories),
+            _PendingTimelineWrite(thread_id, "before_model", [*messages, HumanMessage(content="again", id="m2")], trajectories),
+            _PendingTimelineWrite(thread_id, "after_agent", messages[:1], {}),
+        ]
+    )
+
+    rows = db_session.query(TimelineEventModel).filter_by(thread_id=thread_id).order_by(TimelineEventModel.id).all()
+    assert [(row.event_type, row.message_index, row.role, row.message_id, row.stage) for row in rows] == [
+        ("message", 0, "human", "m0", "after_model"),
+        ("message", 1, "ai", "m1", "after_model"),
+        ("subagent_trajectory", None, "subagent", "task-1", "after_model"),
+        ("message", 2, "human", "m2", "before_model"),
+        ("history_truncated", None, None, None, "after_agent"),
+    ]
+    assert rows[1].message_data["content"] == "hello"
+    assert rows[4].message_data == {"previous_last_index": 3, "current_length": 1}
+    assert all(row.created_at is not None for row in rows)
+    _db_last_index.pop(thread_id, None)
+    _db_subagent_signatures.pop(thread_id, None)
+
+
+def test_db_batch_serializes_messages_outside_sessions(db_enabled, db_session) -> None:
+    from contextlib import contextmanager
+
+    import src.db.engine as engine_module
+    from src.agents.middlewares import timeline_logging_middleware as timeline
+    from src.db.models import TimelineEventModel
+
+    thread_id = "thread-db-serialize"
+    _db_last_index.pop(thread_id, None)
+    open_sessions = []
+    real_get_db_session = engine_module.get_db_session
+    real_serialize = timeline._serialize_message
+
+    @contextmanager
+    def tracking_session():
+        open_sessions.append(True)
+        try:
+            with real_get_db_session() as session:
+                yield session
+        finally:
+            open_sessions.pop()
+
+    def checked_serialize(message):
+        assert not open_sessions, "message serialized while a session was open"
+        return real_serialize(message)
+
+    with (
+        patch.object(engine_module, "get_db_session", tracking_session),
+        patch.object(timeline, "_serialize_message", checked_serialize),
+    ):
+        _db_write_batch([_PendingTimelineWrite(thread_id, "after_model", [HumanMessage(content="hi", id="m0")], {})])
+
+    assert db_session.query(TimelineEventModel).filter_by(thread_id=thread_id).count() == 1
+    _db_last_index.pop(thread_id, None)
+
+
+def test_db_writer_flushes_queued_writes_as_one_batch() -> None:
+    writer = _DbTimelineWriter()
+    writes = [_PendingTimelineWrite("thread-1", "after_model", [], {}) for _ in range(3)]
+
+    with (
+        patch("src.agents.middlewares.timeline_logging_middleware._db_write_batch") as write_batch,
+        patch.object(writer, "flush_interval", 60),
+    ):
+        for write in writes:
+            writer.submit(write)
+        assert writer.pending_count == 3
+        writer.flush()
+
+    write_batch.assert_called_once_with(writes)
+    assert writer.pending_count == 0
+
+
+def test_db_writer_survives_failed_batch() -> None:
+    writer = _DbTimelineWriter()
+
+    with (
+        patch("src.agents.middlewares.timeline_logging_middleware._db_write_batch", side_effect=RuntimeError("db down")),
+        patch.object(writer, "flush_interval", 60),
+    ):
+        writer.submit(_PendingTimelineWrite("thread-1", "after_model", [], {}))
+        writer.flush()
+
+    assert writer.pending_count == 0
+
+
+def test_middleware_follows_patched_db_mode(tmp_path) -> None:
+    from types import SimpleNamespace
+
+    from src.agents.middlewares.timeline_logging_middleware import TimelineLoggingMiddleware
+
+    middleware = TimelineLoggingMiddleware()
+    runtime = SimpleNamespace(context={"thread_id": "thread-mode"})
+    state = {"messages": [HumanMessage(content="hi", id="m0")], "thread_data": {"outputs_path": str(tmp_path)}}
+
+    with (
+        patch("src.db.engine.is_db_enabled", return_value=True),
+        patch("src.agents.middlewares.timeline_logging_middleware._db_record_timeline") as record,
+    ):
+        middleware.before_model(state, runtime)
+    record.assert_called_once()
+
+    with patch("src.db.engine.is_db_enabled", return_value=False):
+        middleware.before_model(state, runtime)
+    assert (tmp_path / "agent_timeline.jsonl").exists()
+
+
+def test_json_signature_ignores_key_order() -> None:
+    from src.agents.middlewares.timeline_logging_middleware import _json_signature
+
+    assert _json_signature({"b": 1, "a": [1, {"y": 2, "x": 1}]}) == _json_signature({"a": [1, {"x": 1, "y": 2}], "b": 1})
+    assert _json_signature({"a": 1}) != _json_signature({"a": 2})
+    assert _json_signature({1: "non-str key"}) == _json_signature({"1": "non-str key"})
+
+
+def test_file_locks_are_per_thread() -> None:
+    from src.agents.middlewares.timeline_logging_middleware import _file_lock_for
+
+    assert _file_lock_for("thread-a") is _file_lock_for("thread-a")
+    assert _file_lock_for("thread-a") is not _file_lock_for("thread-b")
+
+
+def test_middleware_skips_hook_without_new_messages(tmp_path) -> None:
+    from types import SimpleNamespace
+
+    from src.agents.middlewares.timeline_logging_middleware import TimelineLoggingMiddleware
+
+    middleware = TimelineLoggingMiddleware()
+    runtime = SimpleNamespace(context={"thread_id": "thread-skip"})
+    messages = [HumanMessage(content="hi", id="m0")]
+    state = {"messages": messages, "thread_data": {"outputs_path": str(tmp_path)}}
+
+    with patch("src.db.engine.is_db_enabled", return_value=False):
+        middleware.before_model(state, runtime)
+        with patch("src.agents.middlewares.timeline_logging_middleware._file_record_messages") as record:
+            middleware.after_model(state, runtime)
+            record.assert_not_called()
+
+            middleware.after_model({**state, "messages": [*messages, AIMessage(content="yo", id="m1")]}, runtime)
+            record.assert_called_once()
+
+    with (
+        patch("src.db.engine.is_db_enabled", return_value=True),
+        patch.dict("src.agents.middlewares.timeline_logging_middleware._db_last_index", {"thread-skip": 1}),
+        patch("src.agents.middlewares.timeline_logging_middleware._db_record_timeline") as record,
+    ):
+        middleware.after_model(state, runtime)
+        record.assert_not_called()
+
+
+def test_middleware_ignores_state_without_messages(tmp_path) -> None:
+    from types import SimpleNamespace
+
+    from src.agents.middlewares.timeline_logging_middleware import TimelineLoggingMiddleware
+
+    runtime = SimpleNamespace(context={"thread_id": "thread-empty"})
+    with (
+        patch("src.db.engine.is_db_enabled", return_value=False),
+        patch("src.agents.middlewares.timeline_logging_middleware._file_record_messages") as record,
+    ):
+        TimelineLoggingMiddleware().before_model({"thread_data": {"outputs_path": str(tmp_path)}}, runtime)
+
+    record.assert_not_called()
+
+
+def test_async_hooks_offload_only_file_writes(tmp_path) -> None:
+    import asyncio
+    from types import SimpleNamespace
+
+    from src.agents.middlewares.timeline_logging_middleware import TimelineLoggingMiddleware
+
+    middleware = TimelineLoggingMiddleware()
+    runtime = SimpleNamespace(context={"thread_id": "thread-async"})
+    state = {"messages": [HumanMessage(content="hi", id="m0")], "thread_data": {"outputs_path": str(tmp_path)}}
+
+    with (
+        patch("src.db.engine.is_db_enabled", return_value=True),
+        patch("src.agents.middlewares.timeline_logging_middleware._db_record_timeline") as record,
+        patch("src.agents.middlewares.timeline_logging_middleware.asyncio.to_thread") as to_thread,
+    ):
+        asyncio.run(middleware.abefore_model(state, runtime))
+    record.assert_called_once()
+    to_thread.assert_not_called()
+
+    with patch("src.db.engine.is_db_enabled", return_value=False):
+        asyncio.run(middleware.aafter_model(state, runtime))
+    assert (tmp_path / "agent_timeline.jsonl").exists()
+
+
+def test_outputs_dir_created_once_and_recreated_if_removed(tmp_path) -> None:
+    import os
+    import shutil
+
+    outputs = tmp_path / "outputs"
+    state = {"thread_data": {"outputs_path": str(outputs)}}
+    messages = [HumanMessage(content="a", id="m0")]
+
+    with patch("src.agents.middlewares.timeline_logging_middleware.os.makedirs", wraps=os.makedirs) as makedirs:
+        _file_record_messages(state, "thread-dirs", messages, "after_model")
+        messages.append(AIMessage(content="b", id="m1"))
+        _file_record_messages(state, "thread-dirs", messages, "after_model")
+        assert makedirs.call_count == 1
+
+        shutil.rmtree(outputs)
+        messages.append(HumanMessage(content="c", id="m2"))
+        _file_record_messages(state, "thread-dirs", messages, "after_model")
+
+    assert [event["message_index"] for event in _read_events(outputs / "agent_timeline.jsonl")] == [2]
+
+
+def test_file_handles_reused_and_evicted_beyond_cap(tmp_path) -> None:
+    from src.agents.middlewares.timeline_logging_middleware import _close_file_handles, _file_handles
+
+    _close_file_handles()
+    state_a = {"thread_data": {"outputs_path": str(tmp_path / "a")}}
+    state_b = {"thread_data": {"outputs_path": str(tmp_path / "b")}}
+    messages = [HumanMessage(content="a", id="m0")]
+
+    with patch("src.agents.middlewares.timeline_logging_middleware._MAX_OPEN_TIMELINES", 1):
+        _file_record_messages(state_a, "thread-handle-a", messages, "after_model")
+        handle_a = _file_handles[str(tmp_path / "a" / "agent_timeline.jsonl")][1]
+        _file_record_messages(state_a, "thread-handle-a", [*messages, AIMessage(content="b", id="m1")], "after_model")
+        assert _file_handles[str(tmp_path / "a" / "agent_timeline.jsonl")][1] is handle_a
+
+        _file_record_messages(state_b, "thread-handle-b", messages, "after_model")
+
+    assert handle_a.closed
+    assert list(_file_handles) == [str(tmp_path / "b" / "agent_timeline.jsonl")]
+    assert [event["message_index"] for event in _read_events(tmp_path / "a" / "agent_timeline.jsonl")] == [0, 1]
+    _close_file_handles()
+
+
+def test_serialize_message_variants() -> None:
+    from types import SimpleNamespace
+
+    from src.agents.middlewares.timeline_logging_middleware import _serialize_message
+
+    assert _serialize_message(AIMessage(content="hi", id="m1"))["content"] == "hi"
+
+    class LegacyMessage:
+        def dict(self) -> dict:
+            return {"legacy": True}
+
+    assert _serialize_message(LegacyMessage()) == {"legacy": True}
+    assert _serialize_message(SimpleNamespace(type="human", content="x")) == {"type": "human", "content": "x", "additional_kwargs": None}
@@ -60,6 +60,20 @@ class TestClassifyError:
     def test_empty_string_is_unknown(self):
         assert classify_error("") == ErrorCategory.UNKNOWN
 
+    def test_matching_ignores_case(self):
+        assert classify_error("Error: ECONNREFUSED") == ErrorCategory.TRANSIENT
+        assert classify_error("error: econnreset") == ErrorCategory.TRANSIENT
+        assert classify_error("Error: NOT FOUND") == ErrorCategory.PERSISTENT
+
+    def test_long_message_classified_on_head_and_tail(self):
+        filler = "x" * 5000
+        assert classify_error(f"Error: Connection refused\n{filler}") == ErrorCategory.TRANSIENT
+        assert classify_error(f"Error: {filler}\nConnectionError: connection reset") == ErrorCategory.TRANSIENT
+        assert classify_error(f"Error: {filler} 503 {filler}") == ErrorCategory.UNKNOWN
+
+    def test_transient_wins_over_earlier_auth_match(self):
+        assert classify_error("Error: 401 Unauthorized while retrying after connection reset") == ErrorCategory.TRANSIENT
+
 
 class TestShouldRetry:
     """Tests for retry decision logic."""
@@ -192,6 +206,24 @@ class TestWrapToolCall:
         handler.assert_called_once()
 
 
+class TestRetryDelays:
+    """Tests for the precomputed backoff delays."""
+
+    def test_delays_double_each_attempt(self):
+        assert ToolRetryMiddleware(max_retries=3, base_delay=0.5)._delays == (0.5, 1.0, 2.0)
+
+    @patch("src.agents.middlewares.tool_retry_middleware.time.sleep")
+    def test_sleeps_use_backoff_delays(self, mock_sleep):
+        middleware = ToolRetryMiddleware(max_retries=2, base_delay=1.0)
+        request = MagicMock()
+        request.tool_call = {"name": "bash", "id": "test_id", "args": {}}
+        handler = MagicMock(return_value=ToolMessage(content="Error: Connection timed out", tool_call_id="test_id"))
+
+        middleware.wrap_tool_call(request, handler)
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0]
+
+
 class TestEnrichError:
     """Tests for error message enrichment."""
 
@@ -205,3 +237,30 @@ class TestEnrichError:
         middleware = ToolRetryMiddleware()
         enriched = middleware._enrich_error("Error: timeout", 3)
         assert "transient errors" in enriched
+
+
+class TestCheckResult:
+    """Tests for the combined error check."""
+
+    def test_error_message_returns_content(self):
+        from src.agents.middlewares.tool_retry_middleware import _check_result
+
+        assert _check_result(ToolMessage(content="Error: boom", tool_call_id="t")) == (True, "Error: boom")
+
+    def test_success_message_is_not_error(self):
+        from src.agents.middlewares.tool_retry_middleware import _check_result
+
+        assert _check_result(ToolMessage(content="ok", tool_call_id="t")) == (False, "ok")
+
+    def test_non_string_content_is_not_error(self):
+        from src.agents.middlewares.tool_retry_middleware import _check_result
+
+        is_error, _ = _check_result(ToolMessage(content=[{"type": "text", "text": "Error: x"}], tool_call_id="t"))
+        assert is_error is False
+
+    def test_command_is_not_error(self):
+        from langgraph.types import Command
+
+        from src.agents.middlewares.tool_retry_middleware import _check_result
+
+        assert _check_result(Command(update={})) == (False, "")
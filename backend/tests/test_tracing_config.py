@@ -111,3 +111,15 @@ class TestTracingConfig:
             config = get_tracing_config()
             assert config.api_key == "langsmith_key"
             assert config.project == "smith-project"
+
+    def test_config_is_frozen_and_reused(self):
+        """The config is built once and cannot be mutated afterwards."""
+        from pydantic import ValidationError
+
+        from src.config.tracing_config import get_tracing_config, is_tracing_enabled
+
+        config = get_tracing_config()
+        assert get_tracing_config() is config
+        assert is_tracing_enabled() is config.is_configured
+        with pytest.raises(ValidationError):
+            config.enabled = not config.enabled
@@ -20,7 +20,7 @@ def _enter_auth_patches(stack: ExitStack) -> None:
 
 
 def test_upload_files_writes_thread_storage_and_skips_local_sandbox_sync(tmp_path):
-    """Local sandbox: files are written to thread dir, sandbox.update_file is NOT called."""
+    """Local sandbox: files are written to thread dir, the sandbox is NOT synced."""
     thread_uploads_dir = tmp_path / "uploads"
     thread_uploads_dir.mkdir(parents=True)
 
@@ -49,6 +49,7 @@ def test_upload_files_writes_thread_storage_and_skips_local_sandbox_sync(tmp_pat
     assert (thread_uploads_dir / "notes.txt").read_bytes() == b"hello uploads"
 
     sandbox.update_file.assert_not_called()
+    sandbox.update_files.assert_not_called()
 
 
 def test_upload_files_syncs_non_local_sandbox_and_marks_markdown_file(tmp_path):
@@ -90,8 +91,12 @@ def test_upload_files_syncs_non_local_sandbox_and_marks_markdown_file(tmp_path):
     assert (thread_uploads_dir / "report.pdf").read_bytes() == b"pdf-bytes"
     assert (thread_uploads_dir / "report.md").read_text(encoding="utf-8") == "converted"
 
-    sandbox.update_file.assert_any_call("/mnt/user-data/uploads/report.pdf", b"pdf-bytes")
-    sandbox.update_file.assert_any_call("/mnt/user-data/uploads/report.md", b"converted")
+    sandbox.update_files.assert_called_once_with(
+        [
+            ("/mnt/user-data/uploads/report.pdf", b"pdf-bytes"),
+            ("/mnt/user-data/uploads/report.md", b"converted"),
+        ]
+    )
 
 
 def test_upload_files_rejects_dotdot_and_dot_filenames(tmp_path):